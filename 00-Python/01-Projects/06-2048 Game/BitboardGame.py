@@ -0,0 +1,211 @@
+import random
+
+# Bitboard version of the logic in Game.py, with the same functions.
+#
+# The board is one 64-bit integer: each cell holds the exponent of
+# its tile in 4 bits (0 for an empty cell, 1 for 2, 2 for 4, ...,
+# 11 for 2048, up to 15 for 32768). Row r is in bits 16*r to 16*r+15
+# and column c of a row in its bits 4*c to 4*c+3.
+#
+# A left or right move of a 16-bit row is read from a precomputed
+# table of the 65536 possible rows, so a move is 4 table lookups.
+# Up and down moves transpose the board with bit masks and shifts,
+# move it left / right and transpose it back.
+
+ROW_MASK = 0xFFFF
+NIBBLE_LOW_BITS = 0x1111111111111111
+WIN_EXPONENT = 11  # 2 ** 11 == 2048
+MAX_EXPONENT = 15
+
+
+class Board:
+    """A mutable 4x4 board (so add_new_2 can change it in place like
+    the list version), holding its cells in the integer `bits`."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_list(cls, mat):
+        bits = 0
+        for i in range(4):
+            for j in range(4):
+                if mat[i][j]:
+                    exponent = mat[i][j].bit_length() - 1
+                    if mat[i][j] != 1 << exponent or exponent > MAX_EXPONENT:
+                        raise ValueError(f"{mat[i][j]} is not a tile value (2 to {2 ** MAX_EXPONENT})")
+                    bits |= exponent << (16 * i + 4 * j)
+        return cls(bits)
+
+    def to_list(self):
+        mat = []
+        for i in range(4):
+            row = []
+            for j in range(4):
+                exponent = (self.bits >> (16 * i + 4 * j)) & 0xF
+                row.append(1 << exponent if exponent else 0)
+            mat.append(row)
+        return mat
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        # Printed like the nested lists of Game.py
+        return repr(self.to_list())
+
+
+def _move_row_left(exponents):
+    # Same steps as Game.move_left on one row of exponents:
+    # compress, merge equal neighbours, compress again
+    tiles = [e for e in exponents if e]
+    merged = []
+    i = 0
+    while i < len(tiles):
+        # Two 32768 tiles would make a tile that doesn't fit in 4 bits
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            merged.append(tiles[i] + 1)
+            i += 2
+        else:
+            merged.append(tiles[i])
+            i += 1
+    return merged + [0] * (4 - len(merged))
+
+
+def _pack_row(exponents):
+    return exponents[0] | exponents[1] << 4 | exponents[2] << 8 | exponents[3] << 12
+
+
+def _reverse_row(row):
+    return (row >> 12) | ((row >> 4) & 0x00F0) | ((row << 4) & 0x0F00) | ((row << 12) & 0xF000)
+
+
+def _build_tables():
+    left, right = [0] * 65536, [0] * 65536
+    for row in range(65536):
+        exponents = [(row >> (4 * j)) & 0xF for j in range(4)]
+        left[row] = _pack_row(_move_row_left(exponents))
+    for row in range(65536):
+        right[row] = _reverse_row(left[_reverse_row(row)])
+    return left, right
+
+
+# moved row of each of the 65536 rows
+LEFT_TABLE, RIGHT_TABLE = _build_tables()
+
+
+def transpose(bits):
+    # Swap the 4x4 cells around the diagonal: first the 2x2 blocks
+    # inside each 2x2 quadrant, then the off-diagonal quadrants
+    a1 = bits & 0xF0F00F0FF0F00F0F
+    a2 = bits & 0x0000F0F00000F0F0
+    a3 = bits & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _move_rows(bits, table):
+    return (table[bits & ROW_MASK]
+            | table[(bits >> 16) & ROW_MASK] << 16
+            | table[(bits >> 32) & ROW_MASK] << 32
+            | table[(bits >> 48) & ROW_MASK] << 48)
+
+
+def _zero_nibbles(bits, mask=NIBBLE_LOW_BITS):
+    # Bit 4*k is set for each 4-bit cell k that is 0 (among the
+    # cells whose low bit is in `mask`)
+    bits |= bits >> 2
+    bits |= bits >> 1
+    return ~bits & mask
+
+
+def start_game():
+    board = Board()
+
+    # printing controls for user
+    print("Commands are as follows : ")
+    print("'W' or 'w' : Move Up")
+    print("'S' or 's' : Move Down")
+    print("'A' or 'a' : Move Left")
+    print("'D' or 'd' : Move Right")
+
+    add_new_2(board)
+    return board
+
+
+def findEmpty(board):
+    """Finds the first empty (0) cell in the grid."""
+    empty = _zero_nibbles(board.bits)
+    if not empty:
+        return None, None
+    cell = ((empty & -empty).bit_length() - 1) // 4
+    return cell // 4, cell % 4
+
+
+def add_new_2(board):
+    """Adds a new '2' in a random empty cell in the grid, drawing the
+    same random numbers as Game.add_new_2."""
+    if not _zero_nibbles(board.bits):
+        return  # No empty space left
+
+    tries = 0
+    while tries < 30:
+        r = random.randint(0, 3)
+        c = random.randint(0, 3)
+        shift = 16 * r + 4 * c
+        if not (board.bits >> shift) & 0xF:
+            board.bits |= 1 << shift
+            return
+        tries += 1
+
+    r, c = findEmpty(board)
+    board.bits |= 1 << (16 * r + 4 * c)
+
+
+def get_current_state(board):
+    bits = board.bits
+
+    # a 2048 cell: its exponent xor 11 is 0
+    if _zero_nibbles(bits ^ (WIN_EXPONENT * NIBBLE_LOW_BITS)):
+        return 'WON'
+
+    if _zero_nibbles(bits):
+        return 'GAME NOT OVER'
+
+    # two equal neighbours in a row (columns 0-2 against the next
+    # one) or in a column (rows 0-2 against the next one)
+    if _zero_nibbles(bits ^ (bits >> 4), 0x0111011101110111):
+        return 'GAME NOT OVER'
+    if _zero_nibbles(bits ^ (bits >> 16), 0x0000111111111111):
+        return 'GAME NOT OVER'
+
+    return 'LOST'
+
+
+def move_left(board):
+    bits = _move_rows(board.bits, LEFT_TABLE)
+    return Board(bits), bits != board.bits
+
+
+def move_right(board):
+    bits = _move_rows(board.bits, RIGHT_TABLE)
+    return Board(bits), bits != board.bits
+
+
+def move_up(board):
+    # the columns are the rows of the transposed board
+    bits = transpose(_move_rows(transpose(board.bits), LEFT_TABLE))
+    return Board(bits), bits != board.bits
+
+
+def move_down(board):
+    bits = transpose(_move_rows(transpose(board.bits), RIGHT_TABLE))
+    return Board(bits), bits != board.bits
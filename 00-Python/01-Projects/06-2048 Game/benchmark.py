@@ -0,0 +1,42 @@
+import random
+import sys
+import time
+
+import Game
+import BitboardGame
+
+# Moves per second of Game (nested lists) and BitboardGame (64-bit
+# integer + row tables), for each move, on the same random boards.
+#
+# Run from this folder:
+#     python benchmark.py [boards]
+
+MOVES = ("move_left", "move_right", "move_up", "move_down")
+
+
+def moves_per_second(move, boards, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for board in boards:
+            move(board)
+        best = min(best, time.perf_counter() - start)
+    return len(boards) / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    mats = [[[0 if rng.random() < 0.4 else 2 ** rng.randint(1, 11) for _ in range(4)] for _ in range(4)]
+            for _ in range(count)]
+    boards = [BitboardGame.Board.from_list(mat) for mat in mats]
+
+    print(f"{count} random boards")
+    for name in MOVES + ("get_current_state",):
+        lists = moves_per_second(getattr(Game, name), mats)
+        bitboard = moves_per_second(getattr(BitboardGame, name), boards)
+        print(f"{name:>17}: lists {lists:12,.0f}/s | bitboard {bitboard:12,.0f}/s ({bitboard / lists:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
+import sys
 import Game
 
+# python main.py --bitboard : same game on the bitboard engine
+if '--bitboard' in sys.argv:
+    import BitboardGame as Game
+
 # Driver code
 if __name__ == '__main__':
     
@@ -0,0 +1,81 @@
+import random
+import sys
+import time
+
+import Game
+import BitboardGame
+
+# Checks BitboardGame against Game.
+#
+# Every one of the 65536 possible rows (4 cells of exponent 0 to 15)
+# is put in each of the 4 rows and each of the 4 columns of a board
+# whose other cells are random, and the board is moved in the 4
+# directions. Rows where Game would make a tile over 32768 (which
+# doesn't fit in 4 bits) are skipped. get_current_state, findEmpty
+# and add_new_2 (with the same random seed) are checked on random
+# boards.
+#
+# Run from this folder:
+#     python parity_check.py [random_boards]
+
+MOVES = ("move_left", "move_right", "move_up", "move_down")
+
+
+def random_board(rng, empty_share, max_exponent=15):
+    return [[0 if rng.random() < empty_share else 2 ** rng.randint(1, max_exponent) for _ in range(4)]
+            for _ in range(4)]
+
+
+def check_board(mat):
+    board = BitboardGame.Board.from_list(mat)
+    assert board.to_list() == mat
+    for move in MOVES:
+        expected, expected_changed = getattr(Game, move)([row[:] for row in mat])
+        if max(max(row) for row in expected) > 2 ** BitboardGame.MAX_EXPONENT:
+            continue
+        new_board, changed = getattr(BitboardGame, move)(board)
+        assert new_board.to_list() == expected and changed == expected_changed, f"{move} of {mat}"
+
+
+def check_rows(rng):
+    for row in range(65536):
+        cells = [2 ** ((row >> (4 * j)) & 0xF) if (row >> (4 * j)) & 0xF else 0 for j in range(4)]
+        for position in range(4):
+            mat = random_board(rng, 0.5)
+            mat[position] = cells[:]
+            check_board(mat)
+            check_board([list(column) for column in zip(*mat)])
+
+
+def check_random_boards(rng, count):
+    for n in range(count):
+        # from empty to full boards, with small tiles so that full boards can still move
+        mat = random_board(rng, rng.random() ** 2, rng.choice((3, 11, 15)))
+        board = BitboardGame.Board.from_list(mat)
+        check_board(mat)
+        assert BitboardGame.get_current_state(board) == Game.get_current_state(mat), f"state of {mat}"
+        assert BitboardGame.findEmpty(board) == Game.findEmpty(mat), f"empty cell of {mat}"
+
+        random.seed(n)
+        Game.add_new_2(mat)
+        random.seed(n)
+        BitboardGame.add_new_2(board)
+        assert board.to_list() == mat, f"add_new_2 on {mat}"
+
+
+def main():
+    random_boards = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+
+    start = time.perf_counter()
+    check_rows(rng)
+    print(f"65536 rows x 4 positions x 4 moves: same boards and flags ({time.perf_counter() - start:.1f} s)")
+
+    start = time.perf_counter()
+    check_random_boards(rng, random_boards)
+    print(f"{random_boards} random boards: same moves, states, empty cells and new tiles "
+          f"({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Throughput / latency of per-request prediction vs. the micro-batcher under concurrent clients.
+
+Run from the project folder:
+    python -m benchmarks.micro_batching [n_clients] [requests_per_client]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from src.utils.PatiantData import PatiantData
+from src.utils.batching import MicroBatcher
+from src.utils.config import BASE_DIR, LOG_CLF_MAX_BATCH_SIZE, LOG_CLF_MAX_WAIT_MS, artifacts
+from src.utils.inference import predict_batch, predict_new
+
+
+def load_patients():
+    df = pd.read_csv(os.path.join(BASE_DIR, "..", "dataset", "data.csv"))
+    df.columns = [col.replace(" ", "_") for col in df.columns]
+    return [PatiantData(**row) for row in df[list(PatiantData.model_fields)].to_dict(orient="records")]
+
+
+async def run_clients(predict, patients, n_clients: int, requests_per_client: int):
+    latencies = []
+
+    async def client(offset: int):
+        for i in range(requests_per_client):
+            patient = patients[(offset + i) % len(patients)]
+            start = time.perf_counter()
+            await predict(patient)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(offset) for offset in range(n_clients)])
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    return len(latencies) / total, statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+async def main():
+    n_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requests_per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    patients = load_patients()
+    preprocessor, log_clf_model = artifacts.preprocessor, artifacts.log_clf_model
+
+    # Same results from both paths (up to float rounding of the batched matrix products)
+    for batched, expected in zip(predict_batch(patients, preprocessor, log_clf_model),
+                                 [predict_new(patient, preprocessor, log_clf_model) for patient in patients]):
+        assert batched["Result"] == expected["Result"]
+        assert abs(batched["Malignant Probability"] - expected["Malignant Probability"]) < 1e-9
+
+    async def single(patient):
+        return predict_new(data=patient, preprocessor=preprocessor, model=log_clf_model)
+
+    batcher = MicroBatcher(lambda items: predict_batch(items, preprocessor, log_clf_model),
+                           max_batch_size=LOG_CLF_MAX_BATCH_SIZE, max_wait_ms=LOG_CLF_MAX_WAIT_MS)
+
+    for name, predict in (("per request", single), ("micro-batched", batcher.submit)):
+        throughput, p50, p99 = await run_clients(predict, patients, n_clients, requests_per_client)
+        print(f"{name:>13}: {throughput:9,.0f} req/s | latency p50 {p50 * 1e3:8.2f} ms, p99 {p99 * 1e3:8.2f} ms")
+
+    await batcher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,13 +1,49 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Response
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from src.utils.inference import predict_new
-from src.utils.config import APP_NAME, API_SECRET_KEY, VERSION, preprocessor, log_clf_model
-from src.utils.PatiantData import PatiantData
+from src.utils.inference import predict_batch, predict_records
+from src.utils.batching import MicroBatcher
+from src.utils.prediction_cache import create_prediction_cache
+from src.utils.config import APP_NAME, API_SECRET_KEY, VERSION, PRELOAD_ARTIFACTS, artifacts
+from src.utils.config import LOG_CLF_MAX_BATCH_SIZE, LOG_CLF_MAX_WAIT_MS
+from src.utils.config import PREDICTION_CACHE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_PATH
+from src.utils.config import PREPROCESSOR_PATH, LOG_CLF_MODEL_PATH
+from src.utils.PatiantData import PatiantData, PatiantBatch
 
 
-app = FastAPI(title=APP_NAME, version=VERSION)
+# Opt-in cache of the results, keyed by the patient data and the content of the .pkl files
+prediction_cache = create_prediction_cache(PREDICTION_CACHE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_SIZE,
+                                           PREDICTION_CACHE_PATH)
+
+
+def log_clf_predict(items):
+    return predict_batch(items, artifacts.preprocessor, artifacts.log_clf_model)
+
+
+if prediction_cache is not None:
+    # A changed .pkl invalidates its cache entries and is loaded again
+    log_clf_predict = prediction_cache.cached('log_clf', log_clf_predict, [PREPROCESSOR_PATH, LOG_CLF_MODEL_PATH],
+                                              on_version_change=lambda: artifacts.invalidate('preprocessor', 'log_clf_model'))
+
+# Concurrent requests are grouped into one transform + predict call
+# (the models are read from the registry in the worker thread, so a first load doesn't block the event loop)
+log_clf_batcher = MicroBatcher(log_clf_predict, max_batch_size=LOG_CLF_MAX_BATCH_SIZE, max_wait_ms=LOG_CLF_MAX_WAIT_MS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the models in the background: "/" answers right away, "/ready" once they are loaded
+    if PRELOAD_ARTIFACTS:
+        asyncio.get_running_loop().run_in_executor(None, artifacts.preload)
+    yield
+    await log_clf_batcher.close()
+
+
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +60,16 @@ async def home():
     }
 
 
+@app.get('/ready', tags=['General'])
+async def ready(response: Response):
+    if not artifacts.ready:
+        response.status_code = 503
+    return {
+        "ready": artifacts.ready,
+        "artifacts": artifacts.status()
+    }
+
+
 api_key_header = APIKeyHeader(name='X-API-Key')
 
 async def verify_api_key(api_key: str=Depends(api_key_header)):
@@ -32,11 +78,17 @@ async def verify_api_key(api_key: str=Depends(api_key_header)):
     return api_key
 
 
+@app.get('/cache', tags=['General'])
+async def cache_stats(api_key: str=Depends(verify_api_key)) -> dict:
+    if prediction_cache is None:
+        return {"backend": "off"}
+    return await run_in_threadpool(prediction_cache.stats)
+
 
 @app.post('/prdict/Logistic_clf', tags=['models'])
 async def predict_log_clf (data: PatiantData, api_key: str=Depends(verify_api_key)) -> dict:
     try:
-        result = predict_new(data=data, preprocessor=preprocessor, model=log_clf_model)
+        result = await log_clf_batcher.submit(data)
         return result
     
     except Exception as e:
@@ -44,3 +96,11 @@ async def predict_log_clf (data: PatiantData, api_key: str=Depends(verify_api_ke
     
 
 
+@app.post('/predict/Logistic_clf/batch', tags=['models'])
+async def predict_log_clf_batch(batch: PatiantBatch, api_key: str=Depends(verify_api_key)) -> dict:
+    try:
+        result = await run_in_threadpool(lambda: predict_records(batch.records, artifacts.preprocessor, artifacts.log_clf_model))
+        return result
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
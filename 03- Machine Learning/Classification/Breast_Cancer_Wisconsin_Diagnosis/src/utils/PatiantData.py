@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
 
 
 class PatiantData(BaseModel):
@@ -40,4 +41,14 @@ class PatiantData(BaseModel):
     concavity_mean: float
     
     # Worst (largest) concavity measurement
-    concavity_worst: float
\ No newline at end of file
+    concavity_worst: float
+
+
+class PatiantBatch(BaseModel):
+    """
+    Pydantic model for a batch of patients.
+    
+    The records are validated one by one against PatiantData by the batch endpoint,
+    so an invalid record is reported without rejecting the whole batch.
+    """
+    records: List[Dict[str, Any]] = Field(min_length=1)
@@ -0,0 +1,80 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def joblib_artifact(path: str) -> Callable[[], Any]:
+    # joblib (and the libraries of the pickled objects) are only imported when the artifact is loaded
+    def load():
+        import joblib
+        return joblib.load(path)
+    return load
+
+
+class ArtifactRegistry:
+    """
+    Model artifacts loaded on first use instead of at import time.
+
+    `register` only records how to load an artifact. The loader runs the first time the
+    artifact is read (`artifacts.name` or `artifacts.get("name")`), once, even when several
+    threads ask for it at the same time. `preload` loads everything ahead of time (on
+    application startup) and `ready` tells whether every required artifact is loaded.
+
+    An optional artifact (e.g. a model that isn't shipped) doesn't make the service unready,
+    only the code using it fails.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._optional = set()
+        self._values: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], optional: bool = False):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        if optional:
+            self._optional.add(name)
+
+    def get(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+
+        with self._locks[name]:
+            if name not in self._values:
+                try:
+                    self._values[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = f"{type(e).__name__}: {e}"
+                    raise
+                self._errors.pop(name, None)
+        return self._values[name]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name not in self._loaders:
+            raise AttributeError(f"No artifact named {name!r}")
+        return self.get(name)
+
+    def invalidate(self, *names: str):
+        # Dropped artifacts are loaded again (from their file) on next use
+        for name in names:
+            with self._locks[name]:
+                self._values.pop(name, None)
+
+    def preload(self, names: Optional[Iterable[str]] = None):
+        # Failures are kept in `status` instead of raised, so one missing file doesn't stop the others
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._values for name in self._loaders if name not in self._optional)
+
+    def status(self) -> Dict[str, str]:
+        return {
+            name: "loaded" if name in self._values else self._errors.get(name, "not loaded")
+            for name in self._loaders
+        }
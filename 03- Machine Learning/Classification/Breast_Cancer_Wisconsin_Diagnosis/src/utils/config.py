@@ -1,7 +1,7 @@
 # Import required libraries
 from dotenv import load_dotenv  # Load environment variables from .env file
 import os  # Operating system interface for file paths and environment variables
-import joblib  # Library for loading serialized machine learning models
+from src.utils.artifacts import ArtifactRegistry, joblib_artifact  # Lazy loading of the serialized models
 
 
 # Load environment variables from .env file
@@ -15,6 +15,23 @@ APP_NAME = os.getenv("APP_NAME")  # Application name for identification
 VERSION = os.getenv("VERSION")  # Current version of the application
 API_SECRET_KEY = os.getenv("API_SECRET_KEY")  # Secret key for API authentication/security
 
+# Micro-batching of the prediction endpoint
+# Concurrent requests are grouped into batches of at most LOG_CLF_MAX_BATCH_SIZE items,
+# the first request of a batch waits at most LOG_CLF_MAX_WAIT_MS milliseconds for the others
+LOG_CLF_MAX_BATCH_SIZE = int(os.getenv("LOG_CLF_MAX_BATCH_SIZE", "64"))
+LOG_CLF_MAX_WAIT_MS = float(os.getenv("LOG_CLF_MAX_WAIT_MS", "2"))
+
+# Load the models in the background when the application starts
+# If false, each model is loaded by the first request that needs it
+PRELOAD_ARTIFACTS = os.getenv("PRELOAD_ARTIFACTS", "true").lower() == "true"
+
+# Cache of the prediction results, in front of the model
+# off: no cache, memory: one cache per worker process, sqlite: one cache shared by the workers (PREDICTION_CACHE_PATH)
+# Entries expire after PREDICTION_CACHE_TTL seconds, the least recently used are dropped past PREDICTION_CACHE_SIZE
+PREDICTION_CACHE = os.getenv("PREDICTION_CACHE", "off").lower()
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+
 
 # Construct the base directory path
 # __file__ is the current script's path
@@ -25,12 +42,25 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Define the path to the models folder where trained models are stored
 MODELS_FOLDER_PATH = os.path.join(BASE_DIR, 'models')
 
+# Paths of the serialized preprocessor and model
+# The prediction cache hashes these files, so a new .pkl invalidates the cached results
+PREPROCESSOR_PATH = os.path.join(MODELS_FOLDER_PATH, 'preprocessor.pkl')
+LOG_CLF_MODEL_PATH = os.path.join(MODELS_FOLDER_PATH, 'log_clf.pkl')
+
+# SQLite file of the shared prediction cache (PREDICTION_CACHE=sqlite)
+PREDICTION_CACHE_PATH = os.getenv("PREDICTION_CACHE_PATH", os.path.join(BASE_DIR, 'prediction_cache.sqlite3'))
+
+
 
+# Registry of the models, nothing is read from disk when this module is imported
+# Each model is loaded the first time it is used (artifacts.preprocessor, artifacts.log_clf_model)
+# or ahead of time by artifacts.preload() on application startup
+artifacts = ArtifactRegistry()
 
-# Load the saved preprocessor object from disk
+# The saved preprocessor object
 # This contains the fitted scaler and imputer with learned statistics from training
-preprocessor = joblib.load(os.path.join(MODELS_FOLDER_PATH, 'preprocessor.pkl'))
+artifacts.register('preprocessor', joblib_artifact(PREPROCESSOR_PATH))
 
-# Load the trained Logistic Regression model from disk
+# The trained Logistic Regression model
 # This is the model that will make predictions on new data
-log_clf_model = joblib.load(os.path.join(MODELS_FOLDER_PATH, 'log_clf.pkl'))
\ No newline at end of file
+artifacts.register('log_clf_model', joblib_artifact(LOG_CLF_MODEL_PATH))
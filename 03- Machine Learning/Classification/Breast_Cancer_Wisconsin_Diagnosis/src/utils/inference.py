@@ -1,6 +1,46 @@
+import numpy as np
 import pandas as pd
+from typing import List, Tuple
+from pydantic import TypeAdapter, ValidationError
 from .PatiantData import PatiantData  # Import patient data model/schema
 
+# Malignant when the malignant probability is above the threshold
+# (the same decision model.predict makes for a binary classifier)
+THRESHOLD = 0.5
+
+# Validates a whole list of patients in one call
+patients_adapter = TypeAdapter(List[PatiantData])
+
+
+def to_frame(data: List[PatiantData]) -> pd.DataFrame:
+    """
+    Build the feature DataFrame column by column (no dictionary per patient).
+    
+    Args:
+        data (List[PatiantData]): Patient data objects containing feature values
+    
+    Returns:
+        pd.DataFrame: One row per patient, one column per feature
+    """
+    return pd.DataFrame({name: [getattr(patient, name) for patient in data] for name in PatiantData.model_fields})
+
+
+def malignant_probability(df: pd.DataFrame, preprocessor, model) -> np.ndarray:
+    """
+    Apply the preprocessing and score every row with a single predict_proba call.
+    
+    Returns:
+        np.ndarray: Probability of being malignant for each row
+    """
+    # Apply preprocessing transformations (imputation and scaling)
+    # Uses the same transformations learned during training to ensure consistency
+    x_processed = preprocessor.transform(df)
+
+    # predict_proba() returns [probability_benign, probability_malignant]
+    # The label is derived from it, so every row is scored only once
+    return model.predict_proba(x_processed)[:, 1]
+
+
 def predict_new(data: PatiantData, preprocessor, model):
     """
     Make a prediction for a new patient's diagnosis based on input features.
@@ -14,29 +54,89 @@ def predict_new(data: PatiantData, preprocessor, model):
         dict: Dictionary containing diagnosis result and malignant probability
     """
     
-    # Convert patient data object to pandas DataFrame
-    # model_dump() extracts data as dictionary, wrapped in list for single-row DataFrame
-    df = pd.DataFrame([data.model_dump()])
+    # Convert patient data object to a single-row DataFrame and score it
+    y_prob = malignant_probability(to_frame([data]), preprocessor, model)
 
-    # Apply preprocessing transformations (imputation and scaling)
-    # Uses the same transformations learned during training to ensure consistency
-    x_processed = preprocessor.transform(df)
-
-    # Make binary prediction (0: Benign, 1: Malignant)
-    # predict() returns the class label
-    y_predict = model.predict(x_processed)
-    
-    # Get prediction probabilities for both classes
-    # predict_proba() returns [probability_benign, probability_malignant]
-    y_prob = model.predict_proba(x_processed)
-
-    # Convert numerical prediction to human-readable diagnosis
-    # 1 = Malignant (cancerous), 0 = Benign (non-cancerous)
-    result_name = "Malignant" if y_predict[0] == 1 else "Benign"
+    # Convert the probability to human-readable diagnosis
+    # Above the threshold = Malignant (cancerous), otherwise Benign (non-cancerous)
+    result_name = "Malignant" if y_prob[0] > THRESHOLD else "Benign"
 
     # Return prediction results as dictionary
     # Includes diagnosis and confidence level (probability of malignancy)
     return {
         "Result": result_name,  # Diagnosis: "Benign" or "Malignant"
-        "Malignant Probability": float(y_prob[0][1])  # Probability of being malignant (0-1)
-    }
\ No newline at end of file
+        "Malignant Probability": float(y_prob[0])  # Probability of being malignant (0-1)
+    }
+
+
+def predict_batch(data: List[PatiantData], preprocessor, model) -> List[dict]:
+    """
+    Make predictions for a batch of patients with a single preprocessing and model call.
+    
+    Args:
+        data (List[PatiantData]): Patient data objects containing feature values
+        preprocessor: Fitted preprocessor (scaler/imputer) for data transformation
+        model: Trained classification model for making predictions
+    
+    Returns:
+        List[dict]: One dictionary per patient, same format as predict_new
+    """
+    
+    # Score the whole batch at once
+    y_prob = malignant_probability(to_frame(data), preprocessor, model)
+
+    return [
+        {
+            "Result": "Malignant" if prob > THRESHOLD else "Benign",
+            "Malignant Probability": float(prob)
+        }
+        for prob in y_prob
+    ]
+
+
+def validate_records(records: List[dict]) -> Tuple[List[int], List[PatiantData], List[dict]]:
+    """
+    Validate raw patient records, keeping the valid ones and reporting the invalid ones.
+    
+    Args:
+        records (List[dict]): Raw patient records from the request
+    
+    Returns:
+        tuple: Indexes of the valid records, their PatiantData objects, and the errors of the invalid records
+    """
+    try:
+        # Fast path: the whole list is valid
+        return list(range(len(records))), patients_adapter.validate_python(records), []
+    except ValidationError as e:
+        # Group the errors by row (the first item of the error location is the row index)
+        row_errors = {}
+        for error in e.errors(include_url=False, include_context=False):
+            index, *loc = error["loc"]
+            row_errors.setdefault(index, []).append({"loc": loc, "msg": error["msg"], "type": error["type"]})
+
+    # Validate again only the rows without errors
+    valid_indexes = [i for i in range(len(records)) if i not in row_errors]
+    valid = patients_adapter.validate_python([records[i] for i in valid_indexes])
+    errors = [{"index": index, "errors": row_errors[index]} for index in sorted(row_errors)]
+    return valid_indexes, valid, errors
+
+
+def predict_records(records: List[dict], preprocessor, model) -> dict:
+    """
+    Make predictions for a batch of raw patient records.
+    
+    Invalid records don't fail the batch, they are reported in "errors" with their index.
+    
+    Returns:
+        dict: Columnar results, one list per field ("index" is the position of the record in the request)
+    """
+    valid_indexes, valid, errors = validate_records(records)
+
+    y_prob = malignant_probability(to_frame(valid), preprocessor, model) if valid else np.empty(0)
+
+    return {
+        "index": valid_indexes,
+        "Result": np.where(y_prob > THRESHOLD, "Malignant", "Benign").tolist(),
+        "Malignant Probability": y_prob.tolist(),
+        "errors": errors
+    }
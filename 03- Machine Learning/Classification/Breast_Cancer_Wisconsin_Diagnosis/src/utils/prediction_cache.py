@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+
+def payload_key(data: BaseModel) -> str:
+    # The validated payload (types already coerced) with sorted keys, so equal payloads hash the same
+    canonical = json.dumps(data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ArtifactVersion:
+    """
+    Content hash of the artifact files a prediction depends on.
+
+    The files are only re-hashed when their size or modification time changes, so checking
+    the version costs one `os.stat` per file. A missing file is part of the version too.
+    """
+
+    def __init__(self, paths: Sequence[str]):
+        self.paths = list(paths)
+        self._stats: Optional[Tuple] = None
+        self._version = ""
+        self._lock = threading.Lock()
+
+    def _stat(self, path: str):
+        try:
+            stat = os.stat(path)
+            return stat.st_size, stat.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> str:
+        stats = tuple(self._stat(path) for path in self.paths)
+        with self._lock:
+            if stats != self._stats:
+                digest = hashlib.sha256()
+                for path, stat in zip(self.paths, stats):
+                    digest.update(os.path.basename(path).encode())
+                    if stat is not None:
+                        with open(path, "rb") as f:
+                            digest.update(f.read())
+                self._stats, self._version = stats, digest.hexdigest()[:16]
+            return self._version
+
+
+class MemoryBackend:
+    """In-process LRU with a TTL per entry."""
+
+    name = "memory"
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: float):
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self, prefix: str = ""):
+        # Only the keys starting with `prefix` (e.g. the entries of one model)
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    LRU with a TTL per entry in a SQLite file, shared by every worker on the machine.
+
+    Stands in for a shared cache server: the values are stored as JSON and expired entries
+    are ignored on read. Every `max_size // 100` entries a worker writes, the expired entries
+    are deleted and then the least recently used ones while the table is over `max_size`, so
+    a write doesn't count the table each time (it can go over `max_size` by that much per worker).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_size: int = 100_000):
+        self.path = path
+        self.max_size = max_size
+        self.trim_interval = max(1, max_size // 100)
+        self._written = 0
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call (the backend is used from worker threads), in a
+        # transaction committed on exit, then closed
+        with closing(sqlite3.connect(self.path, timeout=5)) as connection:
+            with connection:
+                yield connection
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT key, value FROM predictions WHERE key IN ({placeholders}) AND expires_at > ?", (*keys, now)
+            ).fetchall()
+            if rows:
+                connection.execute(
+                    f"UPDATE predictions SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                    (now, *[key for key, _ in rows])
+                )
+        return {key: json.loads(value) for key, value in rows}
+
+    def set_many(self, items: Dict[str, Any], ttl: float):
+        now = time.time()
+        with self._lock:
+            self._written += len(items)
+            trim = self._written >= self.trim_interval
+            if trim:
+                self._written = 0
+
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO predictions (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value), now + ttl, now) for key, value in items.items()]
+            )
+            if trim:
+                self._trim(connection, now)
+
+    def _trim(self, connection: sqlite3.Connection, now: float):
+        connection.execute("DELETE FROM predictions WHERE expires_at <= ?", (now,))
+        excess = connection.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_size
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM predictions WHERE key IN (SELECT key FROM predictions ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM predictions")
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM predictions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+
+class PredictionCache:
+    """
+    Cache of prediction results in front of a `predict_batch` function.
+
+    An entry is keyed by the model name, the hash of the validated payload and the version
+    (content hash) of the artifact files, so changing a `.pkl` invalidates every entry made
+    with the old file. Only the items of a batch that miss are sent to the model.
+
+    Args:
+        backend: `MemoryBackend` (per process) or `SQLiteBackend` (shared by the workers)
+        ttl: seconds an entry stays valid
+    """
+
+    def __init__(self, backend, ttl: float = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def cached(self, name: str, predict_batch: Callable[[List[BaseModel]], List[Any]],
+               artifact_paths: Sequence[str],
+               on_version_change: Optional[Callable[[], None]] = None) -> Callable[[List[BaseModel]], List[Any]]:
+        """
+        Wraps `predict_batch` of the model `name`, whose artifacts are the files `artifact_paths`.
+        `on_version_change` is called when one of the files changed, to reload the models: the
+        new entries must not be computed by the old models.
+        """
+        version = ArtifactVersion(artifact_paths)
+
+        def cached_predict_batch(items: List[BaseModel]) -> List[Any]:
+            current = version.current()
+            if self._versions.get(name, current) != current:
+                if on_version_change is not None:
+                    on_version_change()
+                if isinstance(self.backend, MemoryBackend):
+                    # The entries of the old version of this model can't be hit anymore, free them right away
+                    self.backend.clear(prefix=f"{name}:")
+            self._versions[name] = current
+
+            keys = [f"{name}:{current}:{payload_key(item)}" for item in items]
+            found = self.backend.get_many(list(set(keys)))
+
+            # Each distinct missing payload is predicted once, even if it is repeated in the batch
+            missing = {key: item for key, item in zip(keys, items) if key not in found}
+            if missing:
+                results = predict_batch(list(missing.values()))
+                computed = dict(zip(missing, results))
+                self.backend.set_many(computed, self.ttl)
+                found.update(computed)
+
+            with self._lock:
+                self.misses += len(missing)
+                self.hits += len(items) - len(missing)
+            return [found[key] for key in keys]
+
+        return cached_predict_batch
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.backend),
+            "ttl": self.ttl,
+            "versions": dict(self._versions),
+        }
+
+
+CACHE_BACKENDS = ("off", "memory", "sqlite")
+
+
+def create_prediction_cache(backend: str, ttl: float, max_size: int, path: str) -> Optional[PredictionCache]:
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown prediction cache {backend!r}, expected one of {CACHE_BACKENDS}")
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return PredictionCache(MemoryBackend(max_size), ttl)
+    return PredictionCache(SQLiteBackend(path, max_size), ttl)
@@ -1,12 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
-from utils.inference import predict_new
-from utils.config import APP_NAME, VERSION, SECRET_KEY_TOKEN, preprocessor, forest_model, xgboost_model
-from utils.CustomerData import CustomerData
+from starlette.concurrency import run_in_threadpool
+from utils.inference import predict_batch, predict_records
+from utils.batching import MicroBatcher
+from utils.prediction_cache import create_prediction_cache
+from utils.compact_response import COMPACT_RESPONSES, CompactResponse, wants_compact
+from utils.config import APP_NAME, VERSION, SECRET_KEY_TOKEN, PRELOAD_ARTIFACTS, artifacts
+from utils.config import FOREST_MAX_BATCH_SIZE, FOREST_MAX_WAIT_MS, XGBOOST_MAX_BATCH_SIZE, XGBOOST_MAX_WAIT_MS
+from utils.config import PREDICTION_CACHE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_PATH
+from utils.config import preprocessor_path, forest_model_path, xgboost_model_path
+from utils.CustomerData import CustomerData, CustomerBatch
 
 
-app = FastAPI(title=APP_NAME, version=VERSION)
+# Opt-in cache of the results, keyed by the customer data and the content of the .pkl files
+prediction_cache = create_prediction_cache(PREDICTION_CACHE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_SIZE,
+                                           PREDICTION_CACHE_PATH)
+
+
+def cached(name, predict, artifacts_names, artifact_paths):
+    # A changed .pkl invalidates its cache entries and is loaded again
+    if prediction_cache is None:
+        return predict
+    return prediction_cache.cached(name, predict, artifact_paths,
+                                   on_version_change=lambda: artifacts.invalidate(*artifacts_names))
+
+
+# Concurrent requests are grouped into one transform + predict call per model
+# (the models are read from the registry in the worker thread, so a first load doesn't block the event loop)
+forest_predict = cached('forest', lambda items: predict_batch(items, artifacts.preprocessor, artifacts.forest_model),
+                        ['preprocessor', 'forest_model'], [preprocessor_path, forest_model_path])
+xgboost_predict = cached('xgboost', lambda items: predict_batch(items, artifacts.preprocessor, artifacts.xgboost_model),
+                         ['preprocessor', 'xgboost_model'], [preprocessor_path, xgboost_model_path])
+
+forest_batcher = MicroBatcher(forest_predict, max_batch_size=FOREST_MAX_BATCH_SIZE, max_wait_ms=FOREST_MAX_WAIT_MS)
+xgboost_batcher = MicroBatcher(xgboost_predict, max_batch_size=XGBOOST_MAX_BATCH_SIZE, max_wait_ms=XGBOOST_MAX_WAIT_MS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the models in the background: "/" answers right away, "/ready" once they are loaded
+    if PRELOAD_ARTIFACTS:
+        asyncio.get_running_loop().run_in_executor(None, artifacts.preload)
+    yield
+    await forest_batcher.close()
+    await xgboost_batcher.close()
+
+
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +66,16 @@ async def home():
     }
 
 
+@app.get('/ready', tags=['General'])
+async def ready(response: Response):
+    if not artifacts.ready:
+        response.status_code = 503
+    return {
+        "ready": artifacts.ready,
+        "artifacts": artifacts.status()
+    }
+
+
 
 
 
@@ -34,13 +87,22 @@ async def verify_api_key(api_key: str=Depends(api_key_header)):
     return api_key
 
 
+@app.get('/cache', tags=['General'])
+async def cache_stats(api_key: str=Depends(verify_api_key)) -> dict:
+    if prediction_cache is None:
+        return {"backend": "off"}
+    return await run_in_threadpool(prediction_cache.stats)
+
+
 @app.post('/predict/forest', tags=['Models'])
 async def predict_forest(data: CustomerData, api_key: str=Depends(verify_api_key)) -> dict:
 
     try:
-        result = predict_new(data=data, preprocessor=preprocessor, model=forest_model)
+        result = await forest_batcher.submit(data)
         return result
     
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="The Random Forest model is not available")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -50,8 +112,36 @@ async def predict_forest(data: CustomerData, api_key: str=Depends(verify_api_key
 async def predict_xgboost(data: CustomerData, api_key: str=Depends(verify_api_key)) -> dict:
 
     try:
-        result = predict_new(data=data, preprocessor=preprocessor, model=xgboost_model)
+        result = await xgboost_batcher.submit(data)
         return result
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+
+@app.post('/predict/forest/batch', tags=['Models'], responses=COMPACT_RESPONSES)
+async def predict_forest_batch(batch: CustomerBatch, request: Request, api_key: str=Depends(verify_api_key)) -> dict:
+
+    try:
+        compact = wants_compact(request)
+        result = await run_in_threadpool(lambda: predict_records(batch.records, artifacts.preprocessor, artifacts.forest_model, compact))
+        return CompactResponse(result) if compact else result
+    
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="The Random Forest model is not available")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+
+@app.post('/predict/xgboost/batch', tags=['Models'], responses=COMPACT_RESPONSES)
+async def predict_xgboost_batch(batch: CustomerBatch, request: Request, api_key: str=Depends(verify_api_key)) -> dict:
+
+    try:
+        compact = wants_compact(request)
+        result = await run_in_threadpool(lambda: predict_records(batch.records, artifacts.preprocessor, artifacts.xgboost_model, compact))
+        return CompactResponse(result) if compact else result
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Any, Dict, List, Literal
 
 class CustomerData(BaseModel):
     CreditScore: int = Field(description="Credit score of the customer")
@@ -12,4 +12,7 @@ class CustomerData(BaseModel):
     HasCrCard: Literal[0, 1] = Field(description="Has credit card (0=No, 1=Yes)")
     IsActiveMember: Literal[0, 1] = Field(description="Active member status (0=No, 1=Yes)")
     EstimatedSalary: float = Field(ge=0, description="EstimatedSalary annual salary")
-    
\ No newline at end of file
+
+
+class CustomerBatch(BaseModel):
+    records: List[Dict[str, Any]] = Field(min_length=1, description="Customers to score, each one is validated separately")
@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 import os
-import joblib
+from utils.artifacts import ArtifactRegistry, joblib_artifact, mmap_artifact
 
 
 load_dotenv(override=True)
@@ -10,6 +10,23 @@ APP_NAME = os.getenv('APP_NAME')
 VERSION = os.getenv('VERSION')
 SECRET_KEY_TOKEN =os.getenv('SECRET_KEY_TOKEN')
 
+# Micro-batching of the prediction endpoints (max items per batch, max wait in ms)
+FOREST_MAX_BATCH_SIZE = int(os.getenv('FOREST_MAX_BATCH_SIZE', '64'))
+FOREST_MAX_WAIT_MS = float(os.getenv('FOREST_MAX_WAIT_MS', '2'))
+XGBOOST_MAX_BATCH_SIZE = int(os.getenv('XGBOOST_MAX_BATCH_SIZE', '64'))
+XGBOOST_MAX_WAIT_MS = float(os.getenv('XGBOOST_MAX_WAIT_MS', '2'))
+
+# Load the models in the background on startup (otherwise on the first request)
+PRELOAD_ARTIFACTS = os.getenv('PRELOAD_ARTIFACTS', 'true').lower() == 'true'
+
+# Memory-map the arrays of the models, so that the workers share one copy of them
+MMAP_ARTIFACTS = os.getenv('MMAP_ARTIFACTS', 'true').lower() == 'true'
+
+# Cache of the predictions of /predict/forest and /predict/xgboost: off, memory (per worker) or sqlite (shared)
+PREDICTION_CACHE = os.getenv('PREDICTION_CACHE', 'off').lower()
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '300'))
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+
 
 
 
@@ -17,6 +34,10 @@ SECRET_KEY_TOKEN =os.getenv('SECRET_KEY_TOKEN')
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODELS_FOLDER_PATH = os.path.join(BASE_DIR, "models")
+# Memory-mappable copies of the models (written on first load)
+ARTIFACT_STORE_PATH = os.getenv('ARTIFACT_STORE_PATH', os.path.join(MODELS_FOLDER_PATH, 'mmap'))
+# SQLite file of the shared prediction cache
+PREDICTION_CACHE_PATH = os.getenv('PREDICTION_CACHE_PATH', os.path.join(BASE_DIR, 'prediction_cache.sqlite3'))
 
 # Models
 
@@ -24,6 +45,13 @@ preprocessor_path = os.path.join(MODELS_FOLDER_PATH, 'preprocessor.pkl')
 forest_model_path = os.path.join(MODELS_FOLDER_PATH, 'forest_tuned.pkl')
 xgboost_model_path = os.path.join(MODELS_FOLDER_PATH, 'xgb-tuned.pkl')
 
-preprocessor = joblib.load(preprocessor_path)
-forest_model = joblib.load(forest_model_path)
-xgboost_model = joblib.load(xgboost_model_path)
\ No newline at end of file
+# Loaded on first use (artifacts.preprocessor, ...), not when this module is imported
+artifacts = ArtifactRegistry()
+load_artifact = (lambda path: mmap_artifact(path, ARTIFACT_STORE_PATH)) if MMAP_ARTIFACTS else joblib_artifact
+
+artifacts.register('preprocessor', load_artifact(preprocessor_path))
+# The XGBoost booster is a C++ object, rebuilt in every process whatever the format of the file
+artifacts.register('xgboost_model', joblib_artifact(xgboost_model_path))
+# forest_tuned.pkl isn't shipped with the repo, the service is ready without it
+# (the trees of a forest are NumPy arrays, they are shared when memory-mapped)
+artifacts.register('forest_model', load_artifact(forest_model_path), optional=True)
@@ -1,20 +1,86 @@
+import numpy as np
 import pandas as pd 
+from typing import List, Tuple
+from pydantic import TypeAdapter, ValidationError
 from .CustomerData import CustomerData
 
+# Churn when the churn probability is above the threshold (what model.predict does for binary models)
+THRESHOLD = 0.5
 
-def predict_new(data: CustomerData, preprocessor, model):
+customers_adapter = TypeAdapter(List[CustomerData])
+
+
+def to_frame(data: List[CustomerData]) -> pd.DataFrame:
+    # Column-wise, without a dict per customer
+    return pd.DataFrame({name: [getattr(customer, name) for customer in data] for name in CustomerData.model_fields})
 
-    # to DF 
-    df = pd.DataFrame([data.model_dump()])
 
-    # transform 
+def churn_probability(df: pd.DataFrame, preprocessor, model) -> np.ndarray:
+    # transform + one predict_proba call, the label is derived from the probability
     x_processed = preprocessor.transform(df)
+    return model.predict_proba(x_processed)[:, 1]
+
+
+def predict_new(data: CustomerData, preprocessor, model):
+
+    # to DF + predict 
+    y_prob = churn_probability(to_frame([data]), preprocessor, model)
+
+    return {
+        "Churn_prediction": bool(y_prob[0] > THRESHOLD),
+        "Churn_probability": float(y_prob[0])
+    }
+
+
+def predict_batch(data: List[CustomerData], preprocessor, model) -> List[dict]:
+
+    # one call for the whole batch
+    y_prob = churn_probability(to_frame(data), preprocessor, model)
+
+    return [
+        {
+            "Churn_prediction": bool(prob > THRESHOLD),
+            "Churn_probability": float(prob)
+        }
+        for prob in y_prob
+    ]
+
+
+def validate_records(records: List[dict]) -> Tuple[List[int], List[CustomerData], List[dict]]:
+    ''' Validates the records in one pass, returns the indexes and objects of the valid ones and the per-row errors '''
+    try:
+        return list(range(len(records))), customers_adapter.validate_python(records), []
+    except ValidationError as e:
+        row_errors = {}
+        for error in e.errors(include_url=False, include_context=False):
+            index, *loc = error["loc"]
+            row_errors.setdefault(index, []).append({"loc": loc, "msg": error["msg"], "type": error["type"]})
+
+    valid_indexes = [i for i in range(len(records)) if i not in row_errors]
+    valid = customers_adapter.validate_python([records[i] for i in valid_indexes])
+    errors = [{"index": index, "errors": row_errors[index]} for index in sorted(row_errors)]
+    return valid_indexes, valid, errors
+
+
+def predict_records(records: List[dict], preprocessor, model, compact: bool = False) -> dict:
+    ''' Scores a batch of raw records, invalid rows are reported in "errors" instead of failing the batch '''
+    valid_indexes, valid, errors = validate_records(records)
+
+    y_prob = churn_probability(to_frame(valid), preprocessor, model) if valid else np.empty(0)
 
-    # predict 
-    y_predict = model.predict(x_processed)
-    y_prob = model.predict_proba(x_processed)
+    # compact: the same columns as NumPy arrays, encoded as they are by CompactResponse
+    if compact:
+        return {
+            "index": np.asarray(valid_indexes, dtype=np.int64),
+            "Churn_prediction": y_prob > THRESHOLD,
+            "Churn_probability": y_prob.astype(np.float64, copy=False),  # same digits as the default response
+            "errors": errors
+        }
 
+    # columnar response: one list per field, "index" is the position of the row in the request
     return {
-        "Churn_prediction": bool(y_predict[0]),
-        "Churn_probability": float(y_prob[0][1])
-    }
\ No newline at end of file
+        "index": valid_indexes,
+        "Churn_prediction": (y_prob > THRESHOLD).tolist(),
+        "Churn_probability": y_prob.tolist(),
+        "errors": errors
+    }
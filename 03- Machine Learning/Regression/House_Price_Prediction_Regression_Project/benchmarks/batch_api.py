@@ -0,0 +1,57 @@
+"""
+Per-house cost of `/api/predict` as the batch size grows (Flask test client, no network).
+
+Run from the project folder:
+    python -m benchmarks.batch_api [n_houses]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils"))
+
+from build_pipeline import FILE_PATH
+from router import app, model
+from utils import RAW_FEATURES, preprocess_new
+
+
+def load_houses():
+    df = pd.read_csv(FILE_PATH)
+    df = df[RAW_FEATURES + ["ocean_proximity"]].astype(object)
+    # JSON has no NaN, a missing total_bedrooms is sent as null
+    return df.where(df.notna(), None).to_dict(orient="records")
+
+
+def main():
+    n_houses = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    houses = load_houses()[:n_houses]
+    client = app.test_client()
+
+    # Same predictions as the pandas pipeline + one model.predict on the whole batch
+    response = client.post("/api/predict", json=houses)
+    assert response.status_code == 200, response.json
+    X = pd.DataFrame(houses).astype({col: np.float64 for col in RAW_FEATURES})
+    X["ocean_proximity"] = X["ocean_proximity"].replace("<1H OCEAN", "1H OCEAN")
+    X["rooms_per_household"] = X["total_rooms"] / X["households"]
+    X["bedroms_per_rooms"] = X["total_bedrooms"] / X["total_rooms"]
+    X["population_per_household"] = X["population"] / X["households"]
+    assert np.array_equal(np.array(response.json["predictions"], dtype=np.float32), model.predict(preprocess_new(X)))
+
+    for batch_size in (1, 10, 100, 1000, 10_000):
+        batches = [houses[i:i + batch_size] for i in range(0, n_houses, batch_size)]
+        batches = batches[:max(1, 1000 // batch_size)] if batch_size < 100 else batches
+
+        start = time.perf_counter()
+        for batch in batches:
+            client.post("/api/predict", json=batch)
+        elapsed = time.perf_counter() - start
+
+        n_rows = sum(len(batch) for batch in batches)
+        print(f"batch {batch_size:>6}: {elapsed / n_rows * 1e6:9.1f} us/house ({n_rows / elapsed:10,.0f} houses/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Latency of one `/predict` preprocessing: pandas + FeatureUnion (`preprocess_new`) vs. the NumPy plan (`preprocess_one`).
+
+Run from the project folder:
+    python -m benchmarks.inference_plan [n_instances]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils"))
+
+from build_pipeline import load_train_test
+from utils import preprocess_new, preprocess_one
+
+
+def time_per_call(preprocess, instances):
+    start = time.perf_counter()
+    for instance in instances:
+        preprocess(instance)
+    return (time.perf_counter() - start) / len(instances)
+
+
+def main():
+    n_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    X_train, X_test = load_train_test()
+    X = pd.concat([X_train, X_test])
+
+    # Same features for the whole dataset, one instance at a time
+    records = X.to_dict(orient="records")
+    assert np.array_equal(np.vstack([preprocess_one(record) for record in records]), preprocess_new(X))
+
+    records = records[:n_instances]
+    frames = [pd.DataFrame({col: [value] for col, value in record.items()}) for record in records]
+
+    pandas_time = time_per_call(preprocess_new, frames)
+    plan_time = time_per_call(preprocess_one, records)
+    print(f"preprocess_new (pandas): {pandas_time * 1e6:8.1f} us/instance")
+    print(f"preprocess_one (NumPy):  {plan_time * 1e6:8.1f} us/instance ({pandas_time / plan_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
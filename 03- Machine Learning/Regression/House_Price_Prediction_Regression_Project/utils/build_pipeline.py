@@ -0,0 +1,134 @@
+## Build step -- fit the preprocessing pipeline once and save it next to the model
+## Run it from the project folder every time the dataset or the pipeline changes:
+##      python utils/build_pipeline.py            --> fit, save and check parity
+##      python utils/build_pipeline.py --check    --> only check the saved pipeline against a refit
+
+## Major Libraries
+import argparse
+import hashlib
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+## sklearn -- for pipeline and preprocessing
+from sklearn.model_selection import train_test_split
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.pipeline import Pipeline, FeatureUnion
+from sklearn_features.transformers import DataFrameSelector
+from inference_plan import InferencePlan
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FILE_PATH = os.path.join(BASE_DIR, '..', 'dataset', 'housing.csv')
+PIPELINE_PATH = os.path.join(BASE_DIR, '..', 'model', 'total_pipeline.pkl')
+
+
+def dataset_hash(file_path=FILE_PATH):
+    ''' SHA-256 of the dataset file, saved with the pipeline to detect a changed dataset '''
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def load_train_test(file_path=FILE_PATH):
+    ''' Reads the dataset, does the Feature Engineering and returns (X_train, X_test) '''
+    df = pd.read_csv(file_path)
+
+    ## Replace the  (<1H OCEAN) to (1H OCEAN) -- will cause ane errors in Deploymnet
+    df['ocean_proximity'] = df['ocean_proximity'].replace('<1H OCEAN', '1H OCEAN')
+
+    ## Try to make some Feature Engineering --> Feature Extraction --> Add the new column to the main DF
+    df['rooms_per_household'] = df['total_rooms'] / df['households']
+    df['bedroms_per_rooms'] = df['total_bedrooms'] / df['total_rooms']
+    df['population_per_household'] = df['population'] / df['households']
+
+    ## Split the Dataset -- Taking only train to fit (the same the model was trained on)
+    X = df.drop(columns=['median_house_value'], axis=1)   ## Features
+
+    ## the same Random_state (take care)
+    X_train, X_test = train_test_split(X, test_size=0.15, shuffle=True, random_state=42)
+    return X_train, X_test
+
+
+def make_pipeline(X_train):
+    ''' The (not fitted) FeatureUnion of the numerical and categorical pipelines '''
+    ## Separete the columns according to type (numerical or categorical)
+    num_cols = [col for col in X_train.columns if X_train[col].dtype in ['float32', 'float64', 'int32', 'int64']]
+    categ_cols = [col for col in X_train.columns if X_train[col].dtype not in ['float32', 'float64', 'int32', 'int64']]
+
+    ## numerical pipeline
+    num_pipeline = Pipeline([
+                            ('selector', DataFrameSelector(num_cols)),    ## select only these columns
+                            ('imputer', SimpleImputer(strategy='median')),
+                            ('scaler', StandardScaler())
+                            ])
+
+    ## categorical pipeline
+    categ_pipeline = Pipeline(steps=[
+                ('selector', DataFrameSelector(categ_cols)),    ## select only these columns
+                ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+                ('OHE', OneHotEncoder(sparse_output=False))])
+
+    ## concatenate both two pipelines
+    return FeatureUnion(transformer_list=[
+                                        ('num_pipe', num_pipeline),
+                                        ('categ_pipe', categ_pipeline)
+                                        ]
+                        )
+
+
+def check_parity(pipeline, X_train, X_test):
+    ''' Raises if `pipeline` (or its inference plan) doesn't give exactly the same features as a fresh refit '''
+    refit = make_pipeline(X_train)
+    X_train_refit = refit.fit_transform(X_train)
+    plan = InferencePlan(pipeline)
+
+    for name, X, expected in (('train', X_train, X_train_refit), ('test', X_test, refit.transform(X_test))):
+        if not np.array_equal(pipeline.transform(X), expected):
+            raise RuntimeError(f'The saved pipeline differs from a refit on the {name} split, '
+                               'run `python utils/build_pipeline.py` again')
+
+        ## The NumPy fast path used by the app, row by row and vectorized
+        X_plan = np.vstack([plan.transform_one(row) for row in X.to_dict(orient='records')])
+        if not (np.array_equal(X_plan, expected) and np.array_equal(plan.transform(X), expected)):
+            raise RuntimeError(f'The inference plan differs from the pipeline on the {name} split')
+
+
+def build(file_path=FILE_PATH, pipeline_path=PIPELINE_PATH):
+    X_train, X_test = load_train_test(file_path)
+    total_pipeline = make_pipeline(X_train)
+    total_pipeline.fit(X_train)
+
+    joblib.dump({'pipeline': total_pipeline,
+                 'dataset_sha256': dataset_hash(file_path),
+                 'sklearn_version': sklearn.__version__}, pipeline_path)
+
+    ## Check what was written to disk, not the object in memory
+    check_parity(joblib.load(pipeline_path)['pipeline'], X_train, X_test)
+
+
+def check(file_path=FILE_PATH, pipeline_path=PIPELINE_PATH):
+    artifact = joblib.load(pipeline_path)
+    if artifact['dataset_sha256'] != dataset_hash(file_path):
+        raise RuntimeError(f'{file_path} changed since the pipeline was built, '
+                           'run `python utils/build_pipeline.py` again')
+
+    X_train, X_test = load_train_test(file_path)
+    check_parity(artifact['pipeline'], X_train, X_test)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fit and save the House Price preprocessing pipeline')
+    parser.add_argument('--check', action='store_true', help='only check the saved pipeline against a refit')
+    args = parser.parse_args()
+
+    if args.check:
+        check()
+        print(f'{os.path.normpath(PIPELINE_PATH)} matches a refit on the current dataset')
+    else:
+        build()
+        print(f'Saved {os.path.normpath(PIPELINE_PATH)} (parity with a refit checked)')
@@ -0,0 +1,99 @@
+## Major Libraries
+import numpy as np
+
+
+class InferencePlan:
+    ''' The fitted `total_pipeline` compiled to plain NumPy arrays
+
+    The FeatureUnion only does: select columns --> impute (median) --> scale, and
+    select column --> impute (constant) --> One-Hot-Encode. Those are a few array ops,
+    so a single prediction doesn't need to go through pandas and sklearn at all.
+    The result is the same (bit for bit) as `preprocess_new`.
+    '''
+
+    def __init__(self, total_pipeline):
+        num_pipeline = dict(total_pipeline.transformer_list)['num_pipe']
+        categ_pipeline = dict(total_pipeline.transformer_list)['categ_pipe']
+        num_imputer, scaler = num_pipeline.named_steps['imputer'], num_pipeline.named_steps['scaler']
+        categ_imputer, ohe = categ_pipeline.named_steps['imputer'], categ_pipeline.named_steps['OHE']
+
+        ## Only what the pipeline in build_pipeline.py does is supported
+        if (num_imputer.strategy != 'median' or categ_imputer.strategy != 'constant'
+                or ohe.drop is not None or ohe.handle_unknown != 'error' or len(ohe.categories_) != 1):
+            raise ValueError('The pipeline has steps the inference plan does not support')
+
+        ## Numerical part
+        self.num_cols = list(num_pipeline.named_steps['selector']._key)
+        self.medians = num_imputer.statistics_.astype(np.float64)
+        self.means = scaler.mean_ if scaler.with_mean else np.zeros(len(self.num_cols))
+        self.scales = scaler.scale_ if scaler.with_std else np.ones(len(self.num_cols))
+
+        ## Categorical part -- the index of every category in the One-Hot vector
+        self.categ_col = categ_pipeline.named_steps['selector']._key[0]
+        self.fill_value = categ_imputer.fill_value
+        self.categories = {category: i for i, category in enumerate(ohe.categories_[0])}
+
+        self.n_features = len(self.num_cols) + len(self.categories)
+
+    def _category_index(self, value):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            value = self.fill_value
+        try:
+            return self.categories[value]
+        except KeyError:
+            raise ValueError(f'Unknown category {value!r} for {self.categ_col!r}, '
+                             f'expected one of {list(self.categories)}') from None
+
+    @staticmethod
+    def _check_finite(num):
+        ## SimpleImputer rejects infinite values (e.g. a ratio with a zero denominator), so does the plan
+        if not np.isfinite(num).all():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float64').")
+
+    def transform_one(self, features):
+        ''' Model input (1, n_features) of one instance
+
+        Args:
+        *****
+            (features: dict) --> column name: value, for every column of `preprocess_new`
+
+        Returns:
+        *******
+            2D array ready to make inference by the Model
+        '''
+        X = np.empty((1, self.n_features), dtype=np.float64)
+        n_num = len(self.num_cols)
+
+        ## Same operations (and order) as SimpleImputer + StandardScaler
+        num = np.array([features[col] for col in self.num_cols], dtype=np.float64)
+        num = np.where(np.isnan(num), self.medians, num)
+        self._check_finite(num)
+        num -= self.means
+        num /= self.scales
+        X[0, :n_num] = num
+
+        X[0, n_num:] = 0.0
+        X[0, n_num + self._category_index(features[self.categ_col])] = 1.0
+        return X
+
+    def transform(self, columns):
+        ''' Vectorized version of `transform_one`
+
+        Args:
+        *****
+            (columns: DataFrame or dict) --> column name: 1D array of values, the same columns as `preprocess_new`
+        '''
+        n_rows = len(columns[self.categ_col])
+        X = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        n_num = len(self.num_cols)
+
+        num = np.column_stack([np.asarray(columns[col], dtype=np.float64) for col in self.num_cols])
+        num = np.where(np.isnan(num), self.medians, num)
+        self._check_finite(num)
+        num -= self.means
+        num /= self.scales
+        X[:, :n_num] = num
+
+        indices = [self._category_index(value) for value in columns[self.categ_col]]
+        X[np.arange(n_rows), n_num + np.array(indices, dtype=np.intp)] = 1.0
+        return X
@@ -1,11 +1,10 @@
 # Import the Libraries
 import numpy as np
-import pandas as pd
-from flask import Flask, redirect, render_template, request
+from flask import Flask, jsonify, redirect, render_template, request
 import joblib
 import os
 # the function I craeted to process the data in utils.py
-from utils import preprocess_new
+from utils import preprocess_batch, preprocess_one
 
 
 # Intialize the Flask APP
@@ -20,6 +19,9 @@ app = Flask(
 model_path = os.path.join(os.path.dirname(__file__), '../model/model_XGBoost.pkl')
 model = joblib.load(model_path)
 
+# Maximum number of houses in one call of /api/predict
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 10_000))
+
 
 # Route for Home page
 
@@ -50,14 +52,14 @@ def predict():
         pop_per_hold = pop / hold
 
         # Concatenate all Inputs
-        X_new = pd.DataFrame({'longitude': [long], 'latitude': [latit], 'housing_median_age': [med_age], 'total_rooms': [total_rooms],
-                              'total_bedrooms': [total_bedrooms], 'population': [pop], 'households': [hold], 'median_income': [income],
-                              'ocean_proximity': [ocean], 'rooms_per_household': [rooms_per_hold], 'bedroms_per_rooms': bedroms_per_rooms,
-                              'population_per_household': [pop_per_hold]
-                              })
+        X_new = {'longitude': long, 'latitude': latit, 'housing_median_age': med_age, 'total_rooms': total_rooms,
+                 'total_bedrooms': total_bedrooms, 'population': pop, 'households': hold, 'median_income': income,
+                 'ocean_proximity': ocean, 'rooms_per_household': rooms_per_hold, 'bedroms_per_rooms': bedroms_per_rooms,
+                 'population_per_household': pop_per_hold
+                 }
 
-        # Call the Function and Preprocess the New Instances
-        X_processed = preprocess_new(X_new)
+        # Call the Function and Preprocess the New Instance (NumPy fast path, same output as preprocess_new)
+        X_processed = preprocess_one(X_new)
 
         # call the Model and predict
         y_pred_new = model.predict(X_processed)
@@ -68,6 +70,30 @@ def predict():
         return render_template('predict.html')
 
 
+# Route for the JSON API -- one house (object) or many houses (list of objects)
+@app.route('/api/predict', methods=['POST'])
+def api_predict():
+    payload = request.get_json(silent=True)
+    single = isinstance(payload, dict)
+    records = [payload] if single else payload
+
+    if not isinstance(records, list) or not records or not all(isinstance(record, dict) for record in records):
+        return jsonify({'error': 'Expected a JSON object (one house) or a non-empty list of objects'}), 400
+    if len(records) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} houses per request'}), 400
+
+    try:
+        # Feature Engineering and preprocessing on whole columns, then a single call of the Model
+        X_processed = preprocess_batch(records)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    y_pred = model.predict(X_processed).tolist()
+    if single:
+        return jsonify({'prediction': y_pred[0]})
+    return jsonify({'predictions': y_pred})
+
+
 # Route for About page
 @app.route('/about')
 def about():
@@ -1,61 +1,29 @@
 ## Major Libraries
-import pandas as pd
 import os
-## sklearn -- for pipeline and preprocessing
-from sklearn.model_selection import train_test_split
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.pipeline import Pipeline, FeatureUnion
-from sklearn_features.transformers import DataFrameSelector
-
-
-## Read the CSV file using pandas
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-FILE_PATH = os.path.join(BASE_DIR, '..', 'dataset', 'housing.csv')
-df = pd.read_csv(FILE_PATH)
-
-## Replace the  (<1H OCEAN) to (1H OCEAN) -- will cause ane errors in Deploymnet
-df['ocean_proximity'] = df['ocean_proximity'].replace('<1H OCEAN', '1H OCEAN')
-
-## Try to make some Feature Engineering --> Feature Extraction --> Add the new column to the main DF
-df['rooms_per_household'] = df['total_rooms'] / df['households']
-df['bedroms_per_rooms'] = df['total_bedrooms'] / df['total_rooms']
-df['population_per_household'] = df['population'] / df['households']
-
-
-## Split the Dataset -- Taking only train to fit (the same the model was trained on)
-X = df.drop(columns=['median_house_value'], axis=1)   ## Features
-y = df['median_house_value']   ## target
-
-## the same Random_state (take care)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.15, shuffle=True, random_state=42) 
-
-## Separete the columns according to type (numerical or categorical)
-num_cols = [col for col in X_train.columns if X_train[col].dtype in ['float32', 'float64', 'int32', 'int64']]
-categ_cols = [col for col in X_train.columns if X_train[col].dtype not in ['float32', 'float64', 'int32', 'int64']]
-
-## We can get much much easier like the following
-## numerical pipeline
-num_pipeline = Pipeline([
-                        ('selector', DataFrameSelector(num_cols)),    ## select only these columns
-                        ('imputer', SimpleImputer(strategy='median')),
-                        ('scaler', StandardScaler())
-                        ])
-
-## categorical pipeline
-categ_pipeline = Pipeline(steps=[
-            ('selector', DataFrameSelector(categ_cols)),    ## select only these columns
-            ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-            ('OHE', OneHotEncoder(sparse_output=False))])
-
-## concatenate both two pipelines
-total_pipeline = FeatureUnion(transformer_list=[
-                                            ('num_pipe', num_pipeline),
-                                            ('categ_pipe', categ_pipeline)
-                                               ]
-                             )
-
-X_train_final = total_pipeline.fit_transform(X_train) ## fit
+import joblib
+import numpy as np
+## The pipeline is fitted once by the build step (utils/build_pipeline.py), here it is only loaded
+from build_pipeline import FILE_PATH, PIPELINE_PATH, dataset_hash
+from inference_plan import InferencePlan
+
+
+def load_pipeline(pipeline_path=PIPELINE_PATH, file_path=FILE_PATH):
+    ''' Loads the fitted FeatureUnion, and fails if the dataset changed since it was built '''
+    if not os.path.exists(pipeline_path):
+        raise FileNotFoundError(f'{pipeline_path} not found, run `python utils/build_pipeline.py` first')
+
+    artifact = joblib.load(pipeline_path)
+
+    ## The dataset isn't always shipped with the app, it can only be checked when it is there
+    if os.path.exists(file_path) and artifact['dataset_sha256'] != dataset_hash(file_path):
+        raise RuntimeError(f'{file_path} changed since {pipeline_path} was built, '
+                           'run `python utils/build_pipeline.py` again')
+
+    return artifact['pipeline']
+
+
+total_pipeline = load_pipeline()
+inference_plan = InferencePlan(total_pipeline)
 
 def preprocess_new(X_new):
     ''' This Function tries to process the new instances before predicted using Model
@@ -70,4 +38,67 @@ def preprocess_new(X_new):
      *******
          Preprocessed Features ready to make inference by the Model
     '''
-    return total_pipeline.transform(X_new)
\ No newline at end of file
+    return total_pipeline.transform(X_new)
+
+
+def preprocess_one(features):
+    ''' Fast path of `preprocess_new` for one instance, with NumPy only (no pandas / sklearn)
+    Args:
+    *****
+        (features: dict) --> column name: value, the same columns as `preprocess_new`
+
+     Returns:
+     *******
+         Preprocessed Features (1, n_features) ready to make inference by the Model
+    '''
+    return inference_plan.transform_one(features)
+
+
+## The raw features of one house, as the API receives them
+RAW_FEATURES = ['longitude', 'latitude', 'housing_median_age', 'total_rooms', 'total_bedrooms',
+                'population', 'households', 'median_income']
+
+
+def records_to_columns(records):
+    ''' Turns a list of houses (dicts of raw features) into columns, with the Feature Engineering done on whole arrays
+    Args:
+    *****
+        (records: list of dict) --> RAW_FEATURES + 'ocean_proximity' for every house
+
+     Returns:
+     *******
+         dict column name: 1D array, ready for `inference_plan.transform`
+    '''
+    missing = sorted({col for record in records for col in RAW_FEATURES + ['ocean_proximity'] if col not in record})
+    if missing:
+        raise ValueError(f'Missing features: {missing}')
+
+    try:
+        columns = {col: np.array([record[col] for record in records], dtype=np.float64) for col in RAW_FEATURES}
+    except (TypeError, ValueError):
+        raise ValueError(f'All features except ocean_proximity must be numbers: {RAW_FEATURES}') from None
+
+    ## A missing category is imputed by the pipeline, anything else must be a string
+    if not all(record['ocean_proximity'] is None or isinstance(record['ocean_proximity'], str) for record in records):
+        raise ValueError('ocean_proximity must be a string')
+
+    ## The same cleaning as the training -- (<1H OCEAN) is (1H OCEAN) for the model
+    columns['ocean_proximity'] = ['1H OCEAN' if record['ocean_proximity'] == '<1H OCEAN' else record['ocean_proximity']
+                                  for record in records]
+
+    ## A zero would give an infinite ratio, which the pipeline rejects
+    for col in ('households', 'total_rooms'):
+        if (columns[col] == 0).any():
+            raise ValueError(f'{col} must not be 0')
+
+    ## Remmber the Feature Engineering we did (a missing value gives nan, imputed by the pipeline)
+    with np.errstate(invalid='ignore'):
+        columns['rooms_per_household'] = columns['total_rooms'] / columns['households']
+        columns['bedroms_per_rooms'] = columns['total_bedrooms'] / columns['total_rooms']
+        columns['population_per_household'] = columns['population'] / columns['households']
+    return columns
+
+
+def preprocess_batch(records):
+    ''' Preprocessed Features (n_houses, n_features) of a list of houses, see `records_to_columns` '''
+    return inference_plan.transform(records_to_columns(records))
@@ -0,0 +1,210 @@
+"""
+Offline bulk scoring of CSV / Parquet files through the saved preprocessor + model of a project.
+
+The input is streamed in fixed-size chunks, every chunk goes through the preprocessor and the
+model and its predictions are appended to the output right away, so memory stays bounded by
+the chunk size (times the number of workers) whatever the size of the file.
+
+Usage (from this folder):
+    python bulk_score.py churn Classification/Churn_Project/dataset/churn-data.csv scores.parquet
+    python bulk_score.py breast_cancer data.csv scores.csv --chunk-size 10000 --workers 4
+    python bulk_score.py house_price housing.csv prices.csv --keep-columns longitude latitude
+
+Parquet files need `pyarrow`.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHURN_DIR = os.path.join(BASE_DIR, "Classification", "Churn_Project")
+BREAST_CANCER_DIR = os.path.join(BASE_DIR, "Classification", "Breast_Cancer_Wisconsin_Diagnosis")
+HOUSE_PRICE_DIR = os.path.join(BASE_DIR, "Regression", "House_Price_Prediction_Regression_Project")
+
+# Probability above which a binary classifier predicts the positive class
+THRESHOLD = 0.5
+
+
+def prepare_breast_cancer(df: pd.DataFrame) -> pd.DataFrame:
+    # The raw dataset uses "concave points_mean", the model "concave_points_mean"
+    return df.rename(columns=lambda col: col.replace(" ", "_"))
+
+
+def prepare_house_price(df: pd.DataFrame) -> pd.DataFrame:
+    # Same cleaning and feature engineering as the training (utils/utils.py)
+    df = df.copy()
+    df["ocean_proximity"] = df["ocean_proximity"].replace("<1H OCEAN", "1H OCEAN")
+    df["rooms_per_household"] = df["total_rooms"] / df["households"]
+    df["bedroms_per_rooms"] = df["total_bedrooms"] / df["total_rooms"]
+    df["population_per_household"] = df["population"] / df["households"]
+    return df
+
+
+def load_house_price_preprocessor(path: Optional[str] = None):
+    # The House Price pipeline is saved by utils/build_pipeline.py in a dict, along with the hash
+    # of its dataset: it is read by the project's loader, a --preprocessor file included
+    sys.path.insert(0, os.path.join(HOUSE_PRICE_DIR, "utils"))
+    from utils import load_pipeline
+    return load_pipeline(path) if path else load_pipeline()
+
+
+PRESETS = {
+    "churn": {
+        "preprocessor": os.path.join(CHURN_DIR, "models", "preprocessor.pkl"),
+        "model": os.path.join(CHURN_DIR, "models", "xgb-tuned.pkl"),
+        "prepare": None,
+        "task": "classification",
+    },
+    "breast_cancer": {
+        "preprocessor": os.path.join(BREAST_CANCER_DIR, "src", "models", "preprocessor.pkl"),
+        "model": os.path.join(BREAST_CANCER_DIR, "src", "models", "log_clf.pkl"),
+        "prepare": prepare_breast_cancer,
+        "task": "classification",
+    },
+    "house_price": {
+        "preprocessor": load_house_price_preprocessor,
+        "model": os.path.join(HOUSE_PRICE_DIR, "model", "model_XGBoost.pkl"),
+        "prepare": prepare_house_price,
+        "task": "regression",
+    },
+}
+
+
+class Scorer:
+    def __init__(self, preset: str, preprocessor_path: Optional[str] = None, model_path: Optional[str] = None):
+        config = PRESETS[preset]
+        preprocessor = config["preprocessor"]
+        if callable(preprocessor):
+            self.preprocessor = preprocessor(preprocessor_path)
+        else:
+            self.preprocessor = joblib.load(preprocessor_path or preprocessor)
+        self.model = joblib.load(model_path or config["model"])
+        self.prepare: Optional[Callable] = config["prepare"]
+        self.task = config["task"]
+
+    def score(self, chunk: pd.DataFrame, keep_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        features = self.prepare(chunk) if self.prepare else chunk
+        x_processed = self.preprocessor.transform(features)
+
+        output = chunk[keep_columns] if keep_columns else chunk
+        output = output.reset_index(drop=True)
+        if self.task == "classification":
+            # One predict_proba call, the label is derived from it
+            probability = self.model.predict_proba(x_processed)[:, 1]
+            output["prediction"] = (probability > THRESHOLD).astype(np.int8)
+            output["probability"] = probability
+        else:
+            output["prediction"] = self.model.predict(x_processed)
+        return output
+
+
+# The scorer of a worker process, loaded once by the pool initializer
+_worker_scorer: Optional[Scorer] = None
+
+
+def _init_worker(preset: str, preprocessor_path: Optional[str], model_path: Optional[str]):
+    global _worker_scorer
+    _worker_scorer = Scorer(preset, preprocessor_path, model_path)
+
+
+def _score_chunk(chunk: pd.DataFrame, keep_columns: Optional[List[str]]) -> pd.DataFrame:
+    return _worker_scorer.score(chunk, keep_columns)
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet_writer = None
+        self.first_chunk = True
+
+    def write(self, chunk: pd.DataFrame):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="w" if self.first_chunk else "a", header=self.first_chunk, index=False)
+        self.first_chunk = False
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def score_file(preset: str, input_path: str, output_path: str, chunk_size: int = 50_000, workers: int = 1,
+               keep_columns: Optional[List[str]] = None, preprocessor_path: Optional[str] = None,
+               model_path: Optional[str] = None) -> int:
+    ''' Scores the input file chunk by chunk and returns the number of scored rows '''
+    chunks = read_chunks(input_path, chunk_size)
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+
+    try:
+        if workers <= 1:
+            scorer = Scorer(preset, preprocessor_path, model_path)
+            for chunk in chunks:
+                scored = scorer.score(chunk, keep_columns)
+                writer.write(scored)
+                n_rows += len(scored)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(preset, preprocessor_path, model_path)) as executor:
+                # At most 2 chunks per worker in flight, written back in input order
+                in_flight = deque()
+                for chunk in chunks:
+                    in_flight.append(executor.submit(_score_chunk, chunk, keep_columns))
+                    if len(in_flight) >= 2 * workers:
+                        scored = in_flight.popleft().result()
+                        writer.write(scored)
+                        n_rows += len(scored)
+                while in_flight:
+                    scored = in_flight.popleft().result()
+                    writer.write(scored)
+                    n_rows += len(scored)
+    finally:
+        writer.close()
+
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk scoring of CSV / Parquet files through a saved pipeline")
+    parser.add_argument("preset", choices=sorted(PRESETS), help="project whose preprocessor + model are used")
+    parser.add_argument("input", help="input .csv or .parquet file")
+    parser.add_argument("output", help="output .csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows per chunk (default: 50000)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, no pool)")
+    parser.add_argument("--keep-columns", nargs="+", help="input columns copied to the output (default: all)")
+    parser.add_argument("--preprocessor", help="override the preprocessor .pkl of the preset")
+    parser.add_argument("--model", help="override the model .pkl of the preset")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n_rows = score_file(args.preset, args.input, args.output, chunk_size=args.chunk_size, workers=args.workers,
+                        keep_columns=args.keep_columns, preprocessor_path=args.preprocessor, model_path=args.model)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {n_rows:,} rows in {elapsed:.2f} s ({n_rows / elapsed:,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
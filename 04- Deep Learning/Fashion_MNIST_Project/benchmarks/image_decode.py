@@ -0,0 +1,111 @@
+"""
+Throughput, peak memory and accuracy impact of the reduced-size decode path of `preprocess_image`.
+
+Multi-megapixel colour photos (JPEG and PNG) are made from the bundled test images: each is
+shifted, tinted, upscaled and noised. Every photo is preprocessed by the previous path (full
+decode, `convert('L')` at full size, then resize) and by `preprocess_image` (JPEG draft
+decoding, resize before the colour conversion). The accuracy impact is the pixel difference
+between the two (28, 28) inputs and how often the model predicts the same class for them.
+
+Peak memory is the high-water RSS of a fresh process preprocessing the photos one by one (PIL
+allocates its images outside of `tracemalloc`), Linux only.
+
+Run from the project folder:
+    python -m benchmarks.image_decode [n_images] [megapixels]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from src.inference import preprocess_image
+
+ARTIFACTS_FOLDER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "artifacts")
+
+
+def previous_preprocess_image(image_bytes: bytes) -> np.ndarray:
+    img = Image.open(BytesIO(image_bytes))
+    if img.mode != 'L':
+        img = img.convert('L')
+    img = img.resize((28, 28))
+    return np.array(img).astype('float32')
+
+
+PATHS = {"previous": previous_preprocess_image, "draft": preprocess_image}
+
+
+def make_photos(n_images: int, megapixels: float, seed: int = 42):
+    # {format: [encoded photo]}, same scenes in both formats
+    rng = np.random.default_rng(seed)
+    sources = [np.array(Image.open(os.path.join(ARTIFACTS_FOLDER_PATH, f"test_image_{i}.png")).convert('L'))
+               for i in range(3)]
+    height = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    width = height * 4 // 3
+
+    photos = {"JPEG": [], "PNG": []}
+    for i in range(n_images):
+        scene = np.roll(sources[i % len(sources)], rng.integers(-2, 3, size=2), axis=(0, 1)).astype(np.float32)
+        tint = rng.uniform(0.6, 1.0, size=3)
+        rgb = np.stack([scene * t for t in tint], axis=-1).clip(0, 255).astype(np.uint8)
+        img = Image.fromarray(rgb).resize((width, height), Image.BILINEAR)
+        noisy = np.asarray(img, dtype=np.int16) + rng.integers(-8, 9, size=(height, width, 1), dtype=np.int16)
+        img = Image.fromarray(noisy.clip(0, 255).astype(np.uint8))
+        for fmt in photos:
+            buffer = BytesIO()
+            img.save(buffer, fmt, **({"quality": 90} if fmt == "JPEG" else {"compress_level": 1}))
+            photos[fmt].append(buffer.getvalue())
+    return photos
+
+
+def peak_rss_mib(path: str, photo_files) -> float:
+    # High-water RSS of a fresh process reading and preprocessing the photos one by one, minus the one
+    # before. VmHWM (Linux) is used instead of ru_maxrss, which keeps the peak of the parent after fork
+    code = (
+        "import sys; from benchmarks.image_decode import PATHS; "
+        "hwm = lambda: int(next(line for line in open('/proc/self/status') if line.startswith('VmHWM')).split()[1]); "
+        "before = hwm(); "
+        f"[PATHS[{path!r}](open(name, 'rb').read()) for name in sys.argv[1:]]; "
+        "print(hwm() - before)"
+    )
+    result = subprocess.run([sys.executable, "-c", code, *photo_files], capture_output=True, text=True, check=True)
+    return int(result.stdout.split()[-1]) / 1024
+
+
+def main():
+    n_images = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    megapixels = float(sys.argv[2]) if len(sys.argv) > 2 else 12
+    photos = make_photos(n_images, megapixels)
+
+    from src.utils.config import artifacts
+    predictor = artifacts.predictor
+
+    for fmt, encoded in photos.items():
+        print(f"{fmt}: {n_images} photos of {megapixels:g} MP, {np.mean([len(p) for p in encoded]) / 2**20:.1f} MiB each")
+        inputs = {}
+        with tempfile.TemporaryDirectory() as folder:
+            photo_files = []
+            for i, photo in enumerate(encoded):
+                photo_files.append(os.path.join(folder, f"{i}.{fmt.lower()}"))
+                with open(photo_files[-1], "wb") as f:
+                    f.write(photo)
+
+            for name, preprocess in PATHS.items():
+                start = time.perf_counter()
+                inputs[name] = np.stack([preprocess(photo) for photo in encoded])
+                elapsed = time.perf_counter() - start
+                print(f"  {name:>8}: {n_images / elapsed:7.1f} images/s, "
+                      f"peak RSS +{peak_rss_mib(name, photo_files):7.1f} MiB")
+
+        diff = np.abs(inputs["draft"] - inputs["previous"])
+        same_class = np.argmax(predictor(inputs["draft"]), -1) == np.argmax(predictor(inputs["previous"]), -1)
+        print(f"  accuracy impact: mean |pixel diff| {diff.mean():.2f} / 255, max {diff.max():.0f}, "
+              f"same predicted class {same_class.mean():.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,42 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, HTTPException, Depends, Response, UploadFile
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from src.utils.config import APP_NAME, VERSION, API_SECRET_KEY
-from src.utils.models import PredictionResponse
-from src.inference import classify_image
+from src.utils.config import APP_NAME, VERSION, API_SECRET_KEY, CLASSIFY_MAX_BATCH_SIZE, CLASSIFY_MAX_WAIT_MS
+from src.utils.config import PRELOAD_ARTIFACTS, CLASSIFY_BATCH_MAX_IMAGES, MAX_IMAGE_BYTES, MAX_UPLOAD_BYTES, artifacts
+from src.utils.models import PredictionResponse, BatchPredictionResponse
+from src.utils.batching import MicroBatcher
+from src.inference import preprocess_image, classify_batch, classify_images, expand_upload, UploadTooLarge, decode_pool
+from src.inference import is_archive, upload_size
 
 
-app = FastAPI(title=APP_NAME, version=VERSION)
+# Concurrent uploads are grouped into one forward pass
+classify_batcher = MicroBatcher(classify_batch, max_batch_size=CLASSIFY_MAX_BATCH_SIZE,
+                                max_wait_ms=CLASSIFY_MAX_WAIT_MS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model in the background: "/" answers right away, "/ready" once it is loaded
+    if PRELOAD_ARTIFACTS:
+        asyncio.get_running_loop().run_in_executor(None, artifacts.preload)
+    yield
+    await classify_batcher.close()
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    # At most one byte over the limit is read, to tell that the file is over it
+    contents = await file.read(max_bytes + 1)
+    if len(contents) > max_bytes:
+        raise UploadTooLarge(f"{file.filename} is over {max_bytes} bytes")
+    return contents
+
+
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
 app.add_middleware(
    CORSMiddleware,
@@ -30,15 +59,64 @@ async def home(api_key: str=Depends(verify_api_key)):
     }
 
 
+@app.get('/ready', tags=['check'])
+async def ready(response: Response):
+    if not artifacts.ready:
+        response.status_code = 503
+    return {
+        "ready": artifacts.ready,
+        "artifacts": artifacts.status()
+    }
+
+
 @app.post("/classify", tags=['NN'], response_model=PredictionResponse)
 async def classify(file: UploadFile, api_key: str=Depends(verify_api_key)):
     try:
         if not file.content_type.startswith('image/'):
             raise HTTPException(400, "File must be an image")
             
-        contents = await file.read()
-        response = classify_image(contents)
+        contents = await read_upload(file, MAX_IMAGE_BYTES)
+        # Decoded in the pool, so that concurrent uploads are decoded in parallel and reach the batcher together
+        image = await asyncio.get_running_loop().run_in_executor(decode_pool, preprocess_image, contents)
+        response = await classify_batcher.submit(image)
         return PredictionResponse(**response)
-    
+
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Error making predictions: {str(e)}")
+
+
+@app.post("/classify/batch", tags=['NN'], response_model=BatchPredictionResponse)
+async def classify_many(files: List[UploadFile], api_key: str=Depends(verify_api_key)):
+    # Images, .zip archives of images or .npz arrays of (N, H, W) images, classified in one forward pass
+    # MAX_UPLOAD_BYTES is shared by all the files of the request, read and decompressed
+    images, read_bytes, image_bytes = [], 0, 0
+    try:
+        for file in files:
+            max_bytes = MAX_UPLOAD_BYTES - read_bytes
+            contents = await read_upload(file, max_bytes if is_archive(file.filename) else min(max_bytes, MAX_IMAGE_BYTES))
+            read_bytes += len(contents)
+            # Archives are decompressed in a thread, not on the event loop
+            expanded = await run_in_threadpool(expand_upload, file.filename, contents,
+                                               CLASSIFY_BATCH_MAX_IMAGES - len(images), MAX_UPLOAD_BYTES - image_bytes)
+            images.extend(expanded)
+            image_bytes += sum(upload_size(image) for _, image in expanded)
+            if len(images) > CLASSIFY_BATCH_MAX_IMAGES:
+                raise UploadTooLarge(f"At most {CLASSIFY_BATCH_MAX_IMAGES} images per request")
+            if image_bytes > MAX_UPLOAD_BYTES:
+                raise UploadTooLarge(f"The images of the request are over {MAX_UPLOAD_BYTES} bytes")
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    except Exception as e:
+        raise HTTPException(400, f"Invalid upload: {str(e)}")
+
+    if not images:
+        raise HTTPException(400, "No image in the upload")
+
+    try:
+        response = await run_in_threadpool(classify_images, images)
+        return BatchPredictionResponse(**response)
+
     except Exception as e:
-        raise HTTPException(500, f"Error making predictions: {str(e)}")
\ No newline at end of file
+        raise HTTPException(500, f"Error making predictions: {str(e)}")
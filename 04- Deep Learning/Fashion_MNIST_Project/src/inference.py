@@ -1,30 +1,235 @@
 from PIL import Image
-import numpy as np 
+import numpy as np
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from src.utils.config import CLASS_NAMES, MODEL
+from typing import List, Tuple
+from src.utils.config import CLASS_NAMES, DECODE_WORKERS, MAX_IMAGE_BYTES, MAX_IMAGE_PIXELS, artifacts
 
 
+# Images of a /classify/batch request are decoded and resized in parallel (PIL releases the GIL)
+decode_pool = ThreadPoolExecutor(max_workers=DECODE_WORKERS)
 
-def classify_image(image_bytes: bytes):
-    try:
-        img = Image.open(BytesIO(image_bytes))
-        if img.mode != 'L':
-            img = img.convert('L')
 
-        img = img.resize((28, 28))
-        img_array = np.array(img)
-        img_array = img_array.astype('float32')
-        img_array = np.expand_dims(img_array, axis=0)
+IMAGE_SIZE = (28, 28)
+
+# dtypes accepted in a .npz upload: booleans, integers and floats
+NPZ_DTYPE_KINDS = 'buif'
+
+
+class UploadTooLarge(ValueError):
+    ''' An upload over one of the size limits (answered with 413 instead of 400) '''
+
+# A large image is first shrunk by an integer factor (box filter) until it is at most
+# REDUCING_GAP times the target size, then resized with the bicubic filter
+REDUCING_GAP = 3.0
+
+
+def open_image(image_bytes: bytes) -> Image.Image:
+    # Only the header is read here, the limits are checked before anything is decoded
+    if len(image_bytes) > MAX_IMAGE_BYTES:
+        raise ValueError(f"Image is {len(image_bytes)} bytes, the limit is {MAX_IMAGE_BYTES}")
+    img = Image.open(BytesIO(image_bytes))
+    width, height = img.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"Image is {width}x{height} pixels, the limit is {MAX_IMAGE_PIXELS} pixels")
+    return img
+
+
+def decode_image(image_bytes: bytes) -> Image.Image:
+    img = open_image(image_bytes)
+
+    # JPEG: decoded at 1/2, 1/4 or 1/8 of its size (the smallest still larger than 28x28),
+    # straight to grayscale (the luma channel). No-op for the other formats
+    img.draft('L', IMAGE_SIZE)
+
+    # Palette, alpha or CMYK images can't be resized as they are, these are converted first
+    if img.mode not in ('L', 'RGB'):
+        img = img.convert('L')
+    img.load()
+    return img
 
 
-        prediction = MODEL.predict(img_array, verbose=0)
-        predicted_class = np.argmax(prediction, axis=-1)[0]
-        predicted_name = CLASS_NAMES[predicted_class]
+def resize_image(img: Image.Image, out: np.ndarray = None) -> np.ndarray:
+    ''' (28, 28) float32 array of the image, written to `out` if given
 
-        return {
+    The image is resized before the colour conversion, so only 28x28 pixels are converted.
+    '''
+    img = img.resize(IMAGE_SIZE, reducing_gap=REDUCING_GAP)
+    if img.mode not in ('L', 'F'):
+        img = img.convert('L')
+
+    if out is None:
+        out = np.empty(IMAGE_SIZE, dtype=np.float32)
+    out[...] = np.asarray(img)
+    return out
+
+
+def preprocess_image(image_bytes: bytes) -> np.ndarray:
+    try:
+        return resize_image(decode_image(image_bytes))
+    except Exception as e:
+        raise ValueError(f"Image processing failed: {str(e)}")
+
+
+def classify_array(images: np.ndarray) -> List[dict]:
+    # One forward pass for the whole (N, 28, 28) batch
+    prediction = np.asarray(artifacts.predictor(images))
+    predicted_classes = np.argmax(prediction, axis=-1)
+
+    return [
+        {
             'class_index': int(predicted_class),
-            'class_name': predicted_name,
-            'confidence': float(prediction[0][predicted_class] * 100)
+            'class_name': CLASS_NAMES[predicted_class],
+            'confidence': float(probs[predicted_class] * 100)
         }
+        for predicted_class, probs in zip(predicted_classes, prediction)
+    ]
+
+
+def classify_batch(images: List[np.ndarray]) -> List[dict]:
+    return classify_array(np.stack(images))
+
+
+def classify_image(image_bytes: bytes):
+    img_array = preprocess_image(image_bytes)
+    try:
+        return classify_batch([img_array])[0]
     except Exception as e:
-        raise ValueError(f"Image processing failed: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Image processing failed: {str(e)}")
+
+
+def _read_npy_header(f) -> Tuple[tuple, np.dtype]:
+    # Shape and dtype of a .npy file, read from its header only
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    elif version == (2, 0):
+        shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    else:
+        raise ValueError(f"Unsupported .npy format version {version}")
+    return shape, dtype
+
+
+def is_archive(filename: str) -> bool:
+    return (filename or '').lower().endswith(('.zip', '.npz'))
+
+
+def upload_size(image) -> int:
+    # Bytes of an item of `expand_upload`, decompressed
+    return image.nbytes if isinstance(image, np.ndarray) else len(image)
+
+
+def expand_upload(filename: str, contents: bytes, max_images: int, max_bytes: int) -> List[Tuple[str, object]]:
+    ''' (name, image bytes or 2D array) of the images of an upload: an image, a .zip of images
+    or a .npz whose first array holds the images (N, H, W)
+
+    The number of images (at most `max_images`), the decompressed size (at most `max_bytes`) and,
+    for a .npz, the size of each image (`MAX_IMAGE_PIXELS`) are checked on the archive directory
+    and the .npy header, before anything is decompressed.
+    '''
+    name = (filename or '').lower()
+    if name.endswith('.zip'):
+        with zipfile.ZipFile(BytesIO(contents)) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+            if len(infos) > max_images:
+                raise UploadTooLarge(f"{filename} holds {len(infos)} files, the limit is {max_images} images")
+            total_size = sum(info.file_size for info in infos)
+            if total_size > max_bytes:
+                raise UploadTooLarge(f"{filename} is {total_size} bytes decompressed, the limit is {max_bytes}")
+            for info in infos:
+                if info.file_size > MAX_IMAGE_BYTES:
+                    raise UploadTooLarge(f"{filename}/{info.filename} is {info.file_size} bytes, "
+                                         f"the limit is {MAX_IMAGE_BYTES}")
+            return [(f"{filename}/{info.filename}", archive.read(info)) for info in infos]
+
+    if name.endswith('.npz'):
+        # Opened with zipfile (as np.load does) to check the header of the first array before reading it
+        with zipfile.ZipFile(BytesIO(contents)) as archive:
+            arrays = [info for info in archive.infolist() if info.filename.endswith('.npy')]
+            if not arrays:
+                raise ValueError(f"{filename} holds no array")
+            with archive.open(arrays[0]) as f:
+                shape, dtype = _read_npy_header(f)
+                images_shape = (1, *shape) if len(shape) == 2 else shape
+                if len(images_shape) != 3:
+                    raise ValueError(f"{filename}: expected an array of (N, H, W) grayscale images, got {shape}")
+                if dtype.kind not in NPZ_DTYPE_KINDS:
+                    raise ValueError(f"{filename}: expected an array of numbers, got dtype {dtype}")
+                count, height, width = images_shape
+                if count > max_images:
+                    raise UploadTooLarge(f"{filename} holds {count} images, the limit is {max_images}")
+                if height * width > MAX_IMAGE_PIXELS:
+                    raise UploadTooLarge(f"{filename}: images are {width}x{height} pixels, "
+                                         f"the limit is {MAX_IMAGE_PIXELS} pixels")
+                size = count * height * width * dtype.itemsize
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{filename} is {size} bytes decompressed, the limit is {max_bytes}")
+                f.seek(0)
+                images = np.lib.format.read_array(f, allow_pickle=False).reshape(images_shape)
+        return [(f"{filename}[{i}]", image) for i, image in enumerate(images)]
+
+    return [(filename, contents)]
+
+
+def _prepare(image, out: np.ndarray) -> Tuple[float, float]:
+    # Writes the (28, 28) float32 image to `out`, returns the decode and resize time in seconds
+    start = time.perf_counter()
+    if isinstance(image, np.ndarray):
+        if image.shape == IMAGE_SIZE:
+            out[...] = image
+            return 0.0, time.perf_counter() - start
+        # uint8 arrays are resized like decoded images (mode L), the others in float (mode F)
+        img = Image.fromarray(image if image.dtype == np.uint8 else image.astype(np.float32))
+    else:
+        img = decode_image(image)
+    decoded = time.perf_counter()
+    resize_image(img, out)
+    return decoded - start, time.perf_counter() - decoded
+
+
+def classify_images(images: List[Tuple[str, object]]) -> dict:
+    ''' Classifies (name, image bytes or array) items with a single forward pass
+
+    An image that can't be decoded gets an `error` instead of a prediction, the others are still classified.
+    Returns the per-image results (in order) and the timing breakdown of the request in ms:
+    decode and resize are summed over the images, `preprocess` is their wall time in the pool.
+    '''
+    start = time.perf_counter()
+    # The workers write the images straight into the input tensor of the model
+    batch = np.empty((len(images), *IMAGE_SIZE), dtype=np.float32)
+    futures = [decode_pool.submit(_prepare, image, batch[i]) for i, (_, image) in enumerate(images)]
+
+    results, decoded, decode_time, resize_time = [], [], 0.0, 0.0
+    for (name, _), future in zip(images, futures):
+        try:
+            decode_seconds, resize_seconds = future.result()
+        except Exception as e:
+            results.append({'filename': name, 'error': f"Image processing failed: {str(e)}"})
+            decoded.append(False)
+            continue
+        decode_time += decode_seconds
+        resize_time += resize_seconds
+        results.append({'filename': name})
+        decoded.append(True)
+    preprocessed = time.perf_counter()
+
+    if any(decoded):
+        predictions = iter(classify_array(batch if all(decoded) else batch[decoded]))
+        for result in results:
+            if 'error' not in result:
+                result.update(next(predictions))
+    end = time.perf_counter()
+
+    return {
+        'results': results,
+        'timings': {
+            'images': len(images),
+            'decode_ms': decode_time * 1e3,
+            'resize_ms': resize_time * 1e3,
+            'preprocess_ms': (preprocessed - start) * 1e3,
+            'inference_ms': (end - preprocessed) * 1e3,
+            'total_ms': (end - start) * 1e3,
+        }
+    }
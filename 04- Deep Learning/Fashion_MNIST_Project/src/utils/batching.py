@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Callable, List, Optional
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests into one vectorized call.
+
+    Requests wait for at most `max_wait_ms` (or until `max_batch_size` items are queued),
+    then `predict_batch` runs once on the whole batch in a worker thread and every waiting
+    coroutine gets its own result back.
+
+    Args:
+        predict_batch: function taking a list of items and returning one result per item
+        max_batch_size: maximum number of items in one call of `predict_batch`
+        max_wait_ms: maximum time the first item of a batch waits for more items
+    """
+
+    def __init__(self, predict_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.pending_get: Optional[asyncio.Future] = None
+        # Entries of the batch being predicted, failed by `close` if it is cancelled
+        self.in_flight: list = []
+
+    async def submit(self, item: Any) -> Any:
+        # The queue and the worker belong to the running event loop, so they start on first use
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.pending_get = None
+            self.worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _next(self, timeout: Optional[float]):
+        # A get that times out is kept for the next call instead of being cancelled,
+        # so an item can't be lost between the timeout and the cancellation
+        if self.pending_get is None:
+            self.pending_get = asyncio.ensure_future(self.queue.get())
+        done, _ = await asyncio.wait({self.pending_get}, timeout=timeout)
+        if not done:
+            return None
+        entry, self.pending_get = self.pending_get.result(), None
+        return entry
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._next(None)]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if self.pending_get is None and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            entry = await self._next(timeout)
+            if entry is None:
+                break
+            batch.append(entry)
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self.in_flight = await self._collect()
+            items = [item for item, _ in batch]
+
+            try:
+                results = await loop.run_in_executor(None, self.predict_batch, items)
+                # A short result list would leave the last requests waiting forever
+                if len(results) != len(batch):
+                    raise RuntimeError(f"predict_batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                self._fail(batch, e)
+                continue
+            finally:
+                self.in_flight = []
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    @staticmethod
+    def _fail(entries, error: Exception):
+        for _, future in entries:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self):
+        # The requests still waiting (in the batch being predicted or in the queue) fail instead of hanging
+        error = RuntimeError("batcher closed")
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+        self._fail(self.in_flight, error)
+        self.in_flight = []
+        if self.pending_get is not None:
+            if self.pending_get.done() and not self.pending_get.cancelled():
+                self._fail([self.pending_get.result()], error)
+            self.pending_get.cancel()
+            self.pending_get = None
+        while self.queue is not None and not self.queue.empty():
+            self._fail([self.queue.get_nowait()], error)
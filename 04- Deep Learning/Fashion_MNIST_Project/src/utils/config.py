@@ -1,6 +1,7 @@
-import tensorflow as tf 
 from dotenv import load_dotenv
 import os 
+from src.utils.artifacts import ArtifactRegistry, keras_artifact
+from src.utils.keras_inference import INFERENCE_BACKENDS, keras_predict_artifact, compiled_artifact, numpy_dense_artifact
 
  
 load_dotenv(override=True)
@@ -11,12 +12,49 @@ APP_NAME = os.getenv("APP_NAME")
 VERSION =os.getenv("VERSION")
 API_SECRET_KEY = os.getenv("API_SECRET_KEY")
 
+# Micro-batching of /classify (max images per forward pass, max wait in ms)
+CLASSIFY_MAX_BATCH_SIZE = int(os.getenv("CLASSIFY_MAX_BATCH_SIZE", "64"))
+CLASSIFY_MAX_WAIT_MS = float(os.getenv("CLASSIFY_MAX_WAIT_MS", "2"))
+
+# /classify/batch: max images per request, threads decoding and resizing the images
+CLASSIFY_BATCH_MAX_IMAGES = int(os.getenv("CLASSIFY_BATCH_MAX_IMAGES", "1024"))
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+# Uploads over these limits are rejected before they are decoded (bytes of the file, width x height)
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(20 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(50_000_000)))
+# Bytes of all the files of a /classify/batch request, and of their images once decompressed
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+# Load the model in the background on startup (otherwise on the first request)
+PRELOAD_ARTIFACTS = os.getenv("PRELOAD_ARTIFACTS", "true").lower() == "true"
+
+# How the network runs: "keras" (model.predict), "tf_function" (compiled once) or "numpy" (exported weights, no TensorFlow)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "tf_function")
+if INFERENCE_BACKEND not in INFERENCE_BACKENDS:
+    raise ValueError(f"Unknown inference backend {INFERENCE_BACKEND!r}, expected one of {INFERENCE_BACKENDS}")
+
 
 
 SRC_FOLDER_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-MODEL = tf.keras.models.load_model(os.path.join(SRC_FOLDER_PATH, "artifacts", "model.keras"))
-                                   
+MODEL_PATH = os.path.join(SRC_FOLDER_PATH, "artifacts", "model.keras")
+# NumPy weight matrices of the model (INFERENCE_BACKEND=numpy), exported from the .keras file on first load
+NUMPY_MODEL_PATH = os.path.join(SRC_FOLDER_PATH, "artifacts", "model.npz")
+
+# TensorFlow is imported and the model loaded on first use (artifacts.predictor), not on import
+# `artifacts.predictor(images)` returns the class probabilities of a (N, 28, 28) batch
+artifacts = ArtifactRegistry()
+if INFERENCE_BACKEND == "numpy":
+    artifacts.register("predictor", numpy_dense_artifact(MODEL_PATH, NUMPY_MODEL_PATH))
+else:
+    artifacts.register("model", keras_artifact(MODEL_PATH))
+    if INFERENCE_BACKEND == "tf_function":
+        # Traced for the (None, 28, 28) signature and warmed up when loaded
+        artifacts.register("predictor", compiled_artifact(lambda: artifacts.model))
+    else:
+        artifacts.register("predictor", keras_predict_artifact(lambda: artifacts.model))
+
 CLASS_NAMES = ['T_Shirt', 'Trouser', 'Pullover', 'Dress', 'Coat',
                'Sandal', 'Shirt', 'Sneaker', 'Bag', 'Ankle_Boot']
\ No newline at end of file
@@ -1,7 +1,30 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 
 class PredictionResponse(BaseModel):
     class_index: int
     class_name: str
-    confidence: float
\ No newline at end of file
+    confidence: float
+
+
+class BatchItemResult(BaseModel):
+    filename: str
+    class_index: Optional[int] = None
+    class_name: Optional[str] = None
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchTimings(BaseModel):
+    images: int
+    decode_ms: float
+    resize_ms: float
+    preprocess_ms: float
+    inference_ms: float
+    total_ms: float
+
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchItemResult]
+    timings: BatchTimings
@@ -0,0 +1,105 @@
+"""
+Row vs columnar ingestion of passenger manifests, through the API.
+
+`/classify` takes a list of passenger objects (one pydantic model per passenger, features
+built row by row), `/classify/columns` the same passengers column by column (JSON, CSV or
+Arrow), validated and featurized with array operations. The predictions of both endpoints
+are checked against the previous row-building code before timing them.
+
+Run from the project folder:
+    python -m benchmarks.columnar_ingestion [n_passengers ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("APP_NAME", "benchmark")
+os.environ.setdefault("VERSION", "0")
+
+import main
+from fastapi.testclient import TestClient
+from src.utils.PassengerData import PassengerData
+from src.utils.config import artifacts
+
+
+def previous_predict(passengers):
+    # The row building `predict_survival` did before the columnar path
+    base_data = [p.model_dump() for p in passengers]
+    for i, p in enumerate(passengers):
+        base_data[i]["family_size"] = p.family_size
+        base_data[i]["is_alone"] = p.is_alone
+    df = pd.DataFrame(base_data)
+    predictions = (artifacts.predictor(artifacts.preprocessor.transform(df)) > 0.5).astype("int32")
+    return ["survived" if pred == 1 else "not survived" for pred in predictions.flatten()]
+
+
+def make_manifest(n_passengers: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "passenger_id": np.arange(n_passengers),
+        "age": rng.uniform(0.5, 80, n_passengers).round(1),
+        "fare": rng.uniform(0, 300, n_passengers).round(2),
+        "sex": rng.choice(["male", "female"], n_passengers),
+        "embarked": rng.choice(["C", "S", "Q"], n_passengers),
+        "parch": rng.integers(0, 4, n_passengers),
+        "sibsp": rng.integers(0, 4, n_passengers),
+        "pclass": rng.integers(1, 4, n_passengers),
+    })
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def arrow_stream(df: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def main_():
+    sizes = [int(n) for n in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    api_key = main.API_SECRET_KEY or "benchmark"
+    main.API_SECRET_KEY = api_key
+    headers = {"X-API-Key": api_key}
+
+    with TestClient(main.app) as client:
+        for n_passengers in sizes:
+            df = make_manifest(n_passengers)
+            rows = df.to_dict(orient="records")
+            expected = previous_predict([PassengerData(**row) for row in rows])
+
+            bodies = {
+                "rows json": ("/classify", {"json": rows}),
+                "columns json": ("/classify/columns", {"json": {name: df[name].tolist() for name in df}}),
+                "columns csv": ("/classify/columns", {"content": df.to_csv(index=False),
+                                                      "headers": {**headers, "content-type": "text/csv"}}),
+            }
+            try:
+                bodies["columns arrow"] = ("/classify/columns", {
+                    "content": arrow_stream(df),
+                    "headers": {**headers, "content-type": "application/vnd.apache.arrow.stream"}})
+            except ImportError:
+                pass
+
+            timings = []
+            for name, (url, kwargs) in bodies.items():
+                response, elapsed = timed(lambda: client.post(url, **{"headers": headers, **kwargs}))
+                assert response.status_code == 200, response.text
+                body = response.json()
+                predicted = [p["predicted"] for p in body["predictions"]] if "predictions" in body else body["predicted"]
+                assert predicted == expected, f"{name} predictions differ from the row path"
+                timings.append(f"{name} {elapsed * 1e3:9.1f} ms")
+            print(f"{n_passengers:>7} passengers: " + " | ".join(timings))
+
+
+if __name__ == "__main__":
+    main_()
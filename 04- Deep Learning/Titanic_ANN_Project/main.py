@@ -1,13 +1,27 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from src.utils.PassengerData import PassengerData
-from src.utils.response import PredictionResponse
-from src.utils.config import APP_NAME, VERSION, API_SECRET_KEY
-from src.inference import predict_survival
+from src.utils.response import PredictionResponse, ColumnarPredictionResponse
+from src.utils.columns import COLUMN_CONTENT_TYPES, ColumnValidationError, read_columns, validate_columns
+from src.utils.compact_response import COMPACT_RESPONSES, CompactResponse, wants_compact
+from src.utils.config import APP_NAME, VERSION, API_SECRET_KEY, PRELOAD_ARTIFACTS, artifacts
+from src.inference import predict_survival, predict_columns
 
-app = FastAPI(title=APP_NAME, version=VERSION)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the artifacts in the background: "/" answers right away, "/ready" once they are loaded
+    if PRELOAD_ARTIFACTS:
+        asyncio.get_running_loop().run_in_executor(None, artifacts.preload)
+    yield
+
+
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 app.add_middleware(
    CORSMiddleware,
    allow_origins=["*"],
@@ -29,13 +43,48 @@ async def home():
         "message": "up & running"
     }
 
-@app.post("/classify", tags=['NN'], response_model=PredictionResponse)
-async def classify(passengers: List[PassengerData], api_key: str=Depends(verify_api_key)):
+
+@app.get('/ready', tags=['check'])
+async def ready(response: Response):
+    if not artifacts.ready:
+        response.status_code = 503
+    return {
+        "ready": artifacts.ready,
+        "artifacts": artifacts.status()
+    }
+
+@app.post("/classify", tags=['NN'], response_model=PredictionResponse, responses=COMPACT_RESPONSES)
+async def classify(passengers: List[PassengerData], request: Request, api_key: str=Depends(verify_api_key)):
     try:
+        if wants_compact(request):
+            return CompactResponse(predict_survival(passengers=passengers, compact=True))
         response = predict_survival(passengers=passengers)
         return response
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error making predictions {str(e)}")
-    
 
+
+def classify_body(body: bytes, content_type: str, compact: bool = False) -> dict:
+    return predict_columns(validate_columns(read_columns(body, content_type)), compact=compact)
+
+
+@app.post("/classify/columns", tags=['NN'], response_model=ColumnarPredictionResponse, responses=COMPACT_RESPONSES,
+          openapi_extra={"requestBody": {"required": True, "content": {
+              content_type: {"schema": {"type": "object"} if content_type == "application/json" else {"type": "string"}}
+              for content_type in COLUMN_CONTENT_TYPES
+          }}})
+async def classify_columns(request: Request, api_key: str=Depends(verify_api_key)):
+    # Passengers column by column (JSON object of lists, CSV or Arrow), validated and featurized as arrays
+    body = await request.body()
+    try:
+        if wants_compact(request):
+            return CompactResponse(await run_in_threadpool(classify_body, body, request.headers.get("content-type"), True))
+        return await run_in_threadpool(classify_body, body, request.headers.get("content-type"))
+
+    except ColumnValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error making predictions {str(e)}")
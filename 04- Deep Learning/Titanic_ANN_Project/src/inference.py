@@ -1,32 +1,55 @@
+import numpy as np
 import pandas as pd
 from typing import List
 from src.utils.PassengerData import PassengerData
 from src.utils.response import PassengerPrediction, PredictionResponse
-from src.utils.config import model, preprocessor
-
-
-def predict_survival(passengers: List[PassengerData]):
-    
-    # base data
-    base_data = [p.model_dump() for p in passengers]
-    
-    # Add computed properties
-    for i, p in enumerate(passengers):
-        base_data[i]["family_size"] = p.family_size
-        base_data[i]["is_alone"] = p.is_alone
-    
-    # To DF for all columns
-    df = pd.DataFrame(base_data)
-    
-    df_processed = preprocessor.transform(df)
-    predictions = (model.predict(df_processed) > 0.5).astype("int32")
+from src.utils.config import artifacts
+
+
+def add_family_features(df: pd.DataFrame) -> pd.DataFrame:
+    # The computed properties of PassengerData, for all the passengers at once
+    family_size = df["parch"].to_numpy() + df["sibsp"].to_numpy() + 1
+    df["family_size"] = family_size
+    df["is_alone"] = (family_size == 1).astype(np.int64)
+    return df
+
+
+def predict_frame(df: pd.DataFrame) -> np.ndarray:
+    ''' Survived (bool) for every passenger of `df`, which has the columns of PassengerData '''
+    df_processed = artifacts.preprocessor.transform(add_family_features(df))
+    return (artifacts.predictor(df_processed) > 0.5).flatten()
+
+
+def compact_predictions(df: pd.DataFrame, survived: np.ndarray) -> dict:
+    # Columnar arrays for CompactResponse, no object per passenger
+    return {"passenger_id": df["passenger_id"].to_numpy(), "survived": survived}
+
+
+def predict_survival(passengers: List[PassengerData], compact: bool = False):
+
+    # To DF, column by column (the passengers are already validated)
+    df = pd.DataFrame({name: [getattr(p, name) for p in passengers] for name in PassengerData.model_fields})
+    predictions = predict_frame(df)
+    if compact:
+        return compact_predictions(df, predictions)
 
     pred_response = PredictionResponse(predictions=[
         PassengerPrediction(
             passenger_id=passenger.passenger_id,
-            predicted="survived" if pred == 1 else "not survived"
+            predicted="survived" if pred else "not survived"
         ) 
-        for passenger, pred in zip(passengers, predictions.flatten())
+        for passenger, pred in zip(passengers, predictions)
     ])
 
     return pred_response
+
+
+def predict_columns(df: pd.DataFrame, compact: bool = False) -> dict:
+    ''' Column-oriented predictions of passengers validated by `validate_columns` '''
+    survived = predict_frame(df)
+    if compact:
+        return compact_predictions(df, survived)
+    return {
+        "passenger_id": df["passenger_id"].tolist(),
+        "predicted": np.where(survived, "survived", "not survived").tolist(),
+    }
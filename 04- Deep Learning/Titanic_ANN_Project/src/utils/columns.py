@@ -0,0 +1,156 @@
+import json
+import typing
+from io import BytesIO
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.PassengerData import PassengerData
+
+
+# Errors reported per column before giving up on it
+MAX_ERRORS_PER_COLUMN = 5
+
+
+def _column_specs() -> Dict[str, Tuple[str, tuple]]:
+    # name -> (kind, allowed values), read from PassengerData so both paths validate the same fields
+    specs = {}
+    for name, field in PassengerData.model_fields.items():
+        if typing.get_origin(field.annotation) is typing.Literal:
+            specs[name] = ("category", typing.get_args(field.annotation))
+        elif field.annotation in (int, float):
+            specs[name] = (field.annotation.__name__, ())
+        else:
+            raise TypeError(f"No column validation for {name}: {field.annotation}")
+    return specs
+
+
+COLUMN_SPECS = _column_specs()
+
+
+class ColumnValidationError(ValueError):
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} invalid values")
+        self.errors = errors
+
+
+def _row_errors(name: str, invalid: np.ndarray, message: str) -> List[dict]:
+    rows = np.flatnonzero(invalid)[:MAX_ERRORS_PER_COLUMN]
+    return [{"loc": [name, int(row)], "msg": message} for row in rows]
+
+
+def _is_nan_input(value) -> bool:
+    # A NaN given as such (a valid float for pydantic), not a missing value or text
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return False
+    return isinstance(value, (float, np.floating)) and bool(np.isnan(value))
+
+
+def _integers(name: str, values, numbers: pd.Series, errors: List[dict]) -> np.ndarray:
+    # Integer columns stay on int64: through float64, ids over 2 ** 53 would change
+    if pd.api.types.is_signed_integer_dtype(numbers.dtype):
+        return numbers.to_numpy(dtype=np.int64)
+
+    # None, text, NaN, +-inf, fractions and values out of the int64 range are invalid
+    floats = numbers.to_numpy(dtype=np.float64)
+    invalid = ~np.isfinite(floats) | (floats != np.round(floats)) | (np.abs(floats) >= 2.0 ** 63)
+    if invalid.any():
+        errors.extend(_row_errors(name, invalid, "Input should be a valid integer"))
+        return floats
+
+    # Integral floats (3.0) are valid too; from 2 ** 53 on they are read again from the input, exactly
+    integers = floats.astype(np.int64)
+    large = np.flatnonzero(np.abs(floats) >= 2.0 ** 53)
+    if len(large):
+        for row, value in zip(large, np.asarray(values, dtype=object)[large]):
+            try:
+                integers[row] = int(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+    return integers
+
+
+def _numeric(name: str, values, kind: str, errors: List[dict]) -> np.ndarray:
+    # Numbers, booleans (1 / 0) or strings of numbers, like pydantic in lax mode
+    numbers = pd.to_numeric(pd.Series(values), errors="coerce")
+    if kind == "int":
+        return _integers(name, values, numbers, errors)
+
+    # NaN and +-inf are valid floats for pydantic: only None and text (NaN once coerced) are invalid
+    numbers = numbers.to_numpy(dtype=np.float64)
+    nan_rows = np.flatnonzero(np.isnan(numbers))
+    if len(nan_rows):
+        invalid = np.zeros(len(numbers), dtype=bool)
+        invalid[nan_rows] = [not _is_nan_input(value) for value in np.asarray(values, dtype=object)[nan_rows]]
+        if invalid.any():
+            errors.extend(_row_errors(name, invalid, "Input should be a valid number"))
+    return numbers
+
+
+def _category(name: str, values, choices: tuple, errors: List[dict]) -> np.ndarray:
+    values = pd.Series(values, dtype=object)
+    invalid = ~values.isin(choices).to_numpy()
+    if invalid.any():
+        errors.extend(_row_errors(name, invalid, f"Input should be {' or '.join(repr(c) for c in choices)}"))
+    return values.to_numpy()
+
+
+def validate_columns(columns: Mapping[str, typing.Any]) -> pd.DataFrame:
+    ''' DataFrame of the passengers given column by column (dict of lists, DataFrame, ...)
+
+    Every column is checked at once with array operations, with the same rules as `PassengerData`.
+    Raises `ColumnValidationError` with the (column, row) of the invalid values.
+    '''
+    missing = [name for name in COLUMN_SPECS if name not in columns]
+    if missing:
+        raise ColumnValidationError([{"loc": [name], "msg": "Field required"} for name in missing])
+
+    not_lists = [name for name in COLUMN_SPECS
+                 if isinstance(columns[name], (str, bytes, dict)) or not hasattr(columns[name], "__len__")]
+    if not_lists:
+        raise ColumnValidationError([{"loc": [name], "msg": "Input should be a valid list"} for name in not_lists])
+
+    lengths = {name: len(columns[name]) for name in COLUMN_SPECS}
+    if len(set(lengths.values())) != 1:
+        raise ColumnValidationError([{"loc": [], "msg": f"The columns have different lengths: {lengths}"}])
+    if not next(iter(lengths.values())):
+        raise ColumnValidationError([{"loc": [], "msg": "No passenger"}])
+
+    errors, data = [], {}
+    for name, (kind, choices) in COLUMN_SPECS.items():
+        if kind == "category":
+            data[name] = _category(name, columns[name], choices, errors)
+        else:
+            data[name] = _numeric(name, columns[name], kind, errors)
+    if errors:
+        raise ColumnValidationError(errors)
+
+    return pd.DataFrame(data)
+
+
+COLUMN_CONTENT_TYPES = ("application/json", "text/csv", "application/vnd.apache.arrow.stream")
+
+
+def read_columns(body: bytes, content_type: str) -> Mapping[str, typing.Any]:
+    ''' Columns of a request body: a JSON object of column -> list, a CSV with a header row
+    or an Arrow IPC stream (needs `pyarrow`) '''
+    content_type = (content_type or "application/json").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        columns = json.loads(body)
+        if not isinstance(columns, dict):
+            raise ColumnValidationError([{"loc": [], "msg": "Input should be an object of column: list of values"}])
+        return columns
+    if content_type == "text/csv":
+        # Empty cells stay "" (invalid, like a missing value), not NaN, which is a valid float
+        return pd.read_csv(BytesIO(body), keep_default_na=False)
+    if content_type == "application/vnd.apache.arrow.stream":
+        import pyarrow as pa
+        table = pa.ipc.open_stream(body).read_all()
+        # Same for nulls: a column holding some is read as a list with None
+        return {name: column.to_pylist() if column.null_count else column.to_pandas()
+                for name, column in zip(table.column_names, table.columns)}
+    raise ValueError(f"Unsupported content type {content_type!r}, expected one of {COLUMN_CONTENT_TYPES}")
@@ -1,7 +1,7 @@
 import os
 from dotenv import load_dotenv
-import joblib
-import tensorflow as tf
+from src.utils.artifacts import ArtifactRegistry, joblib_artifact, keras_artifact
+from src.utils.keras_inference import INFERENCE_BACKENDS, keras_predict_artifact, compiled_artifact, numpy_dense_artifact
 
 # load .env file
 load_dotenv(override=True)
@@ -10,14 +10,34 @@ APP_NAME = os.getenv("APP_NAME")
 VERSION = os.getenv("VERSION")
 API_SECRET_KEY = os.getenv("API_SECRET_KEY")
 
+# Load the preprocessor and the model in the background on startup (otherwise on the first request)
+PRELOAD_ARTIFACTS = os.getenv("PRELOAD_ARTIFACTS", "true").lower() == "true"
+
+# How the network runs: "keras" (model.predict), "tf_function" (compiled once) or "numpy" (exported weights, no TensorFlow)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "numpy")
+if INFERENCE_BACKEND not in INFERENCE_BACKENDS:
+    raise ValueError(f"Unknown inference backend {INFERENCE_BACKEND!r}, expected one of {INFERENCE_BACKENDS}")
+
 SRC_FOLDER_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 
+# Loaded on first use (artifacts.preprocessor, artifacts.predictor), TensorFlow included (unless exported to NumPy)
+artifacts = ArtifactRegistry()
+
 # 
-preprocessor = joblib.load(
+artifacts.register("preprocessor", joblib_artifact(
     os.path.join(SRC_FOLDER_PATH, "src", "artifacts", "preprocessor.joblib")
-)
+))
 
-# 
-model = tf.keras.models.load_model(
-    os.path.join(SRC_FOLDER_PATH, "src", "artifacts", "best_titanic_model.keras")
-)
+MODEL_PATH = os.path.join(SRC_FOLDER_PATH, "src", "artifacts", "best_titanic_model.keras")
+# NumPy weight matrices of the model, exported from the .keras file (again when it changes)
+NUMPY_MODEL_PATH = os.path.join(SRC_FOLDER_PATH, "src", "artifacts", "best_titanic_model.npz")
+
+# `artifacts.predictor(X)` returns the survival probabilities of the preprocessed rows
+if INFERENCE_BACKEND == "numpy":
+    artifacts.register("predictor", numpy_dense_artifact(MODEL_PATH, NUMPY_MODEL_PATH))
+else:
+    artifacts.register("model", keras_artifact(MODEL_PATH))
+    if INFERENCE_BACKEND == "tf_function":
+        artifacts.register("predictor", compiled_artifact(lambda: artifacts.model))
+    else:
+        artifacts.register("predictor", keras_predict_artifact(lambda: artifacts.model))
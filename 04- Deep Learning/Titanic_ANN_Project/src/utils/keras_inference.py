@@ -0,0 +1,171 @@
+import hashlib
+import os
+from typing import Any, Callable, Iterable, List, Tuple
+
+import numpy as np
+
+
+INFERENCE_BACKENDS = ("keras", "tf_function", "numpy")
+
+
+class CompiledModel:
+    """
+    Forward pass of a Keras model as one `tf.function`, traced once for any batch size.
+
+    `model.predict` builds a data adapter and runs the whole predict loop on every call,
+    which costs milliseconds even for a single row. The function has a fixed input
+    signature `(None, *input_shape)` float32, so it is traced once (by the warm-up) and
+    every call after that is one graph execution.
+    """
+
+    def __init__(self, model, warm_up_batch_sizes: Iterable[int] = (1,)):
+        import tensorflow as tf
+
+        self.model = model
+        self.input_shape = tuple(model.input_shape[1:])
+        self.forward = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec((None, *self.input_shape), tf.float32)],
+            autograph=False,
+        )
+        for batch_size in warm_up_batch_sizes:
+            self(np.zeros((batch_size, *self.input_shape), dtype=np.float32))
+
+    def __call__(self, x) -> np.ndarray:
+        return self.forward(np.asarray(x, dtype=np.float32)).numpy()
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x):
+    # Same as Keras: 1 / (1 + exp(-x)), without overflow warnings for large negative x
+    return np.exp(-np.logaddexp(0, -x))
+
+
+def _softmax(x):
+    x = np.exp(x - x.max(axis=-1, keepdims=True))
+    return x / x.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+class NumpyDenseModel:
+    """
+    Framework-free copy of a Keras network made of Dense layers (plus Flatten / Dropout).
+
+    Each layer is a float32 weight matrix, a bias and an activation, so a prediction is a
+    few `matmul`s: no TensorFlow import, no graph, no per-call overhead.
+    """
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, str]], input_shape: Tuple[int, ...]):
+        for _, _, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {activation!r}")
+        self.layers = layers
+        self.input_shape = tuple(input_shape)
+
+    @classmethod
+    def from_keras(cls, model) -> "NumpyDenseModel":
+        layers = []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind in ("InputLayer", "Dropout", "Flatten"):
+                # Dropout does nothing at inference, Flatten is a reshape done on the input
+                continue
+            if kind != "Dense":
+                raise ValueError(f"{kind} layers can't be exported to NumPy, only Dense / Flatten / Dropout")
+            config = layer.get_config()
+            weights = layer.get_weights()
+            kernel = weights[0].astype(np.float32)
+            bias = weights[1].astype(np.float32) if config["use_bias"] else np.zeros(kernel.shape[1], np.float32)
+            layers.append((kernel, bias, config["activation"]))
+        return cls(layers, model.input_shape[1:])
+
+    def save(self, path: str, source_sha256: str = ""):
+        arrays = {"input_shape": np.array(self.input_shape), "source_sha256": np.array(source_sha256)}
+        for i, (kernel, bias, activation) in enumerate(self.layers):
+            arrays[f"kernel_{i}"], arrays[f"bias_{i}"], arrays[f"activation_{i}"] = kernel, bias, np.array(activation)
+        # Written to a temporary file first, workers starting together may export at the same time
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["NumpyDenseModel", str]:
+        with np.load(path, allow_pickle=False) as arrays:
+            n_layers = sum(name.startswith("kernel_") for name in arrays.files)
+            layers = [(arrays[f"kernel_{i}"], arrays[f"bias_{i}"], str(arrays[f"activation_{i}"]))
+                      for i in range(n_layers)]
+            return cls(layers, tuple(int(d) for d in arrays["input_shape"])), str(arrays["source_sha256"])
+
+    def __call__(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32).reshape(-1, self.layers[0][0].shape[0])
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = ACTIVATIONS[activation](x)
+        return x
+
+
+def file_sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def keras_predict_artifact(get_model: Callable[[], Any]) -> Callable[[], Callable]:
+    # The current path: `model.predict` on every call
+    def load():
+        model = get_model()
+        return lambda x: model.predict(x, verbose=0)
+    return load
+
+
+def compiled_artifact(get_model: Callable[[], Any], warm_up_batch_sizes: Iterable[int] = (1,)) -> Callable[[], Callable]:
+    def load():
+        return CompiledModel(get_model(), warm_up_batch_sizes)
+    return load
+
+
+def numpy_dense_artifact(keras_path: str, export_path: str, atol: float = 1e-5) -> Callable[[], Callable]:
+    """
+    Loads the NumPy export of the Keras model `keras_path`, without importing TensorFlow.
+
+    The export (`export_path`, .npz) records the SHA-256 of the .keras file it was made from.
+    When it is missing or out of date, the Keras model is loaded once, exported and checked
+    against the compiled Keras forward pass on random inputs (to `atol`). If the export can't
+    be written (read-only file system), the checked NumPy model is used from memory.
+    """
+    def load():
+        source_sha256 = file_sha256(keras_path)
+        if os.path.exists(export_path):
+            model, exported_from = NumpyDenseModel.load(export_path)
+            if exported_from == source_sha256:
+                return model
+
+        import tensorflow as tf
+        keras_model = tf.keras.models.load_model(keras_path)
+        model = NumpyDenseModel.from_keras(keras_model)
+
+        x = np.random.default_rng(0).normal(size=(256, *model.input_shape)).astype(np.float32)
+        error = np.abs(model(x) - CompiledModel(keras_model, warm_up_batch_sizes=())(x)).max()
+        if error > atol:
+            raise RuntimeError(f"The NumPy export of {keras_path} differs from Keras (max abs error {error:.2e})")
+
+        try:
+            model.save(export_path, source_sha256)
+        except OSError:
+            pass
+        return model
+    return load
@@ -9,3 +9,7 @@ class PassengerPrediction(BaseModel):
 class PredictionResponse(BaseModel):
     predictions: List[PassengerPrediction]
 
+
+class ColumnarPredictionResponse(BaseModel):
+    passenger_id: List[int]
+    predicted: List[Literal["survived", "not survived"]]
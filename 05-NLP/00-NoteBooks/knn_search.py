@@ -0,0 +1,120 @@
+"""
+Exact top-k nearest neighbours of documents vectorized by `CountVectorizer` / `TfidfVectorizer`.
+
+The queries are scored against every training document in blocks of rows: one sparse
+matrix-matrix product per block (instead of one `cosine_similarity` call per document),
+and the k best of each row are selected with `argpartition` (instead of sorting the whole
+training set). The size of a block is chosen so that its dense score matrix fits in
+`max_block_bytes`, and the blocks can be scored by several threads (SciPy's sparse products
+and NumPy's partition release the GIL).
+
+    knn = SparseKNN(metric="cosine", n_neighbors=3).fit(X_train_v, y_train)
+    scores, indices = knn.kneighbors(X_test_v)
+    y_pred = knn.predict(X_test_v)
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+METRICS = ("cosine", "dot", "euclidean")
+
+
+def _row_norms_squared(X: sp.csr_matrix) -> np.ndarray:
+    return np.asarray(X.multiply(X).sum(axis=1)).ravel()
+
+
+class SparseKNN:
+    """
+    Brute-force kNN over sparse rows, for the metrics of the notebook:
+    * cosine: cosine similarity, highest first (the rows are L2-normalized once)
+    * dot: dot product, highest first
+    * euclidean: euclidean distance, lowest first (from |q|^2 + |x|^2 - 2 q.x)
+    """
+
+    def __init__(self, metric: str = "cosine", n_neighbors: int = 3, max_block_bytes: int = 64 * 2**20,
+                 n_jobs: int = 1):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        self.metric = metric
+        self.n_neighbors = n_neighbors
+        self.max_block_bytes = max_block_bytes
+        self.n_jobs = n_jobs
+
+    def _prepare(self, X) -> sp.csr_matrix:
+        X = sp.csr_matrix(X, dtype=np.float64)
+        if self.metric == "cosine":
+            norms = np.sqrt(_row_norms_squared(X))
+            norms[norms == 0] = 1.0
+            X = sp.csr_matrix(sp.diags(1.0 / norms) @ X)
+        return X
+
+    def fit(self, X, y: Optional[Sequence] = None) -> "SparseKNN":
+        X = self._prepare(X)
+        # Transposed once, in CSR: a CSR x CSC product would convert the whole matrix on every block
+        self.train_T_ = X.T.tocsr()
+        self.train_norms_ = _row_norms_squared(X) if self.metric == "euclidean" else None
+        self.n_train_ = X.shape[0]
+        self.labels_ = np.asarray(y) if y is not None else None
+        return self
+
+    # Bytes per (query, training document) pair of a block: the sparse product (at most 8 bytes of
+    # value and 4 of index), its dense copy (8) and the argpartition indices (8)
+    BYTES_PER_SCORE = 28
+
+    def block_size(self) -> int:
+        # Query rows per block, so that the n_jobs blocks in flight fit in max_block_bytes
+        return max(1, self.max_block_bytes // (self.BYTES_PER_SCORE * self.n_train_ * max(1, self.n_jobs)))
+
+    def _score_block(self, Q: sp.csr_matrix, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Turned in place into costs, the best being the lowest for every metric: negated
+        # similarities, or squared distances for euclidean
+        costs = (Q @ self.train_T_).toarray()
+        costs *= -2 if self.metric == "euclidean" else -1
+        if self.metric == "euclidean":
+            costs += _row_norms_squared(Q)[:, None]
+            costs += self.train_norms_[None, :]
+
+        # k best of each row, unordered, then sorted best first
+        if k < self.n_train_:
+            top = np.argpartition(costs, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self.n_train_), (costs.shape[0], self.n_train_))
+        top_costs = np.take_along_axis(costs, top, axis=1)
+        order = np.argsort(top_costs, axis=1, kind="stable")
+        top, top_costs = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_costs, order, axis=1)
+
+        if self.metric == "euclidean":
+            return np.sqrt(np.maximum(top_costs, 0)), top
+        return -top_costs, top
+
+    def kneighbors(self, X, n_neighbors: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        ''' (scores, indices) of the nearest training documents of each row of X, best first:
+        similarities for cosine / dot, distances for euclidean '''
+        k = min(n_neighbors or self.n_neighbors, self.n_train_)
+        Q = self._prepare(X)
+        step = self.block_size()
+        blocks = [slice(start, min(start + step, Q.shape[0])) for start in range(0, Q.shape[0], step)]
+
+        scores = np.empty((Q.shape[0], k))
+        indices = np.empty((Q.shape[0], k), dtype=np.int64)
+
+        def run(block: slice):
+            scores[block], indices[block] = self._score_block(Q[block], k)
+
+        if self.n_jobs > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+                list(pool.map(run, blocks))
+        else:
+            for block in blocks:
+                run(block)
+        return scores, indices
+
+    def predict(self, X) -> np.ndarray:
+        ''' Most common label of the n_neighbors nearest documents (ties: the nearest label) '''
+        if self.labels_ is None:
+            raise ValueError("fit was called without labels")
+        _, indices = self.kneighbors(X)
+        return np.array([Counter(row).most_common(1)[0][0] for row in self.labels_[indices].tolist()])
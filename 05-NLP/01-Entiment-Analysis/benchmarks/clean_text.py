@@ -0,0 +1,79 @@
+"""
+Parity check and throughput benchmark for `TextProcessor.clean_text`.
+
+Compares the precompiled cleaning engine (and its token cache) against the step-by-step
+pipeline on the raw tweets, on the cleaned datasets and on random emoticon soups, then
+reports tweets/sec.
+
+Run from the project folder:
+    python -m benchmarks.clean_text
+"""
+import csv
+import os
+import random
+import time
+
+from src.config import SRC_FOLDER_PATH, EMOTIOCS_MEANINGS
+from src.utils.text_processor import TextProcessor
+
+NOTEBOOK_FOLDER_PATH = os.path.join(SRC_FOLDER_PATH, "notebook")
+
+
+def load_texts():
+    corpora = {}
+
+    with open(os.path.join(NOTEBOOK_FOLDER_PATH, "dataset", "testdata.manual.2009.06.14.csv"),
+              encoding="ISO-8859-1") as f:
+        corpora["raw tweets"] = [row[5] for row in csv.reader(f)]
+
+    for name in ("cleaned_dataset_1.csv", "cleaned_dataset_2.csv"):
+        with open(os.path.join(NOTEBOOK_FOLDER_PATH, "cleaned-dataset", name), encoding="utf-8") as f:
+            corpora[name] = [row["text"] for row in csv.DictReader(f)]
+
+    return corpora
+
+
+def emoticon_soup(n_texts: int, seed: int = 42):
+    # Random mixes of emoticons, their fragments and meanings to hit overlaps and cascades
+    rng = random.Random(seed)
+    pieces = list(EMOTIOCS_MEANINGS) + list(EMOTIOCS_MEANINGS.values())
+    pieces += list({char for key in EMOTIOCS_MEANINGS for char in key}) + [" ", "a", "#", "@user", "ooo"]
+    return [''.join(rng.choice(pieces) for _ in range(rng.randint(1, 8))) for _ in range(n_texts)]
+
+
+def check_parity(processor: TextProcessor, texts):
+    mismatches = [text for text in texts if processor.clean_text(text) != processor.clean_text_stepwise(text)]
+    assert not mismatches, f"{len(mismatches)} mismatches, first: {mismatches[0]!r}"
+
+
+def throughput(func, texts, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def main():
+    processor = TextProcessor()
+    corpora = load_texts()
+    corpora["emoticon soup"] = emoticon_soup(200_000)
+
+    for name, texts in corpora.items():
+        check_parity(processor, texts)
+        print(f"parity OK on {name} ({len(texts)} texts)")
+
+    tweets = corpora["raw tweets"]
+    stepwise = throughput(processor.clean_text_stepwise, tweets)
+    uncached = throughput(TextProcessor(token_cache_size=0).clean_text, tweets)
+    engine = throughput(processor.clean_text, tweets)
+    print(f"stepwise pipeline:          {stepwise:,.0f} tweets/sec")
+    print(f"engine without token cache: {uncached:,.0f} tweets/sec ({uncached / stepwise:.2f}x)")
+    print(f"engine with token cache:    {engine:,.0f} tweets/sec ({engine / stepwise:.2f}x)")
+    print(f"token cache: {processor.token_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Latency of `/health` while a large `/predict` batch is in flight, per execution backend.
+
+Run from the project folder:
+    python -m benchmarks.event_loop_latency [n_texts]
+"""
+import asyncio
+import csv
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+import main
+from src.config import SRC_FOLDER_PATH
+from src.models.inference import BACKENDS, TextClassifier
+
+
+def load_tweets():
+    path = os.path.join(SRC_FOLDER_PATH, "notebook", "dataset", "testdata.manual.2009.06.14.csv")
+    with open(path, encoding="ISO-8859-1") as f:
+        return [row[5] for row in csv.reader(f)]
+
+
+async def run(backend: str, texts, headers):
+    main.classifier = TextClassifier(backend=backend)
+    transport = httpx.ASGITransport(app=main.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        # Start the workers (process backend) before measuring
+        await client.post("/predict", json={"texts": texts[:10]}, headers=headers)
+
+        start = time.perf_counter()
+        batch = asyncio.create_task(client.post("/predict", json={"texts": texts}, headers=headers))
+        latencies = []
+        while not batch.done():
+            # Measured from when the ping was due, so a blocked event loop shows up as latency
+            due = time.perf_counter()
+            await asyncio.sleep(0.01)
+            await client.get("/health", headers=headers)
+            latencies.append(time.perf_counter() - due - 0.01)
+        response = await batch
+        total = time.perf_counter() - start
+
+    main.classifier.close()
+    assert response.status_code == 200, response.text
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{backend:>8}: batch {total:7.2f} s | /health p50 {statistics.median(latencies) * 1e3:8.2f} ms, "
+          f"p99 {p99 * 1e3:8.2f} ms, max {latencies[-1] * 1e3:8.2f} ms ({len(latencies)} pings)")
+
+
+def main_():
+    n_texts = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    tweets = load_tweets()
+    # A numeric suffix (removed by the cleaning) makes every text distinct, so the result cache doesn't skip them
+    texts = [f"{tweet} {i}" for i, tweet in enumerate((tweets * (n_texts // len(tweets) + 1))[:n_texts])]
+
+    if main.API_SECRET_KEY is None:
+        main.API_SECRET_KEY = "benchmark"
+    headers = {"X-API-Key": main.API_SECRET_KEY}
+
+    for backend in BACKENDS:
+        asyncio.run(run(backend, texts, headers))
+
+
+if __name__ == "__main__":
+    main_()
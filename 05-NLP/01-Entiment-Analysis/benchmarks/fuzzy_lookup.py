@@ -0,0 +1,110 @@
+"""
+Parity check and latency benchmark of `FuzzyMatcher` against naive all-pairs jellyfish.
+
+The vocabulary is the BOW vocabulary grown to 50k terms with made-up words (letters drawn
+from the bigrams of the real terms). The queries are vocabulary terms with one or two random
+edits, drawn with replacement so that they repeat like misspellings in tweets. The naive
+lookup compares a query with every term; it is timed on the first queries only (its cost per
+query doesn't depend on the query) and its matches are checked against the index on those.
+
+Needs `jellyfish` (`pip install jellyfish`). Run from the project folder:
+    python -m benchmarks.fuzzy_lookup [vocabulary_size] [max_distance]
+"""
+import random
+import string
+import sys
+import time
+from collections import defaultdict
+
+import jellyfish
+
+from src.config import artifacts
+from src.utils.fuzzy_matcher import FuzzyMatcher
+
+N_QUERIES = 10_000
+N_NAIVE_QUERIES = 20
+
+
+def grow_vocabulary(terms, size: int, rng: random.Random):
+    # Made-up words following the letter bigrams of the real terms
+    following = defaultdict(list)
+    for term in terms:
+        for first, second in zip("^" + term, term + "$"):
+            following[first].append(second)
+
+    vocabulary = set(terms)
+    while len(vocabulary) < size:
+        word, char = "", "^"
+        while len(word) < 15:
+            char = rng.choice(following[char])
+            if char == "$":
+                break
+            word += char
+        if len(word) > 2:
+            vocabulary.add(word)
+    return sorted(vocabulary)
+
+
+def misspell(word: str, edits: int, rng: random.Random) -> str:
+    for _ in range(edits):
+        position = rng.randrange(len(word) + 1)
+        operation = rng.choice(("insert", "delete", "substitute", "transpose"))
+        if operation == "insert" or len(word) < 2:
+            word = word[:position] + rng.choice(string.ascii_lowercase) + word[position:]
+        elif operation == "delete":
+            position = min(position, len(word) - 1)
+            word = word[:position] + word[position + 1:]
+        elif operation == "substitute":
+            position = min(position, len(word) - 1)
+            word = word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+        else:
+            position = min(position, len(word) - 2)
+            word = word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word
+
+
+def naive_lookup(token, vocabulary, max_distance, distance):
+    matches = [(term, d) for term in vocabulary if (d := distance(token, term)) <= max_distance]
+    return sorted(matches, key=lambda match: (match[1], match[0]))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    max_distance = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    rng = random.Random(42)
+
+    vocabulary = grow_vocabulary(list(artifacts.bow_vectorizer.vocabulary_), size, rng)
+    distinct = [misspell(rng.choice(vocabulary), rng.randint(1, 2), rng) for _ in range(N_QUERIES // 4)]
+    queries = rng.choices(distinct, k=N_QUERIES)
+    print(f"vocabulary: {len(vocabulary)} terms, {N_QUERIES} queries ({len(set(queries))} distinct), "
+          f"max distance {max_distance}")
+
+    for metric in ("levenshtein", "damerau_levenshtein"):
+        distance = getattr(jellyfish, f"{metric}_distance")
+
+        start = time.perf_counter()
+        matcher = FuzzyMatcher(vocabulary, max_distance=max_distance, metric=metric)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        naive = [naive_lookup(token, vocabulary, max_distance, distance) for token in queries[:N_NAIVE_QUERIES]]
+        naive_time = (time.perf_counter() - start) / N_NAIVE_QUERIES
+        for token, expected in zip(queries, naive):
+            assert matcher.lookup(token) == expected, f"{metric}: matches of {token!r} differ"
+        matcher._cached_lookup.cache_clear()
+
+        start = time.perf_counter()
+        matcher.lookup_batch(queries)
+        cold_time = (time.perf_counter() - start) / N_QUERIES
+
+        start = time.perf_counter()
+        matcher.lookup_batch(queries)
+        warm_time = (time.perf_counter() - start) / N_QUERIES
+
+        print(f"{metric:>19}: index built in {build_time:.1f} s ({len(matcher.index)} keys) | "
+              f"naive {naive_time * 1e3:8.2f} ms/query | index {cold_time * 1e3:6.3f} ms/query "
+              f"({naive_time / cold_time:6.0f}x), cached batch {warm_time * 1e6:6.2f} us/query")
+
+
+if __name__ == "__main__":
+    main()
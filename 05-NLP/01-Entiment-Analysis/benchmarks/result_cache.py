@@ -0,0 +1,56 @@
+"""
+Parity check and latency benchmark of the batch dedup + result cache of `TextClassifier`.
+
+The batches are sampled with replacement from the raw tweets (retweet-like duplicates),
+classified without dedup / cache (reference), then twice with them: cold (dedup only) and
+warm (every text is in the result cache).
+
+Run from the project folder:
+    python -m benchmarks.result_cache
+"""
+import csv
+import os
+import random
+import time
+
+from src.config import SRC_FOLDER_PATH
+from src.models.inference import TextClassifier
+
+BATCH_SIZES = (100, 10_000)
+
+
+def load_tweets():
+    path = os.path.join(SRC_FOLDER_PATH, "notebook", "dataset", "testdata.manual.2009.06.14.csv")
+    with open(path, encoding="ISO-8859-1") as f:
+        return [row[5] for row in csv.reader(f)]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    tweets = load_tweets()
+    reference = TextClassifier(backend="inline")
+    reference.load()
+
+    rng = random.Random(42)
+    for batch_size in BATCH_SIZES:
+        texts = rng.choices(tweets, k=batch_size)
+        classifier = TextClassifier(backend="inline")
+        classifier.load()
+
+        expected, reference_time = timed(lambda: reference._to_predictions(texts, reference.predict_labels(texts)))
+        (cold, cold_stats), cold_time = timed(classifier.classify, texts)
+        (warm, warm_stats), warm_time = timed(classifier.classify, texts)
+        assert cold == expected and warm == expected, "cached predictions differ from the reference"
+
+        print(f"batch {batch_size:>6}: reference {reference_time * 1e3:9.2f} ms | "
+              f"dedup {cold_time * 1e3:9.2f} ms (dedup ratio {cold_stats['dedup_ratio']:.2f}) | "
+              f"warm cache {warm_time * 1e3:9.2f} ms (hit rate {warm_stats['cache_hit_rate']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
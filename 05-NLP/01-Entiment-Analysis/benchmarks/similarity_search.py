@@ -0,0 +1,108 @@
+"""
+Recall@10 and query latency of the similar tweets index (LSH) against exact cosine search.
+
+The corpus is the cleaned tweets of `cleaned_dataset_*.csv`, grown to N documents with
+synthetic tweets that mix the words of two real ones. It is vectorized with the TF-IDF
+vectorizer, indexed, saved and loaded back memory-mapped, like in the service. The queries
+are real tweets with one word dropped. Exact top-10 is a sparse product with every document;
+an approximate neighbour counts as found when its similarity reaches the 10th exact one
+(identical tweets tie).
+
+Run from the project folder:
+    python -m benchmarks.similarity_search [n_documents ...]
+"""
+import csv
+import glob
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.config import SRC_FOLDER_PATH, artifacts
+from src.models.similarity_index import SimilarityIndex, _normalize
+
+K = 10
+N_QUERIES = 500
+
+
+def load_tweets():
+    tweets = []
+    for path in sorted(glob.glob(os.path.join(SRC_FOLDER_PATH, "notebook", "cleaned-dataset", "cleaned_dataset_*.csv"))):
+        with open(path, encoding="utf-8") as f:
+            tweets.extend(row["text"] for row in csv.DictReader(f) if row["text"].strip())
+    return tweets
+
+
+def synthetic_corpus(tweets, n_documents: int, rng: random.Random):
+    corpus = list(tweets[:n_documents])
+    words = [tweet.split() for tweet in tweets]
+    while len(corpus) < n_documents:
+        first, second = rng.sample(words, 2)
+        mixed = rng.sample(first, max(1, len(first) // 2)) + rng.sample(second, max(1, len(second) // 2))
+        rng.shuffle(mixed)
+        corpus.append(" ".join(mixed))
+    return corpus
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    vectorizer = artifacts.tfidf_vectorizer
+    tweets = load_tweets()
+    rng = random.Random(42)
+
+    queries = []
+    for tweet in rng.sample(tweets, min(N_QUERIES, len(tweets))):
+        words = tweet.split()
+        if len(words) > 1:
+            words.pop(rng.randrange(len(words)))
+        queries.append(" ".join(words))
+    Q = vectorizer.transform(queries)
+
+    for n_documents in sizes:
+        corpus = synthetic_corpus(tweets, n_documents, rng)
+        X = vectorizer.transform(corpus)
+
+        start = time.perf_counter()
+        index = SimilarityIndex(X.shape[1])
+        index.add(X, corpus)
+        index.merge()
+        build_time = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "similarity_index.joblib")
+            index.save(path)
+            size = os.path.getsize(path)
+            index = SimilarityIndex.load(path, mmap=True)
+
+            # Warm up the page cache, then time one query at a time like the service
+            for row in Q[:20]:
+                index.search(row, K)
+            timings, results = [], []
+            for row in Q:
+                start = time.perf_counter()
+                results.append(index.search(row, K))
+                timings.append(time.perf_counter() - start)
+            del index
+
+        # Exact scores of a block of queries at a time, (block, n_documents) dense
+        X_t, Q_norm = _normalize(X).T.tocsc(), _normalize(Q)
+        exact = (np.asarray((Q_norm[i:i + 50] @ X_t).todense()) for i in range(0, Q.shape[0], 50))
+        recalls = []
+        for scores, (_, found) in zip((row for block in exact for row in block), results):
+            threshold = -np.partition(-scores, K - 1)[K - 1]
+            relevant = min(K, int(np.count_nonzero(scores > 0)))
+            if relevant:
+                recalls.append(min(relevant, int(np.count_nonzero(found >= threshold - 1e-5))) / relevant)
+
+        timings.sort()
+        print(f"{n_documents:>9} documents: build {build_time:6.1f} s, {size / 2**20:7.1f} MiB | "
+              f"query p50 {statistics.median(timings) * 1e3:6.3f} ms, p99 {timings[int(len(timings) * 0.99)] * 1e3:6.3f} ms | "
+              f"recall@{K} {statistics.mean(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory / latency benchmark of the dense and the sparse vectorize + SVM predict paths.
+
+Cleaning is left out (it is the same for both paths): the batches are sampled from the
+already cleaned tweets of `cleaned_dataset_2.csv`.
+
+Run from the project folder:
+    python -m benchmarks.sparse_predict
+"""
+import csv
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.config import SRC_FOLDER_PATH, artifacts
+from src.models.sparse_svm import SparseSVMScorer
+
+BATCH_SIZES = (1, 100, 10_000)
+
+bow_vectorizer, svm_model = artifacts.bow_vectorizer, artifacts.svm_model
+
+
+def dense_predict(texts):
+    return svm_model.predict(bow_vectorizer.transform(texts).toarray())
+
+
+def measure(func, texts, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(texts)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func(texts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, statistics.median(timings), peak
+
+
+def main():
+    path = os.path.join(SRC_FOLDER_PATH, "notebook", "cleaned-dataset", "cleaned_dataset_2.csv")
+    with open(path, encoding="utf-8") as f:
+        corpus = [row["text"] for row in csv.DictReader(f)]
+
+    scorer = SparseSVMScorer(svm_model)
+    sparse_predict = lambda texts: scorer.predict(bow_vectorizer.transform(texts))
+    print(f"scoring mode: {scorer.mode}, vocabulary size: {len(bow_vectorizer.vocabulary_)}")
+
+    rng = random.Random(42)
+    for batch_size in BATCH_SIZES:
+        texts = rng.choices(corpus, k=batch_size)
+        repeats = 50 if batch_size < 10_000 else 5
+
+        dense_labels, dense_time, dense_peak = measure(dense_predict, texts, repeats)
+        sparse_labels, sparse_time, sparse_peak = measure(sparse_predict, texts, repeats)
+        assert np.array_equal(dense_labels, sparse_labels), "sparse and dense predictions differ"
+
+        print(f"batch {batch_size:>6}: "
+              f"dense {dense_time * 1e3:9.2f} ms / {dense_peak / 2**20:8.2f} MiB peak | "
+              f"sparse {sparse_time * 1e3:9.2f} ms / {sparse_peak / 2**20:8.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Extra cleaning latency and accuracy of the spelling correction stage of `TextProcessor`.
+
+The labelled tweets of `testdata.manual.2009.06.14.csv` are cleaned without correction, then
+with it (cold: empty correction cache, warm: second pass). For each pass: the time per 1k
+tweets, the p99 per tweet, the share of tokens the BOW vectorizer doesn't know, and the
+accuracy of the SVM on the non-neutral tweets.
+
+Run from the project folder:
+    python -m benchmarks.spell_correction [time_budget_ms]
+"""
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.config import SRC_FOLDER_PATH, SENTIMENT_MAPPING, FUZZY_METRIC, artifacts
+from src.utils.fuzzy_matcher import FuzzyMatcher
+from src.utils.spell_corrector import SpellCorrector
+from src.utils.text_processor import TextProcessor
+
+# Polarity of the dataset -> label of the model
+POLARITY_LABELS = {"0": "Negative", "2": "Neutral", "4": "Positive"}
+
+
+def load_tweets():
+    path = os.path.join(SRC_FOLDER_PATH, "notebook", "dataset", "testdata.manual.2009.06.14.csv")
+    with open(path, encoding="ISO-8859-1") as f:
+        rows = list(csv.reader(f))
+    return [row[5] for row in rows], [POLARITY_LABELS[row[0]] for row in rows]
+
+
+def clean_all(processor, tweets):
+    cleaned, timings = [], []
+    for tweet in tweets:
+        start = time.perf_counter()
+        cleaned.append(processor.clean_text(tweet))
+        timings.append(time.perf_counter() - start)
+    return cleaned, np.array(timings)
+
+
+def main():
+    time_budget = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.002
+    vectorizer, scorer = artifacts.bow_vectorizer, artifacts.svm_scorer
+    vocabulary = vectorizer.vocabulary_
+    tweets, labels = load_tweets()
+    labels = np.array(labels)
+    polar = labels != "Neutral"
+
+    processor = TextProcessor()
+    processor.warm_up(vocabulary)
+    clean_all(processor, tweets)  # token cache
+
+    start = time.perf_counter()
+    matcher = FuzzyMatcher(vocabulary, metric=FUZZY_METRIC)
+    print(f"{len(tweets)} tweets, vocabulary {len(vocabulary)} terms, fuzzy index built in "
+          f"{time.perf_counter() - start:.1f} s, time budget {time_budget * 1e3:g} ms per tweet")
+
+    results = {"no correction": clean_all(processor, tweets)}
+    processor.spell_corrector = SpellCorrector(matcher, vocabulary, time_budget=time_budget)
+    results["correction, cold"] = clean_all(processor, tweets)
+    results["correction, warm"] = clean_all(processor, tweets)
+
+    baseline = results["no correction"][1].sum()
+    for name, (cleaned, timings) in results.items():
+        tokens = [token for text in cleaned for token in text.lower().split()]
+        oov = sum(token not in vocabulary for token in tokens) / len(tokens)
+        predictions = np.array([SENTIMENT_MAPPING[int(label)] for label in scorer.predict(vectorizer.transform(cleaned))])
+        accuracy = np.mean(predictions[polar] == labels[polar])
+        print(f"{name:>17}: {timings.sum() / len(tweets) * 1e6:7.1f} ms / 1k tweets "
+              f"(+{(timings.sum() - baseline) / len(tweets) * 1e6:6.1f}), p99 {np.percentile(timings, 99) * 1e3:6.3f} ms | "
+              f"OOV tokens {oov:6.1%} | accuracy {accuracy:.3f}")
+    print(processor.spell_correction_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Memory and throughput of `/predict/stream` for growing inputs.
+
+A uvicorn server is started in a separate process (result cache disabled, so the texts are
+all classified and nothing is kept between requests). The client uploads the texts with a
+chunked body while it reads the NDJSON predictions (HTTP/1.1 over asyncio streams and h11,
+since httpx sends the whole body before reading the response). Every prediction is checked to
+be for the text sent on the same line. The server RSS is sampled during each request.
+
+Run from the project folder:
+    python -m benchmarks.stream_memory [n_texts ...]
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import h11
+import httpx
+
+from benchmarks.event_loop_latency import load_tweets
+from src.config import API_SECRET_KEY
+
+# The server reads .env too, which overrides the environment
+API_KEY = API_SECRET_KEY or "benchmark"
+UPLOAD_LINES = 1000
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        return int(next(line for line in f if line.startswith("VmRSS")).split()[1]) / 1024
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = {**os.environ, "APP_NAME": "benchmark", "VERSION": "0", "API_SECRET_KEY": API_KEY,
+           "RESULT_CACHE_SIZE": "0", "PRELOAD_ARTIFACTS": "true"}
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              env=env)
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ready").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("The server isn't ready")
+
+
+async def stream(port: int, texts, n_texts: int) -> int:
+    # Uploads n_texts lines and reads the predictions at the same time, returns the number of predictions
+    def text(i: int) -> str:
+        return f"{texts[i % len(texts)]} #{i}"
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    connection = h11.Connection(h11.CLIENT)
+    writer.write(connection.send(h11.Request(method="POST", target="/predict/stream", headers=[
+        ("Host", "127.0.0.1"), ("X-API-Key", API_KEY), ("Content-Type", "text/plain"), ("Transfer-Encoding", "chunked"),
+    ])))
+
+    async def upload():
+        for start in range(0, n_texts, UPLOAD_LINES):
+            lines = "".join(text(i) + "\n" for i in range(start, min(start + UPLOAD_LINES, n_texts)))
+            writer.write(connection.send(h11.Data(data=lines.encode())))
+            await writer.drain()
+        writer.write(connection.send(h11.EndOfMessage()))
+        await writer.drain()
+
+    uploading = asyncio.create_task(upload())
+    received, partial = 0, b""
+    while True:
+        event = connection.next_event()
+        if event is h11.NEED_DATA:
+            connection.receive_data(await reader.read(1 << 16))
+        elif isinstance(event, h11.Response):
+            assert event.status_code == 200, event
+        elif isinstance(event, h11.Data):
+            *lines, partial = (partial + bytes(event.data)).split(b"\n")
+            for line in lines:
+                prediction = json.loads(line)
+                assert prediction.get("text") == text(received), prediction
+                received += 1
+        elif isinstance(event, h11.EndOfMessage):
+            break
+    await uploading
+    writer.close()
+    return received
+
+
+async def measure(server: subprocess.Popen, port: int, texts, n_texts: int):
+    peak = rss_mib(server.pid)
+    request = asyncio.create_task(stream(port, texts, n_texts))
+    start = time.perf_counter()
+    while not request.done():
+        peak = max(peak, rss_mib(server.pid))
+        await asyncio.sleep(0.05)
+    received = await request
+    assert received == n_texts, f"{received} predictions for {n_texts} texts"
+    return time.perf_counter() - start, peak
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    texts = load_tweets()
+    port = free_port()
+    server = start_server(port)
+    try:
+        # Warm-up: worker threads, first allocations
+        asyncio.run(measure(server, port, texts, 2_000))
+        baseline = rss_mib(server.pid)
+        print(f"server RSS after warm-up: {baseline:.1f} MiB")
+        for n_texts in sizes:
+            elapsed, peak = asyncio.run(measure(server, port, texts, n_texts))
+            print(f"{n_texts:>9} texts: {n_texts / elapsed:9.0f} texts/s, peak server RSS {peak:7.1f} MiB "
+                  f"(+{peak - baseline:5.1f})")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
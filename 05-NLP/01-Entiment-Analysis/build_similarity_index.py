@@ -0,0 +1,78 @@
+"""
+Builds the similar tweets index served by `/similar` from cleaned tweets CSV files.
+
+The texts of the `text` column are vectorized with `src/artifacts/tfidf_vectorizer.pkl`, in
+chunks, and added to a `SimilarityIndex` saved to `SIMILARITY_INDEX_PATH`. With `--append`,
+the existing index is loaded and the new tweets are added to it (the same LSH parameters are
+kept). Restart the service (or its workers) to serve the new index.
+
+Usage (from the project folder):
+    python build_similarity_index.py                      # the cleaned_dataset_*.csv files
+    python build_similarity_index.py new_tweets.csv --append
+    python build_similarity_index.py raw.csv --text-column tweet --clean --tables 16 --bits 14
+"""
+import argparse
+import csv
+import glob
+import os
+import time
+from itertools import islice
+from typing import Iterator, List
+
+from src.config import SIMILARITY_INDEX_PATH, SRC_FOLDER_PATH, artifacts
+from src.models.similarity_index import SimilarityIndex
+
+DEFAULT_INPUTS = sorted(glob.glob(os.path.join(SRC_FOLDER_PATH, "notebook", "cleaned-dataset", "cleaned_dataset_*.csv")))
+
+
+def read_texts(paths: List[str], text_column: str) -> Iterator[str]:
+    for path in paths:
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                text = row[text_column]
+                if text and text.strip():
+                    yield text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the similar tweets index")
+    parser.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS, help="CSV files of tweets")
+    parser.add_argument("--output", default=SIMILARITY_INDEX_PATH)
+    parser.add_argument("--append", action="store_true", help="add the tweets to the existing index")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--clean", action="store_true", help="clean the texts first (raw tweets)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--tables", type=int, default=12)
+    parser.add_argument("--bits", type=int, default=16)
+    parser.add_argument("--probes", type=int, default=2)
+    args = parser.parse_args()
+
+    vectorizer = artifacts.tfidf_vectorizer
+    if args.append:
+        index = SimilarityIndex.load(args.output, mmap=False)
+    else:
+        index = SimilarityIndex(len(vectorizer.vocabulary_), n_tables=args.tables, n_bits=args.bits,
+                                n_probes=args.probes)
+    processor = None
+    if args.clean:
+        from src.utils.text_processor import TextProcessor
+        processor = TextProcessor()
+
+    start = time.perf_counter()
+    texts = read_texts(args.inputs, args.text_column)
+    added = 0
+    while True:
+        chunk = list(islice(texts, args.chunk_size))
+        if not chunk:
+            break
+        cleaned = [processor.clean_text(text) for text in chunk] if processor else chunk
+        index.add(vectorizer.transform(cleaned), chunk)
+        added += len(chunk)
+
+    index.save(args.output)
+    print(f"added {added} tweets in {time.perf_counter() - start:.1f} s, "
+          f"{len(index)} in {args.output} ({os.path.getsize(args.output) / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
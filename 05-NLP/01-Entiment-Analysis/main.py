@@ -1,14 +1,38 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
-from src.models.schemas import TextRequest, PredictionResponse
+from src.models.schemas import TextRequest, PredictionResponse, SimilarRequest, SimilarResponse
+from src.models.schemas import FuzzyRequest, FuzzyResponse
 from src.models.inference import TextClassifier
-from src.config import APP_NAME, VERSION, API_SECRET_KEY
+from src.models.similar_tweets import SimilarTweetFinder
+from src.utils.compact_response import COMPACT_RESPONSES, CompactResponse, wants_compact
+from src.utils.ndjson import NDJSON_MEDIA_TYPE, NDJSONStreamingResponse, ndjson_lines, read_batches
+from src.config import APP_NAME, VERSION, API_SECRET_KEY, PRELOAD_ARTIFACTS, artifacts
+from src.config import STREAM_CHUNK_SIZE, STREAM_MAX_LINE_BYTES
+
+# Create the classifier (its models are loaded by `classifier.load`)
+classifier = TextClassifier()
+similar_tweets = SimilarTweetFinder(classifier.processor)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the models in the background: "/health" answers right away, "/ready" once they are loaded
+    if PRELOAD_ARTIFACTS:
+        asyncio.get_running_loop().run_in_executor(None, classifier.load)
+    yield
+    classifier.close()
+
 
 app = FastAPI(
     title=APP_NAME,
     description="API for text classifying using outperformed BOW-SVM model",
-    version=VERSION
+    version=VERSION,
+    lifespan=lifespan
 )
 app.add_middleware(
     CORSMiddleware,
@@ -17,9 +41,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load the classifier
-classifier = TextClassifier()
-
 api_key_header = APIKeyHeader(name='X-API-Key')
 async def verify_api_key(api_key: str=Depends(api_key_header)):
     if api_key != API_SECRET_KEY:
@@ -32,17 +53,93 @@ async def health_check(api_key: str=Depends(verify_api_key)):
     return {
         "app_name": APP_NAME,
         "version": VERSION,
-        "status": "up & running"
+        "status": "up & running",
+        "token_cache": classifier.processor.token_cache_stats(),
+        "result_cache": classifier.result_cache_stats(),
+        "spell_correction": classifier.processor.spell_correction_stats()
+    }
+
+
+@app.get("/ready", tags=['Healthy'], description="Endpoint to check if the models are loaded")
+async def ready(response: Response):
+    if not classifier.ready:
+        response.status_code = 503
+    return {
+        "ready": classifier.ready,
+        "artifacts": artifacts.status()
     }
 
 
 @app.post("/predict", tags=['Classification'], 
-        description='Analyzes the sentiment of provided texts', response_model=PredictionResponse)
-async def predict(request: TextRequest, api_key: str=Depends(verify_api_key)):
+        description='Analyzes the sentiment of provided texts', response_model=PredictionResponse,
+        responses=COMPACT_RESPONSES)
+async def predict(request: TextRequest, http_request: Request, api_key: str=Depends(verify_api_key)):
     
     try:
-        predictions = classifier.predict(request.texts)
-        return PredictionResponse(predictions=predictions)
+        # Compact format: {"sentiment": [...], "stats": {...}}, in the order of the texts
+        if wants_compact(http_request):
+            sentiments, stats = await classifier.classify_async(request.texts, compact=True)
+            return CompactResponse({"sentiment": sentiments, "stats": stats})
+
+        predictions, stats = await classifier.classify_async(request.texts)
+        return PredictionResponse(predictions=predictions, stats=stats)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def stream_predictions(request: Request):
+    # One chunk of texts in memory at a time: the next chunk of the body is read once the
+    # predictions of the previous one are sent (a slow reader slows down the upload)
+    try:
+        async for texts in read_batches(request.stream(), STREAM_CHUNK_SIZE, STREAM_MAX_LINE_BYTES):
+            sentiments, _ = await classifier.classify_async(texts, compact=True)
+            yield ndjson_lines({"text": text, "sentiment": sentiment} for text, sentiment in zip(texts, sentiments))
+
+    except ClientDisconnect:
+        raise
+    # The status is already sent: errors (a line over STREAM_MAX_LINE_BYTES, ...) are the last line of the stream
+    except Exception as e:
+        yield ndjson_lines([{"error": str(e)}])
+
+
+@app.post("/predict/stream", tags=['Classification'],
+        description='Analyzes the sentiment of newline-delimited texts, streamed back as NDJSON in the same order',
+        response_class=StreamingResponse, responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}})
+async def predict_stream(request: Request, api_key: str=Depends(verify_api_key)):
+    return NDJSONStreamingResponse(stream_predictions(request))
+
+
+@app.post("/similar", tags=['Similarity'],
+        description='Finds the indexed tweets closest to each text (approximate cosine similarity of TF-IDF vectors)',
+        response_model=SimilarResponse)
+def similar(request: SimilarRequest, api_key: str=Depends(verify_api_key)):
+    # The index is built offline (build_similarity_index.py), the service can run without it
+    try:
+        for name in ("similarity_index", "tfidf_vectorizer"):
+            artifacts.get(name)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"The similarity index is not available: {e}")
+
+    try:
+        return SimilarResponse(results=similar_tweets.find(request.texts, request.k))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/vocabulary/fuzzy", tags=['Vocabulary'],
+        description='Finds the vocabulary terms within an edit distance of each token, closest first',
+        response_model=FuzzyResponse)
+def fuzzy_lookup(request: FuzzyRequest, api_key: str=Depends(verify_api_key)):
+    try:
+        matcher = artifacts.fuzzy_matcher
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"The fuzzy matcher is not available: {e}")
+
+    if request.max_distance is not None and request.max_distance > matcher.max_distance:
+        raise HTTPException(status_code=400, detail=f"max_distance can't be over {matcher.max_distance}")
+
+    matches = matcher.lookup_batch(request.tokens, request.max_distance)
+    return FuzzyResponse(matches={
+        token: [{"term": term, "distance": distance} for term, distance in found] for token, found in matches.items()
+    })
@@ -1,7 +1,7 @@
 
 from dotenv import load_dotenv
 import os
-import joblib
+from src.utils.artifacts import ArtifactRegistry, joblib_artifact, mmap_artifact
 
 load_dotenv(override=True)
 
@@ -11,15 +11,95 @@ APP_NAME = os.getenv("APP_NAME")
 VERSION = os.getenv("VERSION")
 API_SECRET_KEY = os.getenv("API_SECRET_KEY")
 
+# Token cache of the text processor (raw token -> lemmatized token)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "100000"))
+TOKEN_CACHE_WARM_UP = os.getenv("TOKEN_CACHE_WARM_UP", "true").lower() == "true"
+
+# Result cache of the classifier (raw text -> sentiment label), 0 disables it
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "100000"))
+
+# Execution backend of the classifier: "inline", "thread" or "process"
+EXECUTION_BACKEND = os.getenv("EXECUTION_BACKEND", "thread")
+EXECUTION_WORKERS = int(os.getenv("EXECUTION_WORKERS", str(os.cpu_count() or 1)))
+SHARD_SIZE = int(os.getenv("SHARD_SIZE", "2000"))
+
+# /predict/stream: texts classified per chunk, and the longest accepted line
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(64 * 1024)))
+
+# Load the models in the background on startup (otherwise on the first request)
+PRELOAD_ARTIFACTS = os.getenv("PRELOAD_ARTIFACTS", "true").lower() == "true"
+
+# Memory-map the arrays of the models, so that the workers share one copy of them
+MMAP_ARTIFACTS = os.getenv("MMAP_ARTIFACTS", "true").lower() == "true"
+
 # src folder path
 SRC_FOLDER_PATH = os.path.dirname(os.path.abspath(__file__))
 
 # Artifacts folder path
 ARTIFACTS_FOLDER_PATH = os.path.join(SRC_FOLDER_PATH, "artifacts")
 
-# models
-bow_vectorizer = joblib.load(os.path.join(ARTIFACTS_FOLDER_PATH, "bow_vectorizer.pkl"))
-svm_model = joblib.load(os.path.join(ARTIFACTS_FOLDER_PATH, "svm_bow.pkl"))
+# Memory-mappable copies of the models (written on first load)
+ARTIFACT_STORE_PATH = os.getenv("ARTIFACT_STORE_PATH", os.path.join(ARTIFACTS_FOLDER_PATH, "mmap"))
+
+# models, loaded on first use (artifacts.bow_vectorizer, ...) and not when this module is imported
+artifacts = ArtifactRegistry()
+# The vocabulary is a dict, there are no arrays to memory-map
+artifacts.register("bow_vectorizer", joblib_artifact(os.path.join(ARTIFACTS_FOLDER_PATH, "bow_vectorizer.pkl")))
+
+
+def _build_svm_scorer(svm_model):
+    from src.models.sparse_svm import SparseSVMScorer
+    return SparseSVMScorer(svm_model)
+
+
+# The sparse scorer precomputes its matrices from the model, it is built once as well
+if MMAP_ARTIFACTS:
+    # The scorer is stored with its model: the support vectors and the precomputed matrices are all shared
+    artifacts.register("svm_scorer", mmap_artifact(
+        os.path.join(ARTIFACTS_FOLDER_PATH, "svm_bow.pkl"), ARTIFACT_STORE_PATH, name="svm_scorer",
+        build=_build_svm_scorer, depends_on=[os.path.join(SRC_FOLDER_PATH, "models", "sparse_svm.py")]
+    ))
+    artifacts.register("svm_model", lambda: artifacts.svm_scorer.model)
+else:
+    artifacts.register("svm_model", joblib_artifact(os.path.join(ARTIFACTS_FOLDER_PATH, "svm_bow.pkl")))
+    artifacts.register("svm_scorer", lambda: _build_svm_scorer(artifacts.svm_model))
+
+# Similar tweets: TF-IDF vectors of the query texts, searched in an index built offline by
+# build_similarity_index.py (both optional, only /similar needs them)
+SIMILARITY_INDEX_PATH = os.getenv("SIMILARITY_INDEX_PATH", os.path.join(ARTIFACTS_FOLDER_PATH, "similarity_index.joblib"))
+
+
+def _load_similarity_index():
+    from src.models.similarity_index import SimilarityIndex
+    return SimilarityIndex.load(SIMILARITY_INDEX_PATH, mmap=MMAP_ARTIFACTS)
+
+
+artifacts.register("tfidf_vectorizer", joblib_artifact(os.path.join(ARTIFACTS_FOLDER_PATH, "tfidf_vectorizer.pkl")),
+                   optional=True)
+artifacts.register("similarity_index", _load_similarity_index, optional=True)
+
+# Fuzzy lookup of tokens in the BOW vocabulary: largest edit distance of the index, LRU size,
+# distance ("levenshtein" or "damerau_levenshtein", which counts a transposition as one typo)
+FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "2"))
+FUZZY_METRIC = os.getenv("FUZZY_METRIC", "levenshtein")
+FUZZY_CACHE_SIZE = int(os.getenv("FUZZY_CACHE_SIZE", "100000"))
+
+
+def _build_fuzzy_matcher():
+    from src.utils.fuzzy_matcher import FuzzyMatcher
+    return FuzzyMatcher(artifacts.bow_vectorizer.vocabulary_, max_distance=FUZZY_MAX_DISTANCE,
+                        metric=FUZZY_METRIC, cache_size=FUZZY_CACHE_SIZE)
+
+
+# Built from the vocabulary on first use (optional, only /vocabulary/fuzzy needs it)
+artifacts.register("fuzzy_matcher", _build_fuzzy_matcher, optional=True)
+
+# Spelling correction of the out-of-vocabulary tokens at the end of cleaning (uses the fuzzy
+# matcher): time budget per text, cache of corrected tokens
+SPELL_CORRECTION = os.getenv("SPELL_CORRECTION", "false").lower() == "true"
+SPELL_TIME_BUDGET_MS = float(os.getenv("SPELL_TIME_BUDGET_MS", "2"))
+SPELL_CACHE_SIZE = int(os.getenv("SPELL_CACHE_SIZE", "100000"))
 
 # Some constants
 EMOTIOCS_MEANINGS = {
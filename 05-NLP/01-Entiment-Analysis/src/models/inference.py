@@ -1,32 +1,175 @@
-from typing import List, Dict
-from src.config import bow_vectorizer, svm_model
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+from typing import List, Dict, Optional, Tuple
+from src.config import artifacts
 from src.utils.text_processor import TextProcessor
-from src.config import SENTIMENT_MAPPING
+from src.utils.result_cache import ResultCache
+from src.utils.spell_corrector import SpellCorrector
+from src.config import SENTIMENT_MAPPING, TOKEN_CACHE_WARM_UP
+from src.config import EXECUTION_BACKEND, EXECUTION_WORKERS, SHARD_SIZE, RESULT_CACHE_SIZE
+from src.config import SPELL_CORRECTION, SPELL_TIME_BUDGET_MS, SPELL_CACHE_SIZE, FUZZY_MAX_DISTANCE
+
+BACKENDS = ("inline", "thread", "process")
+
+# The classifier of a process pool worker, created once by the pool initializer
+_worker_classifier = None
+
+
+def _init_worker():
+    global _worker_classifier
+    _worker_classifier = TextClassifier(backend="inline")
+    _worker_classifier.load()
+
+
+def _predict_shard(texts: List[str]) -> List[str]:
+    return _worker_classifier.predict_labels(texts)
+
 
 class TextClassifier:
-    def __init__(self):
+    def __init__(self, backend: str = EXECUTION_BACKEND, max_workers: int = EXECUTION_WORKERS,
+                 shard_size: int = SHARD_SIZE, result_cache_size: int = RESULT_CACHE_SIZE):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown execution backend {backend!r}, expected one of {BACKENDS}")
+
         self.processor = TextProcessor()
-        self.vectorizer = bow_vectorizer
-        self.model = svm_model
         self.sentiment_mapping = SENTIMENT_MAPPING
 
-    def predict(self, texts: List[str]) -> List[Dict[str, str]]:
+        # Raw text -> label of the texts already classified (0 disables it)
+        self.result_cache = ResultCache(result_cache_size) if result_cache_size > 0 else None
+
+        # The models are loaded by `load`, on startup or on the first prediction
+        self.loaded = False
+        self.load_lock = threading.Lock()
+
+        self.backend = backend
+        self.shard_size = shard_size
+        self.executor: Optional[Executor] = None
+        if backend == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        elif backend == "process":
+            self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+
+    @property
+    def vectorizer(self):
+        return artifacts.bow_vectorizer
+
+    @property
+    def model(self):
+        return artifacts.svm_model
+
+    @property
+    def scorer(self):
+        return artifacts.svm_scorer
+
+    def load(self):
+        # Load the artifacts and warm up the token cache (once)
+        with self.load_lock:
+            if self.loaded:
+                return
+            artifacts.preload()
+
+            # Warm up the token cache with the words the vectorizer knows
+            if TOKEN_CACHE_WARM_UP:
+                self.processor.warm_up(self.vectorizer.vocabulary_)
+
+            # Correct the tokens the vectorizer doesn't know (needs the fuzzy matcher of the vocabulary)
+            if SPELL_CORRECTION and self.processor.spell_corrector is None:
+                self.processor.spell_corrector = SpellCorrector(
+                    artifacts.fuzzy_matcher, self.vectorizer.vocabulary_, max_distance=FUZZY_MAX_DISTANCE,
+                    time_budget=SPELL_TIME_BUDGET_MS / 1000, cache_size=SPELL_CACHE_SIZE
+                )
+            self.loaded = artifacts.ready
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded
+
+    def predict_labels(self, texts: List[str]) -> List[str]:
+        if not self.loaded:
+            self.load()
+
         # Clean and preprocess texts
         cleaned_texts = [self.processor.clean_text(text) for text in texts]
-        
-        # Vectorize
-        vectors = self.vectorizer.transform(cleaned_texts).toarray()
-        
+
+        # Vectorize (kept as a sparse CSR matrix)
+        vectors = self.vectorizer.transform(cleaned_texts)
+
         # Predict
-        raw_predictions = self.model.predict(vectors)
-        
+        raw_predictions = self.scorer.predict(vectors)
+        return [self.sentiment_mapping[int(label)] for label in raw_predictions]
+
+    def _shards(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+
+    def _to_predictions(self, texts: List[str], labels: List[str]) -> List[Dict[str, str]]:
         # Create sentiment predictions as list of dictionaries
-        predictions = []
-        for text, label in zip(texts, raw_predictions):
-            prediction_dict = {
-                "text": text,
-                "sentiment": self.sentiment_mapping[int(label)]
-            }
-            predictions.append(prediction_dict)
-        
-        return predictions
\ No newline at end of file
+        return [{"text": text, "sentiment": label} for text, label in zip(texts, labels)]
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, str], List[str]]:
+        # Each distinct text is looked up (and classified) once, duplicates in a batch are free
+        unique_texts = list(dict.fromkeys(texts))
+        found = self.result_cache.get_many(unique_texts) if self.result_cache is not None else {}
+        missing = [text for text in unique_texts if text not in found]
+        return unique_texts, found, missing
+
+    def _scatter(self, texts: List[str], unique_texts: List[str], found: Dict[str, str],
+                 missing: List[str], labels: List[str], compact: bool = False) -> Tuple[list, Dict[str, float]]:
+        # Put the labels back in the order of the request, with the dedup / cache stats of the request.
+        # `compact` keeps the bare labels, without a prediction dict per text
+        computed = dict(zip(missing, labels))
+        if self.result_cache is not None and computed:
+            self.result_cache.set_many(computed)
+        cache_hits = len(found)
+        found.update(computed)
+
+        stats = {
+            "texts": len(texts),
+            "unique_texts": len(unique_texts),
+            "dedup_ratio": 1 - len(unique_texts) / len(texts) if texts else 0.0,
+            "cache_hits": cache_hits,
+            "cache_hit_rate": cache_hits / len(unique_texts) if unique_texts else 0.0,
+        }
+        labels = [found[text] for text in texts]
+        return (labels if compact else self._to_predictions(texts, labels)), stats
+
+    def classify(self, texts: List[str], compact: bool = False) -> Tuple[list, Dict[str, float]]:
+        unique_texts, found, missing = self._lookup(texts)
+        labels = []
+        if missing and self.backend == "process":
+            # Executor.map keeps the order of the shards
+            labels = list(chain.from_iterable(self.executor.map(_predict_shard, self._shards(missing))))
+        elif missing:
+            labels = self.predict_labels(missing)
+        return self._scatter(texts, unique_texts, found, missing, labels, compact)
+
+    async def classify_async(self, texts: List[str], compact: bool = False) -> Tuple[list, Dict[str, float]]:
+        # Same as classify, without blocking the event loop (except for the inline backend)
+        if self.backend == "inline":
+            return self.classify(texts, compact)
+
+        unique_texts, found, missing = self._lookup(texts)
+        labels = []
+        loop = asyncio.get_running_loop()
+        if missing and self.backend == "thread":
+            labels = await loop.run_in_executor(self.executor, self.predict_labels, missing)
+        elif missing:
+            shard_labels = await asyncio.gather(*[
+                loop.run_in_executor(self.executor, _predict_shard, shard) for shard in self._shards(missing)
+            ])
+            labels = list(chain.from_iterable(shard_labels))
+        return self._scatter(texts, unique_texts, found, missing, labels, compact)
+
+    def predict(self, texts: List[str]) -> List[Dict[str, str]]:
+        return self.classify(texts)[0]
+
+    async def predict_async(self, texts: List[str]) -> List[Dict[str, str]]:
+        return (await self.classify_async(texts))[0]
+
+    def result_cache_stats(self) -> Dict[str, float]:
+        return self.result_cache.stats() if self.result_cache is not None else {"max_size": 0}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
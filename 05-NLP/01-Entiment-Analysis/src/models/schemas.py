@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Annotated, Dict, List, Optional
 
 class TextRequest(BaseModel):
     texts: List[str] = Field(
@@ -35,8 +35,17 @@ class SentimentPrediction(BaseModel):
     }
 
 
+class PredictionStats(BaseModel):
+    texts: int
+    unique_texts: int
+    dedup_ratio: float = Field(..., description="Share of the texts that were duplicates of another text of the request")
+    cache_hits: int
+    cache_hit_rate: float = Field(..., description="Share of the unique texts found in the result cache")
+
+
 class PredictionResponse(BaseModel):
     predictions: List[SentimentPrediction]
+    stats: Optional[PredictionStats] = None
 
     model_config = {
         "json_schema_extra": {
@@ -50,7 +59,92 @@ class PredictionResponse(BaseModel):
                         "text": "I hate this service",
                         "sentiment": "Negative"
                     }
+                ],
+                "stats": {
+                    "texts": 2,
+                    "unique_texts": 2,
+                    "dedup_ratio": 0.0,
+                    "cache_hits": 1,
+                    "cache_hit_rate": 0.5
+                }
+            }
+        }
+    }
+
+
+class SimilarRequest(TextRequest):
+    k: int = Field(10, ge=1, le=100, description="Number of similar tweets per text")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "texts": ["I love my new kindle"],
+                "k": 3
+            }
+        }
+    }
+
+
+class SimilarTweet(BaseModel):
+    text: str
+    score: float = Field(..., description="Cosine similarity of the TF-IDF vectors")
+
+
+class SimilarTweets(BaseModel):
+    text: str
+    similar: List[SimilarTweet]
+
+
+class SimilarResponse(BaseModel):
+    results: List[SimilarTweets]
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "results": [
+                    {
+                        "text": "I love my new kindle",
+                        "similar": [
+                            {"text": "love Kindle cool fantastic right", "score": 0.71},
+                            {"text": "Reading kindle Love childs good read", "score": 0.54}
+                        ]
+                    }
                 ]
             }
         }
     }
+
+
+class FuzzyRequest(BaseModel):
+    tokens: List[Annotated[str, Field(max_length=100)]] = Field(
+        ..., description="Tokens to look up in the vocabulary (up to 100 characters each)", min_length=1)
+    max_distance: Optional[int] = Field(None, ge=0, description="Largest edit distance (default: the distance of the index)")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "tokens": ["gooood", "hapy", "kindle"],
+                "max_distance": 2
+            }
+        }
+    }
+
+
+class FuzzyMatch(BaseModel):
+    term: str
+    distance: int
+
+
+class FuzzyResponse(BaseModel):
+    matches: Dict[str, List[FuzzyMatch]]
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "matches": {
+                    "hapy": [{"term": "happy", "distance": 1}, {"term": "hap", "distance": 1}],
+                    "kindle": [{"term": "kindle", "distance": 0}]
+                }
+            }
+        }
+    }
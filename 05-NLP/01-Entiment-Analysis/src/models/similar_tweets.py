@@ -0,0 +1,35 @@
+from typing import Dict, List, Union
+from src.config import artifacts
+from src.utils.text_processor import TextProcessor
+
+
+class SimilarTweetFinder:
+    """
+    Finds the indexed tweets closest to some texts: the texts are cleaned like for the
+    sentiment, vectorized with the TF-IDF vectorizer and searched in the similarity index.
+    """
+
+    def __init__(self, processor: TextProcessor):
+        # Shared with the classifier, so is its token cache
+        self.processor = processor
+
+    @property
+    def vectorizer(self):
+        return artifacts.tfidf_vectorizer
+
+    @property
+    def index(self):
+        return artifacts.similarity_index
+
+    def find(self, texts: List[str], k: int = 10) -> List[Dict[str, Union[str, list]]]:
+        index = self.index
+        vectors = self.vectorizer.transform([self.processor.clean_text(text) for text in texts])
+
+        results = []
+        for text, row in zip(texts, vectors):
+            doc_ids, scores = index.search(row, k)
+            results.append({
+                "text": text,
+                "similar": [{"text": index.text(doc_id), "score": float(score)} for doc_id, score in zip(doc_ids, scores)]
+            })
+        return results
@@ -0,0 +1,211 @@
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # Concatenation of range(start, start + length) for each pair, without a Python loop
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+
+def _normalize(X) -> sparse.csr_matrix:
+    X = sparse.csr_matrix(X, dtype=np.float32)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ X, dtype=np.float32)
+
+
+class SimilarityIndex:
+    """
+    Approximate cosine nearest neighbours of TF-IDF rows, with random-projection LSH.
+
+    Every document gets `n_tables` signatures of `n_bits` bits (the signs of its projections
+    on random hyperplanes). A query reads the documents of its own bucket in each table, and of
+    the buckets one bit away on its `n_probes` least certain bits (multi-probe), then scores
+    only those candidates exactly. The (table, signature) keys of all the documents are kept in
+    one sorted array, so all the buckets of a query are found by one `searchsorted`, and at most
+    `max_bucket_size` documents are read from a bucket.
+
+    The index is made of flat NumPy arrays (sorted keys, L2-normalized CSR rows, UTF-8 texts):
+    loaded with `mmap_mode="r"`, they are mapped instead of read, and shared by the workers.
+    Documents added with `add` go to an in-memory segment that is searched exhaustively, and
+    are folded into the arrays by `merge` (automatically past `max_pending` documents).
+    Searches can run in several threads; `add` and `merge` are meant for a single writer while
+    nothing searches (the service only reads the index, `build_similarity_index.py --append`
+    inserts offline).
+    """
+
+    def __init__(self, n_features: int, n_tables: int = 12, n_bits: int = 16, n_probes: int = 2,
+                 max_bucket_size: int = 2000, max_pending: int = 10_000, seed: int = 42):
+        if n_tables * 2 ** n_bits > 2 ** 32:
+            raise ValueError("n_tables * 2 ** n_bits must fit in 32 bits")
+        if not 0 <= n_probes <= n_bits:
+            raise ValueError(f"n_probes must be between 0 and n_bits ({n_bits})")
+        self.n_features = n_features
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = n_probes
+        self.max_bucket_size = max_bucket_size
+        self.max_pending = max_pending
+
+        rng = np.random.default_rng(seed)
+        self.projection = rng.standard_normal((n_features, n_tables * n_bits), dtype=np.float32)
+        self.bit_values = (np.uint32(1) << np.arange(n_bits, dtype=np.uint32))
+        self.table_offsets = np.arange(n_tables, dtype=np.uint32) << np.uint32(n_bits)
+
+        # Merged segment: keys sorted, with the document of each key
+        self.keys = np.empty(0, dtype=np.uint32)
+        self.doc_ids = np.empty(0, dtype=np.int32)
+        # Normalized rows (CSR arrays) and texts of the documents
+        self.data = np.empty(0, dtype=np.float32)
+        self.indices = np.empty(0, dtype=np.int32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.text_bytes = np.empty(0, dtype=np.uint8)
+        self.text_offsets = np.zeros(1, dtype=np.int64)
+
+        # Pending segment, searched exhaustively until merged
+        self._pending_rows: List[sparse.csr_matrix] = []
+        self._pending_texts: List[str] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def n_merged(self) -> int:
+        return len(self.indptr) - 1
+
+    def __len__(self) -> int:
+        return self.n_merged + len(self._pending_texts)
+
+    def _keys(self, projections: np.ndarray) -> np.ndarray:
+        # (n, n_tables * n_bits) projections -> (n, n_tables) keys, the table in the high bits
+        bits = (projections.reshape(-1, self.n_tables, self.n_bits) > 0).astype(np.uint32)
+        return (bits @ self.bit_values) | self.table_offsets
+
+    def add(self, X, texts: Sequence[str]):
+        """Adds the TF-IDF rows `X` of `texts`, they can be found right away."""
+        if X.shape[0] != len(texts):
+            raise ValueError(f"{X.shape[0]} rows for {len(texts)} texts")
+        rows = _normalize(X)
+        with self._lock:
+            self._pending_rows.append(rows)
+            self._pending_texts.extend(texts)
+            if len(self._pending_texts) >= self.max_pending:
+                self._merge()
+
+    def _pending_matrix(self) -> Optional[sparse.csr_matrix]:
+        # The rows added since the last call are stacked here, on first use, instead of on
+        # every `add` (which would copy all the pending rows again each time). Called under the lock
+        if len(self._pending_rows) > 1:
+            self._pending_rows = [sparse.vstack(self._pending_rows, format="csr")]
+        return self._pending_rows[0] if self._pending_rows else None
+
+    def merge(self):
+        """Folds the pending documents into the sorted arrays (in memory, until saved)."""
+        with self._lock:
+            self._merge()
+
+    def _merge(self, block_size: int = 10_000):
+        if not self._pending_texts:
+            return
+        rows = self._pending_matrix()
+        first_id = self.n_merged
+
+        # Empty rows (only unknown words) have no signature, they would all fall in bucket 0
+        new_keys, new_ids = [], []
+        for start in range(0, rows.shape[0], block_size):
+            block = rows[start:start + block_size]
+            non_empty = np.flatnonzero(np.diff(block.indptr))
+            keys = self._keys(np.asarray(block[non_empty] @ self.projection))
+            new_keys.append(keys.ravel())
+            new_ids.append(np.repeat(first_id + start + non_empty, self.n_tables).astype(np.int32))
+
+        keys = np.concatenate([self.keys, *new_keys])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.doc_ids = np.concatenate([self.doc_ids, *new_ids])[order]
+
+        self.data = np.concatenate([self.data, rows.data])
+        self.indices = np.concatenate([self.indices, rows.indices.astype(np.int32)])
+        self.indptr = np.concatenate([self.indptr, self.indptr[-1] + rows.indptr[1:].astype(np.int64)])
+
+        encoded = [text.encode("utf-8") for text in self._pending_texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        self.text_bytes = np.concatenate([self.text_bytes, np.frombuffer(b"".join(encoded), dtype=np.uint8)])
+        self.text_offsets = np.concatenate([self.text_offsets, self.text_offsets[-1] + np.cumsum(lengths)])
+
+        self._pending_rows, self._pending_texts = [], []
+
+    def _candidates(self, projection: np.ndarray) -> np.ndarray:
+        projection = projection.reshape(self.n_tables, self.n_bits)
+        keys = self._keys(projection)[0]
+        if self.n_probes:
+            # Flip the bits whose hyperplane is the closest to the query
+            uncertain = np.argsort(np.abs(projection), axis=1)[:, :self.n_probes]
+            keys = np.concatenate([keys, (keys[:, None] ^ self.bit_values[uncertain]).ravel()])
+
+        starts = np.searchsorted(self.keys, keys, side="left")
+        ends = np.minimum(np.searchsorted(self.keys, keys, side="right"), starts + self.max_bucket_size)
+        return np.unique(self.doc_ids[_ranges(starts, ends - starts)])
+
+    def _score(self, doc_ids: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # Dot products of merged rows with a dense query, straight from the CSR arrays
+        starts = self.indptr[doc_ids]
+        lengths = self.indptr[doc_ids + 1] - starts
+        positions = _ranges(starts, lengths)
+        values = self.data[positions] * query[self.indices[positions]]
+        return np.bincount(np.repeat(np.arange(len(doc_ids)), lengths), weights=values, minlength=len(doc_ids))
+
+    def search(self, x, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """(document ids, cosine similarities) of the approximate k nearest documents of one row, best first."""
+        x = _normalize(x)
+        if x.nnz == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        query = np.zeros(self.n_features, dtype=np.float32)
+        query[x.indices] = x.data
+
+        doc_ids = self._candidates(np.asarray(x @ self.projection))
+        scores = self._score(doc_ids, query)
+
+        with self._lock:
+            pending = self._pending_matrix()
+        if pending is not None:
+            doc_ids = np.concatenate([doc_ids, self.n_merged + np.arange(pending.shape[0])])
+            scores = np.concatenate([scores, pending @ query])
+
+        # Candidates without a word in common with the query aren't neighbours
+        doc_ids, scores = doc_ids[scores > 0], scores[scores > 0]
+        if len(doc_ids) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            doc_ids, scores = doc_ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return doc_ids[order].astype(np.int64), scores[order]
+
+    def text(self, doc_id: int) -> str:
+        if doc_id >= self.n_merged:
+            return self._pending_texts[doc_id - self.n_merged]
+        return bytes(self.text_bytes[self.text_offsets[doc_id]:self.text_offsets[doc_id + 1]]).decode("utf-8")
+
+    def save(self, path: str):
+        """Merges the pending documents and writes the index (uncompressed, so it can be memory-mapped)."""
+        import joblib
+        self.merge()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> "SimilarityIndex":
+        import joblib
+        return joblib.load(path, mmap_mode="r" if mmap else None)
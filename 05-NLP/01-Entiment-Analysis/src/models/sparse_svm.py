@@ -0,0 +1,94 @@
+import numpy as np
+from scipy import sparse
+
+
+class SparseSVMScorer:
+    """
+    Scores sparse (CSR) inputs with a fitted `SVC` without densifying them.
+
+    An SVC fitted on dense arrays refuses sparse inputs, so the one-vs-one decision values
+    are rebuilt from the support vectors: a linear kernel is folded into precomputed weights
+    (scoring is a sparse dot product), the other kernels are evaluated between the sparse
+    inputs and the support vectors, `block_size` rows at a time. The voting follows libsvm, so the labels are the same
+    as `model.predict` on the dense matrix.
+    """
+
+    def __init__(self, model, block_size: int = 1024):
+        self.model = model
+        self.block_size = block_size
+        self.classes = model.classes_
+        self.intercept = model._intercept_
+
+        # (support vectors slice, dual coefficients) of both classes of each pair, in libsvm order
+        dual_coef = model._dual_coef_
+        starts = np.concatenate([[0], np.cumsum(model.n_support_)])
+        self.pairs = []
+        for i in range(len(self.classes)):
+            for j in range(i + 1, len(self.classes)):
+                sv_i = slice(starts[i], starts[i + 1])
+                sv_j = slice(starts[j], starts[j + 1])
+                self.pairs.append((i, j, sv_i, dual_coef[j - 1, sv_i], sv_j, dual_coef[i, sv_j]))
+
+        if model._sparse:
+            self.mode = "native"
+        elif model.kernel == "linear":
+            self.mode = "linear"
+            support_vectors = model.support_vectors_
+            self.weights = np.vstack([
+                coef_i @ support_vectors[sv_i] + coef_j @ support_vectors[sv_j]
+                for _, _, sv_i, coef_i, sv_j, coef_j in self.pairs
+            ])
+        elif model.kernel in ("rbf", "poly", "sigmoid"):
+            self.mode = "kernel"
+            self.support_vectors_t = np.ascontiguousarray(model.support_vectors_.T)
+            self.support_vectors_sq_norms = np.einsum("ij,ij->i", model.support_vectors_, model.support_vectors_)
+        else:
+            # Callable / precomputed kernels only work on what they were fitted on
+            self.mode = "dense"
+
+    def _kernel(self, X) -> np.ndarray:
+        # Every kernel only needs the sparse-dense product X . SV^T
+        model = self.model
+        dot = np.asarray(X @ self.support_vectors_t)
+        if model.kernel == "rbf":
+            x_sq_norms = np.asarray(X.multiply(X).sum(axis=1)) if sparse.issparse(X) else np.einsum("ij,ij->i", X, X)[:, None]
+            dot *= -2
+            dot += x_sq_norms
+            dot += self.support_vectors_sq_norms
+            np.maximum(dot, 0, out=dot)
+            dot *= -model._gamma
+            return np.exp(dot, out=dot)
+        if model.kernel == "poly":
+            return (model._gamma * dot + model.coef0) ** model.degree
+        return np.tanh(model._gamma * dot + model.coef0)
+
+    def decision_values(self, X) -> np.ndarray:
+        """One-vs-one decision values, shape (n_samples, n_classes * (n_classes - 1) / 2)."""
+        if self.mode == "linear":
+            return np.asarray(X @ self.weights.T) + self.intercept
+
+        # The kernel matrix is (n_samples, n_SV), so it is built block by block to bound memory
+        decision = np.empty((X.shape[0], len(self.pairs)))
+        for start in range(0, X.shape[0], self.block_size):
+            block = slice(start, start + self.block_size)
+            kernel = self._kernel(X[block])
+            for pair, (_, _, sv_i, coef_i, sv_j, coef_j) in enumerate(self.pairs):
+                decision[block, pair] = kernel[:, sv_i] @ coef_i + kernel[:, sv_j] @ coef_j
+        return decision + self.intercept
+
+    def predict(self, X) -> np.ndarray:
+        if self.mode == "native":
+            return self.model.predict(X)
+        if self.mode == "dense":
+            return self.model.predict(X.toarray() if sparse.issparse(X) else X)
+
+        decision = self.decision_values(X.astype(np.float64))
+
+        # libsvm voting: a positive value votes for the first class of the pair, ties go to the lowest index
+        votes = np.zeros((decision.shape[0], len(self.classes)), dtype=np.int64)
+        for pair, (i, j, *_) in enumerate(self.pairs):
+            positive = decision[:, pair] > 0
+            votes[:, i] += positive
+            votes[:, j] += ~positive
+
+        return self.classes[np.argmax(votes, axis=1)]
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def joblib_artifact(path: str) -> Callable[[], Any]:
+    # joblib (and the libraries of the pickled objects) are only imported when the artifact is loaded
+    def load():
+        import joblib
+        return joblib.load(path)
+    return load
+
+
+def _source_fingerprint(sources: Iterable[str]) -> str:
+    # Size and SHA-256 of each source file: a file replaced by one that isn't newer
+    # (rsync -a, cp -p, tar) still changes it
+    fingerprint = []
+    for source in sources:
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprint.append([os.path.basename(source), os.path.getsize(source), digest.hexdigest()])
+    return json.dumps(fingerprint)
+
+
+def mmap_artifact(path: str, store_folder: str, name: Optional[str] = None,
+                  build: Optional[Callable[[Any], Any]] = None, depends_on: Iterable[str] = ()) -> Callable[[], Any]:
+    """
+    Loads the NumPy arrays of an artifact as read-only memory maps.
+
+    The artifact (or `build(artifact)`, for an object derived from it) is saved once,
+    uncompressed, in `store_folder` and then loaded with `mmap_mode="r"`: its arrays stay in
+    the page cache and are shared by every worker process instead of being copied into each
+    one. The size and hash of `path` and of the files of `depends_on` (e.g. the module of
+    `build`) are written next to the stored file, which is rebuilt whenever they differ. If the
+    store can't be written (read-only file system), the artifact is loaded the usual way.
+    """
+    def load():
+        import joblib
+        store_path = os.path.join(store_folder, (name or os.path.splitext(os.path.basename(path))[0]) + ".joblib")
+
+        fingerprint_path = store_path + ".source"
+        fingerprint = _source_fingerprint((path, *depends_on))
+        try:
+            with open(fingerprint_path) as f:
+                stored_fingerprint = f.read()
+        except OSError:
+            stored_fingerprint = None
+
+        if not os.path.exists(store_path) or stored_fingerprint != fingerprint:
+            artifact = joblib.load(path)
+            if build is not None:
+                artifact = build(artifact)
+            try:
+                # Written to a temporary file first, workers starting together may build it at the same time.
+                # The fingerprint goes last: a store left without it is rebuilt
+                os.makedirs(store_folder, exist_ok=True)
+                tmp_path = f"{store_path}.{os.getpid()}.tmp"
+                joblib.dump(artifact, tmp_path)
+                os.replace(tmp_path, store_path)
+                with open(tmp_path, "w") as f:
+                    f.write(fingerprint)
+                os.replace(tmp_path, fingerprint_path)
+            except OSError:
+                return artifact
+
+        return joblib.load(store_path, mmap_mode="r")
+    return load
+
+
+class ArtifactRegistry:
+    """
+    Model artifacts loaded on first use instead of at import time.
+
+    `register` only records how to load an artifact. The loader runs the first time the
+    artifact is read (`artifacts.name` or `artifacts.get("name")`), once, even when several
+    threads ask for it at the same time. `preload` loads everything ahead of time (on
+    application startup) and `ready` tells whether every required artifact is loaded.
+
+    An optional artifact (e.g. a model that isn't shipped) doesn't make the service unready,
+    only the code using it fails.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._optional = set()
+        self._values: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], optional: bool = False):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        if optional:
+            self._optional.add(name)
+
+    def get(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+
+        with self._locks[name]:
+            if name not in self._values:
+                try:
+                    self._values[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = f"{type(e).__name__}: {e}"
+                    raise
+                self._errors.pop(name, None)
+        return self._values[name]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name not in self._loaders:
+            raise AttributeError(f"No artifact named {name!r}")
+        return self.get(name)
+
+    def invalidate(self, *names: str):
+        # Dropped artifacts are loaded again (from their file) on next use
+        for name in names:
+            with self._locks[name]:
+                self._values.pop(name, None)
+
+    def preload(self, names: Optional[Iterable[str]] = None):
+        # Failures are kept in `status` instead of raised, so one missing file doesn't stop the others
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._values for name in self._loaders if name not in self._optional)
+
+    def status(self) -> Dict[str, str]:
+        return {
+            name: "loaded" if name in self._values else self._errors.get(name, "not loaded")
+            for name in self._loaders
+        }
@@ -0,0 +1,142 @@
+import time
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+METRICS = ("levenshtein", "damerau_levenshtein")
+
+
+def levenshtein_distance(a: str, b: str) -> int:
+    # Two-row dynamic programming (insertions, deletions, substitutions)
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def damerau_levenshtein_distance(a: str, b: str) -> int:
+    # Unrestricted Damerau-Levenshtein (Lowrance-Wagner), like jellyfish: transpositions of
+    # characters with edits between them are allowed
+    infinity = len(a) + len(b)
+    d = [[infinity] * (len(b) + 2)] + [[infinity] + [0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i + 1][1] = i
+    for j in range(len(b) + 1):
+        d[1][j + 1] = j
+
+    last_row: Dict[str, int] = {}
+    for i in range(1, len(a) + 1):
+        last_match_col = 0
+        for j in range(1, len(b) + 1):
+            k, l = last_row.get(b[j - 1], 0), last_match_col
+            cost = 1
+            if a[i - 1] == b[j - 1]:
+                cost, last_match_col = 0, j
+            d[i + 1][j + 1] = min(d[i][j] + cost, d[i + 1][j] + 1, d[i][j + 1] + 1,
+                                  d[k][l] + (i - k - 1) + 1 + (j - l - 1))
+        last_row[a[i - 1]] = i
+    return d[len(a) + 1][len(b) + 1]
+
+
+def _distance_function(metric: str) -> Callable[[str, str], int]:
+    # jellyfish (C implementation) when it is installed, the same distances in Python otherwise
+    try:
+        import jellyfish
+        return getattr(jellyfish, f"{metric}_distance")
+    except ImportError:
+        return levenshtein_distance if metric == "levenshtein" else damerau_levenshtein_distance
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """The word and every string obtained from it by deleting up to `max_distance` characters."""
+    variants = {word}
+    for n in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), n):
+            skipped = set(positions)
+            variants.add("".join(char for i, char in enumerate(word) if i not in skipped))
+    return variants
+
+
+class FuzzyMatcher:
+    """
+    Finds the vocabulary terms within an edit distance of query tokens (SymSpell-style).
+
+    Two words within distance k always share a string obtained from each of them by at most k
+    deletions, so every term is indexed under its deletion variants once, and a query only
+    generates its own variants (a few dozen dictionary lookups) instead of being compared with
+    the whole vocabulary. The candidates found this way are verified with the exact distance.
+    The results of each (token, distance) are kept in a bounded LRU cache, since tweets repeat
+    the same misspellings.
+    """
+
+    def __init__(self, vocabulary: Iterable[str], max_distance: int = 2, metric: str = "levenshtein",
+                 cache_size: Optional[int] = 100_000):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        self.max_distance = max_distance
+        self.metric = metric
+        self.distance = _distance_function(metric)
+
+        self.terms: List[str] = sorted(set(vocabulary))
+        self.max_term_length = max(map(len, self.terms), default=0)
+        index = defaultdict(list)
+        for term_id, term in enumerate(self.terms):
+            for variant in deletes(term, max_distance):
+                index[variant].append(term_id)
+        self.index: Dict[str, List[int]] = dict(index)
+
+        # LRU cache of (token, max_distance) -> matches
+        self._cached_lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _lookup(self, token: str, max_distance: int, deadline: Optional[float] = None) -> Tuple[Tuple[str, int], ...]:
+        # No term is within reach of a longer token, whose deletion variants grow combinatorially
+        if len(token) > self.max_term_length + max_distance:
+            return ()
+        candidates = set()
+        for variant in deletes(token, max_distance):
+            candidates.update(self.index.get(variant, ()))
+
+        matches = []
+        for term_id in candidates:
+            if deadline is not None and time.perf_counter() > deadline:
+                raise TimeoutError(f"The lookup of {token!r} ran past its deadline")
+            term = self.terms[term_id]
+            if abs(len(term) - len(token)) > max_distance:
+                continue
+            distance = self.distance(token, term)
+            if distance <= max_distance:
+                matches.append((term, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return tuple(matches)
+
+    def lookup(self, token: str, max_distance: Optional[int] = None,
+               deadline: Optional[float] = None) -> List[Tuple[str, int]]:
+        """
+        The (term, distance) pairs within `max_distance` of the token, closest first.
+
+        With a `deadline` (a time.perf_counter() value), the candidates are verified until it is
+        passed, then TimeoutError is raised; these lookups bypass the cache, callers cache them.
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"max_distance can't be over {self.max_distance}, the distance of the index")
+        if deadline is not None:
+            return list(self._lookup(token, max_distance, deadline))
+        return list(self._cached_lookup(token, max_distance))
+
+    def lookup_batch(self, tokens: Iterable[str], max_distance: Optional[int] = None) -> Dict[str, List[Tuple[str, int]]]:
+        # Each distinct token is looked up once
+        return {token: self.lookup(token, max_distance) for token in dict.fromkeys(tokens)}
+
+    def cache_stats(self) -> Dict[str, Optional[int]]:
+        info = self._cached_lookup.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -0,0 +1,64 @@
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, List
+
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Receive
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class LineTooLongError(ValueError):
+    pass
+
+
+def _decode(line: bytes) -> str:
+    return line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+async def read_batches(chunks: AsyncIterable[bytes], batch_size: int, max_line_bytes: int) -> AsyncIterator[List[str]]:
+    '''
+    Batches of `batch_size` lines of a streamed body (the last one may be shorter).
+
+    Only the current batch and the incomplete line at the end of the last chunk are held, so
+    the memory doesn't depend on the size of the body. The next chunk isn't read before the
+    caller asks for the next batch. Raises `LineTooLongError` on a line over `max_line_bytes`.
+    '''
+    batch, partial = [], b""
+    async for chunk in chunks:
+        lines = (partial + chunk).split(b"\n")
+        partial = lines.pop()
+        if len(partial) > max_line_bytes or any(len(line) > max_line_bytes for line in lines):
+            raise LineTooLongError(f"A line is over {max_line_bytes} bytes")
+        for line in lines:
+            batch.append(_decode(line))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+    # The body may not end with a newline
+    if partial:
+        batch.append(_decode(partial))
+    if batch:
+        yield batch
+
+
+def ndjson_lines(rows: Iterable[dict]) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse of a generator that reads the request body itself.
+
+    Before ASGI 2.4 (uvicorn announces 2.3) StreamingResponse reads `receive` in the background to
+    detect a disconnected client, which would take the body chunks from `request.stream()`. Here the
+    generator is the only reader: `request.stream()` raises ClientDisconnect when the client goes away.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        # Returns once the response is sent (stream_response cancels the task group)
+        await anyio.sleep_forever()
+
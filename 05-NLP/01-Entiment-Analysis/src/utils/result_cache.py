@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of raw text -> sentiment label, shared by the requests of a process.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._labels: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            for text in texts:
+                label = self._labels.get(text)
+                if label is None:
+                    self.misses += 1
+                    continue
+                self._labels.move_to_end(text)
+                found[text] = label
+            self.hits += len(found)
+        return found
+
+    def set_many(self, labels: Dict[str, str]):
+        with self._lock:
+            self._labels.update(labels)
+            for text in labels:
+                self._labels.move_to_end(text)
+            while len(self._labels) > self.max_size:
+                self._labels.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._labels),
+            "max_size": self.max_size,
+        }
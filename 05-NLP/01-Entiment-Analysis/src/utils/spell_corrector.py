@@ -0,0 +1,84 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from src.utils.fuzzy_matcher import FuzzyMatcher
+
+
+class SpellCorrector:
+    """
+    Replaces the out-of-vocabulary tokens of a cleaned text by their closest vocabulary term.
+
+    A misspelled token is dropped by the vectorizer, so it is looked up in the fuzzy index of
+    the vocabulary: the closest term within distance 1 (2 for tokens of 8 characters or more)
+    replaces it, a term with the same first letter first when several are as close. The choice
+    of each token is kept in a bounded LRU cache. Each text has a hard time budget, checked
+    between the candidates of a lookup too: once it is spent, the remaining tokens are kept as
+    they are, so a text full of rare words can't slow the request down. Tokens longer than any
+    term within reach (and than MAX_TOKEN_LENGTH) are never looked up.
+    """
+
+    # Longest token looked up: the deletion variants of a token grow combinatorially with its length
+    MAX_TOKEN_LENGTH = 30
+
+    def __init__(self, matcher: FuzzyMatcher, vocabulary: Iterable[str], max_distance: int = 2,
+                 time_budget: float = 0.002, cache_size: Optional[int] = 100_000):
+        self.matcher = matcher
+        self.vocabulary = set(vocabulary)
+        self.max_distance = min(max_distance, matcher.max_distance)
+        self.time_budget = time_budget
+        self.max_token_length = min(self.MAX_TOKEN_LENGTH, matcher.max_term_length + self.max_distance)
+        # Deadline of the text being corrected by each thread, read by the cached _correct_token
+        self._local = threading.local()
+
+        # LRU cache of OOV token -> vocabulary term (None when nothing is close enough)
+        self.correct_token = lru_cache(maxsize=cache_size)(self._correct_token)
+        self.texts = 0
+        self.corrected_tokens = 0
+        self.out_of_budget_texts = 0
+
+    def _correct_token(self, token: str) -> Optional[str]:
+        token = token.lower()
+        max_distance = min(1 if len(token) < 8 else 2, self.max_distance)
+        matches = self.matcher.lookup(token, max_distance, getattr(self._local, "deadline", None))
+        if not matches:
+            return None
+        closest = [term for term, distance in matches if distance == matches[0][1]]
+        return next((term for term in closest if term[0] == token[0]), closest[0])
+
+    def correct(self, words: List[str]) -> List[str]:
+        deadline = time.perf_counter() + self.time_budget
+        self.texts += 1
+        corrected = list(words)
+        self._local.deadline = deadline
+        try:
+            for i, word in enumerate(words):
+                # Only plain words are corrected (the vectorizer splits the others)
+                if len(word) > self.max_token_length or not word.isalpha() or word.lower() in self.vocabulary:
+                    continue
+                if time.perf_counter() > deadline:
+                    self.out_of_budget_texts += 1
+                    break
+                try:
+                    term = self.correct_token(word)
+                except TimeoutError:  # Not cached: the token is looked up again by the next text
+                    self.out_of_budget_texts += 1
+                    break
+                if term is not None:
+                    corrected[i] = term
+                    self.corrected_tokens += 1
+        finally:
+            self._local.deadline = None
+        return corrected
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        info = self.correct_token.cache_info()
+        return {
+            "texts": self.texts,
+            "corrected_tokens": self.corrected_tokens,
+            "out_of_budget_texts": self.out_of_budget_texts,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_size": info.currsize,
+            "cache_max_size": info.maxsize,
+        }
@@ -1,13 +1,54 @@
 import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from src.config import EMOTIOCS_MEANINGS
+from src.config import EMOTIOCS_MEANINGS, TOKEN_CACHE_SIZE
+from src.utils.cleaning_engine import CleaningEngine
 
 class TextProcessor:
-    def __init__(self):
+    def __init__(self, token_cache_size: Optional[int] = TOKEN_CACHE_SIZE):
         self.lemmatizer = WordNetLemmatizer()
         self.stop_words = set(stopwords.words("english"))
         self.emoticon_meanings = EMOTIOCS_MEANINGS
+        self.engine = CleaningEngine(self.emoticon_meanings)
+
+        # LRU cache of raw token -> lemmatized token (None for stopwords)
+        self.normalize_token = lru_cache(maxsize=token_cache_size)(self._normalize_token)
+        # Lookups made by warm_up, left out of the stats of the requests
+        self.warm_up_hits = 0
+        self.warm_up_misses = 0
+
+        # Optional last step: out-of-vocabulary tokens -> closest vocabulary term (a SpellCorrector)
+        self.spell_corrector = None
+
+    def _normalize_token(self, word: str) -> Optional[str]:
+        if word.lower() in self.stop_words:
+            return None
+        return self.lemmatizer.lemmatize(word)
+
+    def warm_up(self, vocabulary: Iterable[str]) -> int:
+        # Preload the token cache, e.g. with the vocabulary of the fitted vectorizer.
+        # Returns the number of tokens added to the cache
+        before = self.normalize_token.cache_info()
+        for word in vocabulary:
+            self.normalize_token(word)
+        after = self.normalize_token.cache_info()
+        self.warm_up_hits += after.hits - before.hits
+        self.warm_up_misses += after.misses - before.misses
+        return after.misses - before.misses
+
+    def token_cache_stats(self) -> Dict[str, Optional[int]]:
+        info = self.normalize_token.cache_info()
+        return {
+            "hits": info.hits - self.warm_up_hits,
+            "misses": info.misses - self.warm_up_misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
+
+    def spell_correction_stats(self) -> Dict[str, Optional[int]]:
+        return self.spell_corrector.stats() if self.spell_corrector is not None else {"enabled": False}
 
     def remove_pattern(self, text: str, pattern: str) -> str:
         return re.sub(pattern, '', text)
@@ -36,6 +77,14 @@ class TextProcessor:
         return ' '.join(lemmatized_words)
 
     def clean_text(self, text: str) -> str:
+        # Same output as clean_text_stepwise, using the precompiled engine and the token cache
+        words = [self.normalize_token(word) for word in self.engine.tokenize(text)]
+        words = [word for word in words if word is not None]
+        if self.spell_corrector is not None:
+            words = self.spell_corrector.correct(words)
+        return ' '.join(words)
+
+    def clean_text_stepwise(self, text: str) -> str:
         # Apply all cleaning steps
         text = self.remove_pattern(text, r'@[\w]*')  # Remove mentions
         text = self.remove_pattern(text, r'https?://\S+|www\.\S+')  # Remove URLs
@@ -47,4 +96,6 @@ class TextProcessor:
         text = self.remove_pattern(text, r'[!@#$%^&*()_+{}\[\]:;<>,.?~\\|\/]')  # Remove special chars
         text = self.remove_redundant_words(text)  # Remove redundant words
         text = self.lemmatize_text(text)  # Lemmatize
+        if self.spell_corrector is not None:
+            text = ' '.join(self.spell_corrector.correct(text.split()))  # Correct OOV tokens
         return text
@@ -0,0 +1,76 @@
+"""
+Cold-start time of every FastAPI service: `import main` (models not loaded yet, the
+service is live) and import + loading every artifact (the service is ready).
+
+Each measurement runs in a fresh interpreter, from the project folder of the service.
+
+Run from the repository root:
+    python benchmarks/cold_start.py [repeats]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = {
+    "nlp-sentiment": os.path.join(ROOT, "05-NLP", "01-Entiment-Analysis"),
+    "churn": os.path.join(ROOT, "03- Machine Learning", "Classification", "Churn_Project"),
+    "breast-cancer": os.path.join(ROOT, "03- Machine Learning", "Classification", "Breast_Cancer_Wisconsin_Diagnosis"),
+    "fashion-mnist": os.path.join(ROOT, "04- Deep Learning", "Fashion_MNIST_Project"),
+    "titanic": os.path.join(ROOT, "04- Deep Learning", "Titanic_ANN_Project"),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter() - start
+n_modules = len(sys.modules)
+
+classifier = getattr(main, "classifier", None)
+if classifier is not None:
+    classifier.load()
+else:
+    main.artifacts.preload()
+print(json.dumps({
+    "import": imported,
+    "ready": time.perf_counter() - start,
+    "modules": n_modules,
+    "status": main.artifacts.status(),
+}))
+"""
+
+
+def probe(path: str) -> dict:
+    # FastAPI needs a title, the services' .env files are not always there
+    env = {"APP_NAME": "cold-start", "VERSION": "0", "PRELOAD_ARTIFACTS": "false",
+           "PYTHONWARNINGS": "ignore", **os.environ}
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=path, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if "Error" in line] or ["exit code %d" % result.returncode]
+        return {"error": errors[-1].strip()}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"{'service':>14} | {'import main':>11} | {'+ artifacts':>11} | modules | artifacts")
+    for name, path in SERVICES.items():
+        runs = [probe(path) for _ in range(repeats)]
+        if "error" in runs[0]:
+            print(f"{name:>14} | failed: {runs[0]['error']}")
+            continue
+
+        imported = statistics.median(run["import"] for run in runs)
+        ready = statistics.median(run["ready"] for run in runs)
+        failed = [artifact for artifact, status in runs[0]["status"].items() if status != "loaded"]
+        note = f"not loaded: {', '.join(failed)}" if failed else "all loaded"
+        print(f"{name:>14} | {imported:9.2f} s | {ready:9.2f} s | {runs[0]['modules']:7d} | {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Latency of the inference backends of the Keras services, for batch sizes 1 to 1024:
+`model.predict` (the previous path), the warmed-up `tf.function` and the NumPy export.
+
+The outputs of the three backends are checked against each other before timing them.
+The inputs are random rows of the shape the networks take (the preprocessing is the same
+for every backend).
+
+Run from the repository root:
+    python benchmarks/keras_inference.py [repeats]
+"""
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEEP_LEARNING = os.path.join(ROOT, "04- Deep Learning")
+
+MODELS = {
+    "titanic": os.path.join(DEEP_LEARNING, "Titanic_ANN_Project", "src", "artifacts", "best_titanic_model.keras"),
+    "fashion-mnist": os.path.join(DEEP_LEARNING, "Fashion_MNIST_Project", "src", "artifacts", "model.keras"),
+}
+BATCH_SIZES = (1, 8, 64, 256, 1024)
+
+
+def load_keras_inference():
+    # The module is the same in both projects
+    path = os.path.join(DEEP_LEARNING, "Titanic_ANN_Project", "src", "utils", "keras_inference.py")
+    spec = importlib.util.spec_from_file_location("keras_inference", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def latencies(predict, x, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(x)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    import tensorflow as tf
+    keras_inference = load_keras_inference()
+
+    for name, path in MODELS.items():
+        model = tf.keras.models.load_model(path)
+        backends = {
+            "predict": lambda x: model.predict(x, verbose=0),
+            "tf_function": keras_inference.CompiledModel(model),
+            "numpy": keras_inference.NumpyDenseModel.from_keras(model),
+        }
+        print(f"{name}: input {model.input_shape[1:]}, p50 / p99 in ms")
+
+        rng = np.random.default_rng(42)
+        for batch_size in BATCH_SIZES:
+            x = rng.normal(size=(batch_size, *model.input_shape[1:])).astype(np.float32)
+            expected = backends["predict"](x)
+            for backend, predict in backends.items():
+                np.testing.assert_allclose(predict(x), expected, atol=1e-5, err_msg=f"{name} {backend}")
+
+            row = []
+            for backend, predict in backends.items():
+                # model.predict is slow enough that fewer repeats give a stable median
+                p50, p99 = latencies(predict, x, repeats // 4 if backend == "predict" else repeats)
+                row.append(f"{backend} {p50 * 1e3:8.3f} / {p99 * 1e3:8.3f}")
+            print(f"  batch {batch_size:>5}: " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+kNN text classification of 20 Newsgroups: the per-document loop of
+`05-NLP/00-NoteBooks/03-Feature-Extraction.ipynb` vs the blocked `SparseKNN` of
+`05-NLP/00-NoteBooks/knn_search.py`, for the cosine, dot-product and euclidean metrics.
+
+The documents are vectorized like in the notebook (CountVectorizer, 1000 features) and with
+TF-IDF. The loop is timed on the first queries only (it scales linearly), and the top-k
+scores of both are checked to be the same on those queries. When 20 Newsgroups can't be
+downloaded, a synthetic corpus of the same size is used (20 topics, Zipf-distributed words).
+
+Run from the repository root:
+    python benchmarks/knn_search.py [n_jobs] [loop_queries]
+"""
+import importlib.util
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+K = 3
+
+
+def load_knn_search():
+    path = os.path.join(ROOT, "05-NLP", "00-NoteBooks", "knn_search.py")
+    spec = importlib.util.spec_from_file_location("knn_search", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_corpus(n_docs: int, n_topics: int = 20, vocabulary: int = 30_000, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    zipf = 1.0 / np.arange(1, vocabulary + 1) ** 1.1
+    zipf /= zipf.sum()
+    # Each topic draws the same Zipf law over its own ordering of the words
+    orderings = [rng.permutation(vocabulary) for _ in range(n_topics)]
+    topics = rng.integers(0, n_topics, n_docs)
+    docs = []
+    for topic in topics:
+        words = orderings[topic][rng.choice(vocabulary, size=rng.integers(50, 400), p=zipf)]
+        docs.append(" ".join(f"w{w}" for w in words))
+    return docs, topics
+
+
+def load_corpus():
+    # (train texts, train labels, test texts, test labels, source)
+    try:
+        from sklearn.datasets import fetch_20newsgroups
+        remove = ('headers', 'footers', 'quotes')
+        train = fetch_20newsgroups(subset='train', remove=remove)
+        test = fetch_20newsgroups(subset='test', remove=remove)
+        return train.data, train.target, test.data, test.target, "20 Newsgroups"
+    except OSError:
+        docs, topics = synthetic_corpus(11_314 + 7_532)
+        return docs[:11_314], topics[:11_314], docs[11_314:], topics[11_314:], "synthetic, 20 Newsgroups-sized"
+
+
+def notebook_loop(metric: str, X_train_v, y_train, X_test_v):
+    # The loop of the notebook: one similarity row + a full argsort per test document
+    y_pred, top_scores = [], []
+    for i in range(X_test_v.shape[0]):
+        if metric == "cosine":
+            distances = cosine_similarity(X_test_v[i], X_train_v).flatten()
+            indices = np.argsort(distances)[::-1]
+        elif metric == "euclidean":
+            distances = euclidean_distances(X_test_v[i], X_train_v).flatten()
+            indices = np.argsort(distances)
+        else:
+            distances = (X_test_v[i] * X_train_v.T).toarray().flatten()
+            indices = np.argsort(distances)[::-1]
+        y_pred.append(Counter([y_train[j] for j in indices[:K]]).most_common(1)[0][0])
+        top_scores.append(distances[indices[:K]])
+    return np.array(y_pred), np.array(top_scores)
+
+
+def main():
+    n_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    loop_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    knn_search = load_knn_search()
+
+    X_train, y_train, X_test, y_test, source = load_corpus()
+    print(f"{source}: {len(X_train)} train / {len(X_test)} test documents, k={K}, n_jobs={n_jobs}")
+
+    vectorizers = {
+        "count": CountVectorizer(stop_words='english', max_features=1000, max_df=0.7, min_df=0.01),
+        "tfidf": TfidfVectorizer(stop_words='english', max_df=0.7, min_df=2),
+    }
+    for name, vectorizer in vectorizers.items():
+        X_train_v = vectorizer.fit_transform(X_train)
+        X_test_v = vectorizer.transform(X_test)
+        print(f"{name}: {X_train_v.shape[1]} features")
+
+        for metric in knn_search.METRICS:
+            start = time.perf_counter()
+            _, loop_scores = notebook_loop(metric, X_train_v, y_train, X_test_v[:loop_queries])
+            loop_rate = loop_queries / (time.perf_counter() - start)
+
+            knn = knn_search.SparseKNN(metric=metric, n_neighbors=K, n_jobs=n_jobs).fit(X_train_v, y_train)
+            start = time.perf_counter()
+            y_pred = knn.predict(X_test_v)
+            blocked_rate = len(X_test) / (time.perf_counter() - start)
+            scores, _ = knn.kneighbors(X_test_v[:loop_queries])
+
+            np.testing.assert_allclose(scores[:loop_queries], loop_scores, atol=1e-6,
+                                       err_msg=f"{name} {metric}: top-{K} scores differ from the loop")
+            print(f"  {metric:>9}: loop {loop_rate:8.0f} queries/s | blocked {blocked_rate:8.0f} queries/s "
+                  f"({blocked_rate / loop_rate:5.0f}x), accuracy {np.mean(y_pred == y_test):.3f}")
+
+
+if __name__ == "__main__":
+    main()
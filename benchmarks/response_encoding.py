@@ -0,0 +1,122 @@
+"""
+Time to build and encode the prediction responses of the FastAPI services, default schema vs
+compact format, for 1k to 1M items.
+
+The default responses are built the way the services build them (a pydantic object or dict per
+item, validated against `response_model` and encoded by FastAPI); the compact ones are the
+columns given to `CompactResponse` (orjson, NumPy arrays encoded as they are). The predictions
+are random: the models are not run, only the response is timed, through a `TestClient` request.
+Both formats are checked to decode to the same values.
+
+Run from the repository root:
+    python benchmarks/response_encoding.py [n_items ...]
+"""
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TITANIC = os.path.join(ROOT, "04- Deep Learning", "Titanic_ANN_Project", "src", "utils")
+NLP = os.path.join(ROOT, "05-NLP", "01-Entiment-Analysis", "src")
+
+
+def load(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# The module is the same in every service
+compact_response = load("compact_response", os.path.join(TITANIC, "compact_response.py"))
+titanic_schemas = load("titanic_response", os.path.join(TITANIC, "response.py"))
+nlp_schemas = load("nlp_schemas", os.path.join(NLP, "models", "schemas.py"))
+CompactResponse = compact_response.CompactResponse
+
+
+def make_app(n_items: int, seed: int = 42) -> FastAPI:
+    rng = np.random.default_rng(seed)
+    passenger_id = np.arange(n_items)
+    survived = rng.random(n_items) > 0.5
+    texts = [f"text {i}" for i in range(n_items)]
+    sentiments = rng.choice(["Negative", "Neutral", "Positive"], n_items).tolist()
+    stats = {"texts": n_items, "unique_texts": n_items, "dedup_ratio": 0.0, "cache_hits": 0, "cache_hit_rate": 0.0}
+    probability = rng.random(n_items)
+
+    app = FastAPI()
+
+    @app.get("/titanic", response_model=titanic_schemas.PredictionResponse)
+    def titanic():
+        return titanic_schemas.PredictionResponse(predictions=[
+            titanic_schemas.PassengerPrediction(passenger_id=int(pid), predicted="survived" if pred else "not survived")
+            for pid, pred in zip(passenger_id, survived)
+        ])
+
+    @app.get("/titanic/compact")
+    def titanic_compact():
+        return CompactResponse({"passenger_id": passenger_id, "survived": survived})
+
+    @app.get("/nlp", response_model=nlp_schemas.PredictionResponse)
+    def nlp():
+        predictions = [{"text": text, "sentiment": label} for text, label in zip(texts, sentiments)]
+        return nlp_schemas.PredictionResponse(predictions=predictions, stats=stats)
+
+    @app.get("/nlp/compact")
+    def nlp_compact():
+        return CompactResponse({"sentiment": sentiments, "stats": stats})
+
+    @app.get("/churn")
+    def churn() -> dict:
+        return {"index": list(range(n_items)), "Churn_prediction": (probability > 0.5).tolist(),
+                "Churn_probability": probability.tolist(), "errors": []}
+
+    @app.get("/churn/compact")
+    def churn_compact():
+        return CompactResponse({"index": passenger_id, "Churn_prediction": probability > 0.5,
+                                "Churn_probability": probability, "errors": []})
+
+    return app
+
+
+def same_values(service: str, default: dict, compact: dict) -> bool:
+    if service == "titanic":
+        rows = default["predictions"]
+        return (compact["passenger_id"] == [row["passenger_id"] for row in rows]
+                and compact["survived"] == [row["predicted"] == "survived" for row in rows])
+    if service == "nlp":
+        return (compact["sentiment"] == [row["sentiment"] for row in default["predictions"]]
+                and compact["stats"] == default["stats"])
+    return compact == default
+
+
+def timed(client: TestClient, url: str):
+    start = time.perf_counter()
+    response = client.get(url)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.text
+    return response, elapsed
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    print(f"orjson: {'yes' if compact_response.orjson is not None else 'no (json fallback)'}")
+
+    for n_items in sizes:
+        with TestClient(make_app(n_items)) as client:
+            row = []
+            for service in ("titanic", "nlp", "churn"):
+                default, default_time = timed(client, f"/{service}")
+                compact, compact_time = timed(client, f"/{service}/compact")
+                assert same_values(service, default.json(), compact.json()), f"{service} formats differ"
+                row.append(f"{service} {default_time * 1e3:8.1f} -> {compact_time * 1e3:6.1f} ms "
+                           f"({len(default.content) / 2**20:5.1f} -> {len(compact.content) / 2**20:5.1f} MiB)")
+        print(f"{n_items:>8} items: " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
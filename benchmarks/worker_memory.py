@@ -0,0 +1,94 @@
+"""
+Memory of N worker processes of a service, with the model arrays copied into every
+worker (MMAP_ARTIFACTS=false) vs. memory-mapped from the artifact store (true).
+
+Every worker is a fresh interpreter (like `uvicorn --workers N`) that imports the app,
+loads its artifacts and scores one input. RSS counts the shared pages in every worker,
+PSS splits them between the workers sharing them, so the PSS total is what the N workers
+really use. Linux only (/proc/<pid>/smaps_rollup).
+
+Run from the repository root:
+    python benchmarks/worker_memory.py [n_workers]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = {
+    "nlp-sentiment": (
+        os.path.join(ROOT, "05-NLP", "01-Entiment-Analysis"),
+        "main.artifacts.svm_scorer.predict(main.artifacts.bow_vectorizer.transform(['what a good day']))",
+    ),
+    "churn": (
+        os.path.join(ROOT, "03- Machine Learning", "Classification", "Churn_Project"),
+        "",
+    ),
+}
+
+PROBE = """
+import sys
+import main
+main.artifacts.preload()
+{score}
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+
+def memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def measure(path: str, score: str, n_workers: int, mmap: bool) -> list:
+    env = {**os.environ, "APP_NAME": "worker-memory", "VERSION": "0", "PRELOAD_ARTIFACTS": "false",
+           "PYTHONWARNINGS": "ignore", "MMAP_ARTIFACTS": str(mmap).lower()}
+
+    # The first worker builds the artifact store, the others only map it
+    if mmap:
+        subprocess.run([sys.executable, "-c", PROBE.format(score=score)], cwd=path, env=env,
+                       input="", capture_output=True, text=True, check=True)
+
+    workers = [subprocess.Popen([sys.executable, "-c", PROBE.format(score=score)], cwd=path, env=env,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(n_workers)]
+    try:
+        for worker in workers:
+            if worker.stdout.readline().strip() != "ready":
+                raise RuntimeError(f"A worker of {path} failed to start")
+        return [memory_kb(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+
+
+def main():
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    print(f"{n_workers} workers, per worker (median) and PSS total")
+    for name, (path, score) in SERVICES.items():
+        for mmap in (False, True):
+            workers = measure(path, score, n_workers, mmap)
+            rss = statistics.median(worker["rss"] for worker in workers) / 1024
+            pss = statistics.median(worker["pss"] for worker in workers) / 1024
+            private = statistics.median(worker["private"] for worker in workers) / 1024
+            total = sum(worker["pss"] for worker in workers) / 1024
+            print(f"{name:>14} | mmap {'on ' if mmap else 'off'} | RSS {rss:7.1f} MB | PSS {pss:7.1f} MB | "
+                  f"private {private:7.1f} MB | PSS total {total:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()